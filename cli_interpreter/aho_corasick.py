@@ -0,0 +1,86 @@
+from collections import deque
+from typing import AnyStr, Iterable
+
+
+class AhoCorasick:
+    """
+    Автомат Ахо-Корасик для поиска любой из множества подстрок за один проход по тексту.
+
+    Время поиска не зависит от количества подстрок, поэтому на больших наборах (сотни идентификаторов, IP-адресов)
+    автомат быстрее регулярного выражения-альтернативы, которое проверяет каждую альтернативу в каждой позиции.
+    Подстроки и текст должны быть одного типа: `str` или `bytes`
+    """
+
+    def __init__(self, patterns: Iterable[AnyStr]):
+        """
+        :param patterns: искомые подстроки
+        """
+        self.__goto: list[dict] = [{}]
+        self.__fail: list[int] = [0]
+        self.__terminal: list[bool] = [False]
+
+        for pattern in patterns:
+            node = 0
+            for symbol in pattern:
+                next_node = self.__goto[node].get(symbol)
+                if next_node is None:
+                    next_node = len(self.__goto)
+                    self.__goto.append({})
+                    self.__fail.append(0)
+                    self.__terminal.append(False)
+                    self.__goto[node][symbol] = next_node
+                node = next_node
+            self.__terminal[node] = True
+
+        self.__build_fail_links()
+
+    def __build_fail_links(self) -> None:
+        """
+        Строит суффиксные ссылки обходом в ширину: ссылка ведет в узел самого длинного собственного суффикса,
+        который является префиксом одной из подстрок
+        """
+        queue = deque(self.__goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for symbol, next_node in self.__goto[node].items():
+                queue.append(next_node)
+                fail = self.__fail[node]
+                while fail and symbol not in self.__goto[fail]:
+                    fail = self.__fail[fail]
+                candidate = self.__goto[fail].get(symbol, 0)
+                self.__fail[next_node] = candidate if candidate != next_node else 0
+                # Узел завершает совпадение, если его завершает один из его суффиксов
+                self.__terminal[next_node] = self.__terminal[next_node] or self.__terminal[self.__fail[next_node]]
+
+    def find(self, text: AnyStr, start: int = 0) -> int:
+        """
+        Ищет первое (по позиции окончания) вхождение любой из подстрок
+
+        :param text: текст (`str`, `bytes` или `mmap`)
+        :param start: позиция, с которой начинается поиск
+        :return: позиция последнего символа найденного вхождения или -1, если вхождений нет
+        """
+        goto, fail, terminal = self.__goto, self.__fail, self.__terminal
+        if terminal[0]:
+            # Среди подстрок есть пустая - она встречается в любой позиции
+            return start
+        node = 0
+        for position in range(start, len(text)):
+            symbol = text[position]
+            while True:
+                next_node = goto[node].get(symbol)
+                if next_node is not None:
+                    node = next_node
+                    break
+                if node == 0:
+                    break
+                node = fail[node]
+            if terminal[node]:
+                return position
+        return -1
+
+    def search(self, text: AnyStr) -> bool:
+        """
+        :return: `True`, если текст содержит хотя бы одну из подстрок
+        """
+        return self.find(text) >= 0
@@ -0,0 +1,135 @@
+import asyncio
+import os
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from cli_interpreter.commands.command import Command
+from cli_interpreter.commands.external_pipeline_command import ExternalPipelineCommand
+from cli_interpreter.commands.unknown_command import UnknownCommand
+from cli_interpreter.context import CliContext
+from cli_interpreter.executor import CommandExecutionError, CommandExecutor
+from cli_interpreter.jobs import Job
+from cli_interpreter.pipe import CHUNK_SIZE, OutputSink
+
+
+class AsyncCommandExecutor:
+    """
+    Исполнитель команд на базе asyncio, позволяющий нескольким строкам команд работать одновременно.
+
+    Цикл событий работает в отдельном потоке. Внешние команды запускаются через `asyncio.create_subprocess_exec`
+    и не занимают потоков, пока ждут завершения процессов; строки, содержащие встроенные команды, исполняются
+    обычным `CommandExecutor` в пуле потоков. Запущенные в фоне строки регистрируются как задания
+    в `JobTable` сессии
+    """
+
+    def __init__(self, context: CliContext, max_workers: int = None):
+        """
+        :param context: контекст сессии, в таблицу заданий которого регистрируются фоновые задания
+        :param max_workers: размер пула потоков для встроенных команд
+        """
+        self.__context = context
+        self.__max_workers = max_workers
+        self.__loop: asyncio.AbstractEventLoop | None = None
+        self.__pool: ThreadPoolExecutor | None = None
+        self.__lock = threading.Lock()
+
+    def execute(self, commands: list[Command]) -> None:
+        """
+        Исполняет строку команд и дожидается её завершения
+        :param commands: список команд на исполнение
+        """
+        result_code = self.__schedule(commands, background=False).result()
+        if result_code != Command.OK:
+            raise CommandExecutionError(commands[-1], result_code)
+
+    def submit(self, commands: list[Command], command_line: str) -> Job:
+        """
+        Запускает строку команд в фоне и регистрирует её как задание
+        :param commands: список команд на исполнение
+        :param command_line: исходная строка команд, под которой задание будет видно в `jobs`
+        :return: зарегистрированное задание
+        """
+        future = self.__schedule(commands, background=True)
+        return self.__context.get_job_table().add(command_line, future)
+
+    def __schedule(self, commands: list[Command], background: bool) -> Future:
+        """
+        Передает строку команд на исполнение циклу событий
+        """
+        return asyncio.run_coroutine_threadsafe(self.__run(commands, background), self.__get_loop())
+
+    def __get_loop(self) -> asyncio.AbstractEventLoop:
+        """
+        Запускает цикл событий и пул потоков при первом обращении
+        """
+        with self.__lock:
+            if self.__loop is None:
+                self.__loop = asyncio.new_event_loop()
+                self.__pool = ThreadPoolExecutor(max_workers=self.__max_workers)
+                threading.Thread(target=self.__loop.run_forever, daemon=True).start()
+            return self.__loop
+
+    async def __run(self, commands: list[Command], background: bool) -> int:
+        if all(isinstance(command, UnknownCommand) for command in commands):
+            return await self.__run_processes(commands, background)
+        return await asyncio.get_running_loop().run_in_executor(self.__pool, self.__run_builtins, commands)
+
+    @staticmethod
+    def __run_builtins(commands: list[Command]) -> int:
+        """
+        Исполняет строку команд со встроенными командами в потоке из пула
+        :return: код возврата строки
+        """
+        try:
+            CommandExecutor().execute(commands)
+            return Command.OK
+        except CommandExecutionError as e:
+            return e.return_code
+        except Exception as e:
+            sys.stderr.write(f"Error while executing commands: {e}\n")
+            return Command.DEFAULT_ERROR
+
+    @staticmethod
+    async def __run_processes(commands: list[UnknownCommand], background: bool) -> int:
+        """
+        Запускает внешние команды строки, соединяя соседние процессы каналами ОС, и дожидается их завершения.
+        Фоновые процессы не читают стандартный ввод интерпретатора
+        :return: код возврата строки
+        """
+        processes: list[asyncio.subprocess.Process] = []
+        stdin = asyncio.subprocess.DEVNULL if background else None
+        try:
+            for i, command in enumerate(commands):
+                is_last = i == len(commands) - 1
+                next_stdin, stdout = (None, asyncio.subprocess.PIPE) if is_last else os.pipe()
+                try:
+                    processes.append(
+                        await asyncio.create_subprocess_exec(
+                            *command.get_arguments(),
+                            stdin=stdin,
+                            stdout=stdout,
+                            cwd=command.context.get_working_dir(),
+                        )
+                    )
+                finally:
+                    for fd in (stdin, stdout):
+                        if isinstance(fd, int) and fd >= 0:
+                            os.close(fd)
+                    stdin = next_stdin
+
+            sink = OutputSink(commands[-1].output_stream)
+            while chunk := await processes[-1].stdout.read(CHUNK_SIZE):
+                sink.write(chunk)
+            sink.flush()
+        except Exception as e:
+            sys.stderr.write(f"{str(e)}\n")
+            if isinstance(stdin, int) and stdin >= 0:
+                os.close(stdin)
+            for process in processes:
+                process.kill()
+            for process in processes:
+                await process.wait()
+            return Command.DEFAULT_ERROR
+
+        return ExternalPipelineCommand.result_code([await process.wait() for process in processes])
@@ -1,6 +1,13 @@
+import argparse
 import os
+import sys
+from typing import Iterable, TextIO
+
+from cli_interpreter.async_executor import AsyncCommandExecutor
+from cli_interpreter.commands.command import Command
 from cli_interpreter.context import CliContext
-from cli_interpreter.executor import CommandExecutor
+from cli_interpreter.executor import CommandExecutionError, CommandExecutor
+from cli_interpreter.instrumentation import format_stats
 from cli_interpreter.parser import UserInputParser
 
 
@@ -9,13 +16,17 @@ class REPL:
     Главный модуль системы и точка входа. Оркеструет работу приложения и реализует Read-Execute-Print Loop.
     """
 
+    # Код возврата строки, которую не удалось разобрать
+    SYNTAX_ERROR: int = 2
+
     def __init__(self):
         """
         Конструктор класса. Инициализирует все необходимые для работы модули
         """
         self.context = CliContext()
         self.parser = UserInputParser(self.context)
-        self.executor = CommandExecutor()
+        self.executor = CommandExecutor(self.context.get_pipeline_settings())
+        self.async_executor = AsyncCommandExecutor(self.context)
 
     def run(self) -> None:
         """
@@ -27,23 +38,111 @@ class REPL:
         - Выводит результат исполнения на экран.
         """
         while True:
+            # Сообщаем о фоновых заданиях, завершившихся с момента предыдущей команды
+            for job in self.context.get_job_table().pop_finished():
+                print(job)
+
             user_input = input(f"{os.path.basename(self.context.get_working_dir())}/: ")
+            self.execute_line(user_input, sys.stdout)
 
-            # Обработка ошибок при парсинге
-            try:
-                commands = self.parser.parse(user_input)
-            except Exception as e:
-                print(f"Error while parsing input: {e}")
-                continue
+    def run_script(self, lines: Iterable[str], stop_on_error: bool = False) -> int:
+        """
+        Исполняет строки сценария без приглашения ко вводу. Пустые строки и строки-комментарии (`#`) пропускаются
 
-            # Обработка ошибок при выполнении команд
-            try:
-                self.executor.execute(commands)
-            except Exception as e:
-                print(f"Error while executing commands: {e}")
+        :param lines: строки сценария
+        :param stop_on_error: если `True`, исполнение прекращается на первой строке, завершившейся ошибкой
+        :return: код возврата последней исполненной строки
+        """
+        status = Command.OK
+        for line in lines:
+            stripped = line.strip()
+            if not stripped or stripped.startswith("#"):
                 continue
 
+            status = self.execute_line(line, sys.stderr)
+            if status != Command.OK and stop_on_error:
+                break
+        return status
+
+    def execute_line(self, user_input: str, error_stream: TextIO) -> int:
+        """
+        Разбирает и исполняет одну строку пользовательского ввода.
+        Строка, завершающаяся оператором `&`, запускается в фоне как задание `AsyncCommandExecutor`.
+        Для строки с префиксом `time` после исполнения в стандартный поток ошибок выводится статистика каждой стадии
+        (с `time -m` - и пиковая память встроенных команд)
+
+        :param user_input: строка, введенная пользователем
+        :param error_stream: поток, в который выводятся сообщения об ошибках
+        :return: код возврата строки
+        """
+        command_line, background = self.parser.split_background(user_input)
+        command_line, timed, trace_memory = self.parser.split_time_prefix(command_line)
+
+        # Обработка ошибок при парсинге
+        try:
+            commands = self.parser.parse(command_line)
+        except Exception as e:
+            error_stream.write(f"Error while parsing input: {e}\n")
+            return REPL.SYNTAX_ERROR
+
+        if background:
+            # Фоновое задание исполняется асинхронно, строка сразу считается успешно исполненной
+            job = self.async_executor.submit(commands, command_line.strip())
+            print(f"[{job.job_id}]")
+            return Command.OK
+
+        # Обработка ошибок при выполнении команд
+        try:
+            self.executor.execute(commands, self.__report_stats if timed else None, trace_memory)
+        except CommandExecutionError as e:
+            if e.failure:
+                error_stream.write(f"Error while executing commands: {e}\n")
+            return e.return_code
+        except Exception as e:
+            error_stream.write(f"Error while executing commands: {e}\n")
+            return Command.DEFAULT_ERROR
+
+        return Command.OK
+
+    @staticmethod
+    def __report_stats(stats) -> None:
+        sys.stderr.write(format_stats(stats) + "\n")
+
+
+def main(argv: list[str] = None) -> int:
+    """
+    Точка входа интерпретатора.
+
+    - `cli_repl.py` - интерактивный режим (если стандартный ввод не является терминалом, строки читаются из него
+      без приглашения ко вводу);
+    - `cli_repl.py -c "команды"` - исполнить переданную строку;
+    - `cli_repl.py script.sh` - исполнить файл сценария (`-` - читать сценарий из стандартного ввода).
+
+    Ключ `-e` прекращает исполнение сценария на первой ошибке.
+
+    :param argv: аргументы командной строки
+    :return: код возврата последней исполненной строки
+    """
+    arg_parser = argparse.ArgumentParser(description="CLI interpreter")
+    arg_parser.add_argument("-c", dest="command", help="строка команд для исполнения")
+    arg_parser.add_argument("script", nargs="?", default=None, help="файл сценария")
+    arg_parser.add_argument(
+        "-e", dest="stop_on_error", action="store_true", help="прекратить исполнение на первой ошибке"
+    )
+    args = arg_parser.parse_args(argv)
 
-if __name__ == "__main__":
     repl = REPL()
+    if args.command is not None:
+        return repl.run_script(args.command.splitlines(), args.stop_on_error)
+    if args.script == "-" or (args.script is None and not sys.stdin.isatty()):
+        return repl.run_script(sys.stdin.read().splitlines(), args.stop_on_error)
+    if args.script is not None:
+        with open(args.script, "r") as script:
+            return repl.run_script(script.read().splitlines(), args.stop_on_error)
+
     repl.run()
+    return Command.OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+import sys
+
+from cli_interpreter.commands.command import Command
+from cli_interpreter.context import CliContext
+
+
+class CacheCommand(Command):
+    """
+    Команда `cache` — управление кэшем содержимого файлов сессии, через который `cat`, `wc` и `grep` читают файлы.
+
+    Подкоманды:
+        - `cache stats` — вывести количество файлов и байт в кэше, его объем и количество попаданий, промахов
+          и вытеснений;
+        - `cache clear` — очистить кэш;
+        - `cache budget BYTES` — изменить объем кэша (лишние файлы вытесняются сразу).
+    """
+
+    def __init__(self, args: list[str], context: CliContext):
+        super().__init__(args, context=context)
+
+    def execute(self) -> int:
+        cache = self.context.get_file_cache()
+        if self.args == ["stats"]:
+            stats = cache.stats()
+            self._write_output(
+                "\n".join([
+                    f"entries: {stats['entries']}",
+                    f"size: {stats['size']} bytes",
+                    f"budget: {stats['budget']} bytes",
+                    f"hits: {stats['hits']}",
+                    f"misses: {stats['misses']}",
+                    f"evictions: {stats['evictions']}",
+                ])
+            )
+            return CacheCommand.OK
+        if self.args == ["clear"]:
+            cache.clear()
+            return CacheCommand.OK
+        if len(self.args) == 2 and self.args[0] == "budget" and self.args[1].isdigit():
+            cache.set_budget(int(self.args[1]))
+            return CacheCommand.OK
+
+        sys.stderr.write("usage: cache stats|clear|budget BYTES\n")
+        return CacheCommand.ILLEGAL_ARGUMENT
@@ -1,33 +1,102 @@
-import os
+import argparse
 import sys
+from typing import Generator, Iterator
 
-from cli_interpreter.commands.command import Command
+from cli_interpreter.commands.streaming_command import StreamingCommand
+from cli_interpreter.context import CliContext
+from cli_interpreter.pipe import FileSegment
+from cli_interpreter.reader import FileReader
 
 
-class CatCommand(Command):
+def _parse_size(value: str) -> int:
     """
-    Команда `cat [FILE]` — вывести на экран содержимое файла
+    Разбирает размер в байтах с необязательным суффиксом `K`, `M` или `G`
     """
+    multipliers = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+    suffix = value[-1:].upper()
+    size = int(value[:-1] if suffix in multipliers else value) * multipliers.get(suffix, 1)
+    if size <= 0:
+        raise ValueError(f"invalid buffer size: {value}")
+    return size
 
-    def execute(self) -> int:
-        has_args = len(self.args) > 0
-        if not has_args and self.input_stream is None:
+
+class CatCommand(StreamingCommand):
+    """
+    Команда `cat [--buffer-size SIZE] [FILE ...]` — вывести на экран содержимое файлов одно за другим,
+    а без файлов - поток ввода.
+    Данные копируются фрагментами байт без декодирования, поэтому `... | cat | ...` пропускает через себя поток
+    любого объема в постоянной памяти. Поток ввода читается фрагментами размера `--buffer-size` (по умолчанию
+    `BUFFER_SIZE`, допустимы суффиксы K, M, G); из канала pipeline фрагменты передаются дальше в том виде,
+    в котором их записала предыдущая команда.
+    Содержимое файла отдается как `FileSegment`, поэтому в поток вывода, связанный с файловым дескриптором
+    (терминал, файл), оно копируется силами ядра (`os.sendfile`/`os.copy_file_range`) и не проходит через память
+    интерпретатора. Если файл уже есть в кэше содержимого файлов сессии (его туда помещают `grep` и `wc`),
+    он выводится из кэша без копирования; сам `cat` файлы в кэш не добавляет, чтобы не терять копирование силами ядра.
+    Сжатый файл (gzip, bzip2, xz - определяется по первым байтам) выводится распакованным: данные распаковываются
+    фрагментами размера `--buffer-size` по мере вывода, поэтому память не зависит от размера файла
+    """
+
+    BINARY_INPUT: bool = True
+
+    # Размер фрагмента, которым по умолчанию читаются поток ввода и файлы
+    BUFFER_SIZE: int = 256 * 1024
+
+    def __init__(self, args: list[str] = None, input_stream=None, output_stream=None, context: CliContext = None):
+        super().__init__(args=args, input_stream=input_stream, output_stream=output_stream, context=context)
+
+        parser = argparse.ArgumentParser(add_help=False)
+        parser.add_argument("files", type=str, nargs="*", default=[], help="файлы для вывода")
+        parser.add_argument(
+            "--buffer-size",
+            type=_parse_size,
+            default=CatCommand.BUFFER_SIZE,
+            help="размер фрагмента, которым читаются поток ввода и файлы",
+        )
+        self.arg_parser = parser
+
+    def stream(self, lines: Iterator[bytes]) -> Generator[bytes | FileSegment, None, int]:
+        filenames, buffer_size = self.__parse_arguments()
+        if not filenames and self.input_stream is None:
             sys.stderr.write("cat: Missing file argument\n")
             return CatCommand.ILLEGAL_ARGUMENT
 
-        try:
-            if has_args:
-                absolute_path = self.context.get_working_dir_absolute_path_with_file(self.args[0])
-                with open(absolute_path, "r") as file:
-                    content = file.read()
-            else:
-                content = self.input_stream
-
-            self._write_output(content)
+        if not filenames:
+            yield from self._input_chunks(buffer_size)
             return CatCommand.OK
-        except FileNotFoundError:
-            sys.stderr.write(f"cat: {self.args[0]}: No such file or directory\n")
-            return CatCommand.MISSING_INPUT
-        except Exception as e:
-            sys.stderr.write(f"cat: Error reading {file}: {e}\n")
-            return CatCommand.DEFAULT_ERROR1
+
+        result_code = CatCommand.OK
+        for filename in filenames:
+            try:
+                absolute_path = self.context.get_working_dir_absolute_path_with_file(filename)
+                content = self.context.get_file_cache().get(absolute_path)
+                if content is not None:
+                    view = memoryview(content)
+                    for i in range(0, len(view), buffer_size):
+                        yield view[i:i + buffer_size]
+                    continue
+                with FileReader(absolute_path, buffer_size=buffer_size) as reader:
+                    if reader.compression is not None:
+                        yield from reader.chunks(reuse_buffer=False)
+                    else:
+                        yield reader.segment()
+            except FileNotFoundError:
+                sys.stderr.write(f"cat: {filename}: No such file or directory\n")
+                result_code = CatCommand.MISSING_INPUT
+            except IsADirectoryError:
+                sys.stderr.write(f"cat: {filename}: Is a directory\n")
+                result_code = CatCommand.DEFAULT_ERROR
+            except OSError as e:
+                sys.stderr.write(f"cat: Error reading {filename}: {e}\n")
+                result_code = CatCommand.DEFAULT_ERROR
+        return result_code
+
+    def __parse_arguments(self) -> (list[str], int):
+        """
+        Парсим аргументы
+        :return: имена файлов и размер фрагмента
+        """
+        try:
+            args = self.arg_parser.parse_args(self.args)
+        except SystemExit:
+            raise RuntimeError("Произошла ошибка при разборе аргументов")
+        return args.files, args.buffer_size
@@ -42,6 +42,16 @@ class Command(ABC):
         """
         pass
 
+    def is_failure(self, result_code: int) -> bool:
+        """
+        Определяет, означает ли код ответа исполненной команды ошибку, о которой нужно сообщить пользователю.
+        Наследник может считать некоторые ненулевые коды обычным результатом (например, `grep -q` без совпадений)
+
+        :param result_code: код ответа, который вернул `execute`
+        :return: `True`, если код ответа - ошибка исполнения
+        """
+        return result_code != Command.OK
+
     def __eq__(self, other):
         """
         Переопределенный метод сравнения двух экземпляров команд
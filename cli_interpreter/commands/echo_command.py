@@ -1,21 +1,17 @@
-import sys
+from typing import Generator, Iterator
 
-from cli_interpreter.commands.command import Command
+from cli_interpreter.commands.streaming_command import StreamingCommand
 
 
-class EchoCommand(Command):
+class EchoCommand(StreamingCommand):
     """
     Команда `echo` — вывести на экран свой аргумент (или аргументы)
     """
 
-    def execute(self) -> int:
+    def stream(self, lines: Iterator[str]) -> Generator[str, None, int]:
         if len(self.args) == 0:
-            if self.input_stream is None:
-                output = sys.stdin.read()
-            else:
-                output = self.input_stream.read()
+            yield from lines
         else:
-            output = " ".join(self.args)
+            yield " ".join(self.args)
 
-        self._write_output(output)
         return EchoCommand.OK
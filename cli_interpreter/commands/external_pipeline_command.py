@@ -0,0 +1,190 @@
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from typing import TextIO
+
+from cli_interpreter.commands.command import Command
+from cli_interpreter.commands.unknown_command import UnknownCommand
+from cli_interpreter.instrumentation import StageStats
+from cli_interpreter.pipe import CHUNK_SIZE, OutputSink, PipeReader, read_chunks
+
+
+class ExternalPipelineCommand(Command):
+    """
+    Несколько идущих подряд внешних команд pipeline (`sort | uniq | head`), исполняемых как единое целое.
+
+    Процессы запускаются одновременно и соединяются между собой файловыми дескрипторами `os.pipe`, поэтому данные
+    между ними передает ядро ОС, не копируя их в интерпретатор. Интерпретатор участвует только на границах группы:
+    подает на вход первому процессу поток ввода и читает вывод последнего процесса, если эти потоки не являются
+    стандартными потоками ввода/вывода.
+
+    После исполнения в `stage_stats` находится статистика каждого процесса группы: время работы, процессорное время
+    и пиковый объем резидентной памяти по данным `os.wait4`
+    """
+
+    # Размер фрагмента, которым данные читаются из процессов и передаются им
+    CHUNK_SIZE: int = CHUNK_SIZE
+
+    def __init__(
+            self,
+            commands: list[UnknownCommand],
+            input_stream: TextIO = None,
+            output_stream: TextIO = None,
+    ):
+        """
+        :param commands: внешние команды группы в порядке их следования в pipeline
+        :param input_stream: поток ввода первой команды группы
+        :param output_stream: поток вывода последней команды группы
+        """
+        super().__init__(
+            args=[arg for command in commands for arg in command.args],
+            input_stream=input_stream,
+            output_stream=output_stream,
+            context=commands[0].context,
+        )
+        self.commands = commands
+        self.stage_stats: list[StageStats] = []
+
+    def execute(self) -> int:
+        processes: list[subprocess.Popen] = []
+        self.stage_stats = []
+        started = time.perf_counter()
+        feeder = None
+        stdin = in_write = out_read = None
+        try:
+            if self.input_stream is not None:
+                stdin, in_write = os.pipe()
+
+            stdout = self.__inherited_stdout()
+            for i, command in enumerate(self.commands):
+                is_last = i == len(self.commands) - 1
+                if not is_last:
+                    next_stdin, proc_stdout = os.pipe()
+                elif stdout is None:
+                    out_read, proc_stdout = os.pipe()
+                    next_stdin = None
+                else:
+                    next_stdin, proc_stdout = None, stdout
+
+                try:
+                    self.stage_stats.append(StageStats.for_command(command))
+                    processes.append(
+                        subprocess.Popen(
+                            command.get_arguments(),
+                            stdin=stdin,
+                            stdout=proc_stdout,
+                            cwd=command.context.get_working_dir(),
+                        )
+                    )
+                finally:
+                    # Дескрипторы уже унаследованы дочерним процессом, у интерпретатора их копии не должны оставаться
+                    for fd in (stdin, proc_stdout):
+                        if fd is not None and fd != stdout:
+                            os.close(fd)
+                    stdin = next_stdin
+
+            if in_write is not None:
+                feeder = threading.Thread(target=self.__feed_input, args=(in_write,), daemon=True)
+                feeder.start()
+            if out_read is not None:
+                self.__drain_output(out_read)
+        except BrokenPipeError:
+            # Следующая команда больше не читает вывод группы - процессы группы больше не нужны
+            for process in processes:
+                process.terminate()
+            raise
+        except Exception as e:
+            sys.stderr.write(f"{str(e)}\n")
+            for process in processes:
+                process.kill()
+            for fd in (stdin, in_write if feeder is None else None):
+                if fd is not None:
+                    os.close(fd)
+            return ExternalPipelineCommand.DEFAULT_ERROR
+        finally:
+            if out_read is not None:
+                os.close(out_read)
+            for process, stats in zip(processes, self.stage_stats):
+                self.__wait(process, stats, started)
+            if feeder is not None:
+                if isinstance(self.input_stream, PipeReader):
+                    # Процессы завершились - ввод больше не нужен, даже если предыдущая команда еще его производит
+                    self.input_stream.close()
+                feeder.join()
+
+        return self.result_code([process.returncode for process in processes])
+
+    @staticmethod
+    def __wait(process: subprocess.Popen, stats: StageStats, started: float) -> None:
+        """
+        Дожидается завершения процесса и записывает в статистику потребленные им ресурсы
+        :param started: момент запуска группы по `time.perf_counter`
+        """
+        if process.returncode is None:
+            try:
+                _, status, rusage = os.wait4(process.pid, 0)
+            except ChildProcessError:
+                process.wait()
+            else:
+                process.returncode = os.waitstatus_to_exitcode(status)
+                stats.cpu_time = rusage.ru_utime + rusage.ru_stime
+                # В Linux `ru_maxrss` измеряется в килобайтах, в macOS - в байтах
+                stats.peak_memory = rusage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+        stats.wall_time = time.perf_counter() - started
+        stats.return_code = process.returncode
+
+    def __inherited_stdout(self) -> int | None:
+        """
+        Если вывод группы идет в стандартный поток вывода, связанный с настоящим файловым дескриптором,
+        последний процесс пишет в него напрямую
+        :return: файловый дескриптор стандартного вывода или `None`, если вывод нужно читать интерпретатором
+        """
+        if self.output_stream is not None:
+            return None
+        try:
+            fd = sys.stdout.fileno()
+        except (AttributeError, OSError, ValueError):
+            return None
+        sys.stdout.flush()
+        return fd
+
+    def __feed_input(self, fd: int) -> None:
+        """
+        Передает поток ввода группы на вход первому процессу
+        """
+        try:
+            with open(fd, "wb", closefd=True) as pipe:
+                for chunk in read_chunks(self.input_stream, ExternalPipelineCommand.CHUNK_SIZE):
+                    pipe.write(chunk)
+        except BrokenPipeError:
+            # Первый процесс перестал читать ввод - сообщаем предыдущей команде, что данные больше не нужны
+            if isinstance(self.input_stream, PipeReader):
+                self.input_stream.close()
+
+    def __drain_output(self, fd: int) -> None:
+        """
+        Читает вывод последнего процесса и без декодирования пишет его в поток вывода группы
+        """
+        sink = OutputSink(self.output_stream)
+        while data := os.read(fd, ExternalPipelineCommand.CHUNK_SIZE):
+            sink.write(data)
+        sink.flush()
+
+    @staticmethod
+    def result_code(return_codes: list[int]) -> int:
+        """
+        Возвращает первый ненулевой код возврата процессов группы.
+        Завершение не последнего процесса по SIGPIPE означает лишь то, что следующий процесс перестал читать его вывод
+
+        :param return_codes: коды возврата процессов в порядке их следования в pipeline
+        """
+        for i, return_code in enumerate(return_codes):
+            is_last = i == len(return_codes) - 1
+            if not is_last and return_code == -signal.SIGPIPE:
+                continue
+            if return_code != ExternalPipelineCommand.OK:
+                return return_code
+        return ExternalPipelineCommand.OK
@@ -0,0 +1,37 @@
+import sys
+
+from cli_interpreter.commands.command import Command
+from cli_interpreter.context import CliContext
+
+
+class FgCommand(Command):
+    """
+    Команда `fg [ID]` — дождаться завершения фонового задания (по умолчанию — последнего запущенного)
+    и вернуть его код возврата. Номер задания можно указывать как `1` или `%1`
+    """
+
+    def __init__(self, args: list[str], context: CliContext):
+        super().__init__(args, context=context)
+
+    def execute(self) -> int:
+        if len(self.args) > 1:
+            sys.stderr.write("fg: Too many arguments. Provide 0 or 1 arguments.\n")
+            return FgCommand.ILLEGAL_ARGUMENT
+
+        job_table = self.context.get_job_table()
+        if self.args:
+            try:
+                job = job_table.get(int(self.args[0].lstrip("%")))
+            except ValueError:
+                job = None
+        else:
+            job = job_table.current()
+
+        if job is None:
+            sys.stderr.write(f"fg: {self.args[0] if self.args else 'current'}: no such job\n")
+            return FgCommand.ILLEGAL_ARGUMENT
+
+        self._write_output(job.command_line)
+        result_code = job.wait()
+        job_table.remove(job)
+        return result_code
@@ -2,11 +2,71 @@ import argparse
 import os
 import re
 import sys
+from collections import deque
+from itertools import islice
+from typing import Generator, Iterator
 
 from cli_interpreter.commands.command import Command
+from cli_interpreter.commands.streaming_command import StreamingCommand
+from cli_interpreter.matching import find_matching_lines, find_matching_spans, make_matcher, to_bytes_patterns
+from cli_interpreter.parallel import batch_lines, imap_ordered, split_file_ranges
+from cli_interpreter.reader import FileReader
+from cli_interpreter.trigram_index import TrigramIndex, required_literals, walk_files
 
 
-class GrepCommand(Command):
+def _match_batch(patterns: tuple[str, ...], regex_flags: int, lines: list[str]) -> list[int]:
+    """
+    Сопоставляет пакет строк с шаблонами. Исполняется в процессе из пула процессов сессии
+
+    :return: индексы строк пакета, в которых найдено совпадение
+    """
+    matches = make_matcher(patterns, regex_flags)
+    return [i for i, line in enumerate(lines) if matches(line)]
+
+
+def _search_range(
+        path: str,
+        patterns: tuple[str, ...],
+        bytes_patterns: tuple[bytes, ...] | None,
+        regex_flags: int,
+        count_only: bool,
+        byte_range: tuple[int, int],
+) -> (int, list[tuple[int, str]] | int):
+    """
+    Ищет совпадения в диапазоне байт файла, границы которого совпадают с границами строк.
+    Исполняется в процессе из пула процессов сессии: файл читается самим процессом, а не передается ему
+
+    :param bytes_patterns: байтовые шаблоны (см. `to_bytes_patterns`) или `None`, если искать нужно в тексте
+    :param count_only: вернуть только количество совпавших строк
+    :return: количество строк в диапазоне и совпавшие строки - пары `(номер строки от начала диапазона, строка)`
+        или их количество
+    """
+    start, end = byte_range
+    with FileReader(path) as reader:
+        data = reader.read_range(start, end)
+        search_bytes = bytes_patterns is not None and reader.is_utf8 and b"\r" not in data
+        lines = None if search_bytes else reader.decode_lines(data)
+
+    matches = []
+    if search_bytes:
+        number = position = 0
+        for line_start, line_end in find_matching_spans(data, bytes_patterns):
+            number += data.count(b"\n", position, line_start)
+            position = line_start
+            matches.append((number, data[line_start:line_end].decode("utf-8", errors="replace")))
+        line_count = data.count(b"\n")
+    else:
+        # Как и при чтении файла в текстовом режиме, `\r\n` и `\r` считаются переводами строки
+        matches_line = make_matcher(patterns, regex_flags)
+        line_count = 0
+        for line_count, line in enumerate(lines, 1):
+            line = line.rstrip("\n")
+            if matches_line(line):
+                matches.append((line_count - 1, line))
+    return line_count, len(matches) if count_only else matches
+
+
+class GrepCommand(StreamingCommand):
     """
     Команда `grep`.
 
@@ -14,24 +74,82 @@ class GrepCommand(Command):
         - регулярных выражений в запросе;
         - ключа -w — поиск только слова целиком;
         - ключа -i — регистронезависимый (case-insensitive) поиск;
-        - ключа -A — следующее за -A число говорит, сколько строк после совпадения надо распечатать.
+        - ключа -A — следующее за -A число говорит, сколько строк после совпадения надо распечатать;
+        - ключей -B и -C — сколько строк до совпадения (и до и после совпадения) надо распечатать. Несмежные группы
+          строк разделяются строкой `--`, строки контекста при выводе с именем файла отмечаются префиксом `имя_файла-`;
+        - ключей -c (вывести количество совпавших строк), -l (вывести имена файлов с совпадениями), -m N (остановиться
+          после N совпавших строк) и -q (ничего не выводить, код возврата 1 означает отсутствие совпадений).
+          Чтение ввода прекращается, как только ответ известен: -l и -q - на первом совпадении, -m - на N-м;
+        - ключей -e PATTERN (можно повторять) и -f FILE (шаблоны из файла, по одному на строку) — поиск строк,
+          совпавших с любым из шаблонов. Все шаблоны проверяются за один проход по строке одним объединенным
+          регулярным выражением, а очень большой набор подстрок - автоматом Ахо-Корасик;
+        - ключа -n — выводить перед строкой ее номер (`номер:` для совпадений, `номер-` для строк контекста);
+        - ключа --parallel — сопоставлять строки в пуле процессов (на большом вводе включается автоматически);
+        - нескольких файлов и ключей -r/-R — рекурсивного поиска по директориям (-R следует символическим ссылкам).
+          Если файлов несколько или поиск рекурсивный, строки выводятся с префиксом `имя_файла:`; файлы читаются
+          одновременно в пуле потоков сессии, но результаты выводятся в порядке файлов. Если для директории построен
+          триграммный индекс (`index build`), читаются только файлы, которые по индексу могут содержать совпадения.
+
+    Файлы, которые помещаются в кэш содержимого файлов сессии (`CliContext.get_file_cache()`), читаются через него,
+    поэтому повторный поиск в тех же файлах не обращается к диску. Содержимое файла (из кэша или отображенное
+    в память) без ключей контекста, -n и --parallel ищется шаблоном, который в байтах UTF-8 означает то же, что и
+    в тексте (см. `to_bytes_patterns`), сразу целиком: строки выделяются только вокруг совпадений.
+    Большой обычный файл (от `SHARD_THRESHOLD` байт или любой с ключом --parallel) без ключей контекста, -l, -q и -m
+    делится на диапазоны по границам строк, которые ищутся параллельно в пуле процессов сессии; результаты
+    выводятся в порядке диапазонов, номера строк (-n) отсчитываются от начала файла.
+    Сжатые файлы (gzip, bzip2, xz) ищутся в распакованном виде: распаковка идет построчно по мере чтения
+    (см. `FileReader`), без внешнего `zcat`.
 
     Примеры:
         - `grep "Минимальный$" README.md`
         - `grep -w "Минимал" README.md > grep -A 1 "II" README.md`
+        - `grep -r "TODO" cli_interpreter tests`
     """
 
+    # Код возврата `grep -q`, не нашедшего совпадений
+    NO_MATCH: int = 1
+
+    # Объем ввода в символах, после которого сопоставление переносится в пул процессов
+    PARALLEL_THRESHOLD: int = 8 * 1024 * 1024
+    # Суммарная длина строк в пакете, передаваемом процессу из пула
+    PARALLEL_BATCH_SIZE: int = 1024 * 1024
+    # Размер файла в байтах, начиная с которого файл ищется по диапазонам в пуле процессов
+    SHARD_THRESHOLD: int = 64 * 1024 * 1024
+    # Размер диапазона файла, который ищет один процесс из пула
+    SHARD_SIZE: int = 16 * 1024 * 1024
+
     def __init__(self, args: list[str], context):
         """
         Конструктор инициализирует утилиту для разбора аргументов команды `grep`
         @:param args - аргументы, полученные из пользовательского ввода
         """
         super().__init__(args=args, context=context)
+        self.__found = False
+        self.__no_match = False
 
         parser = argparse.ArgumentParser(add_help=False)
-        parser.add_argument("word", type=str, help="искомое слово")
+        parser.add_argument("word", type=str, nargs="?", default=None, help="искомое слово")
         parser.add_argument(
-            "file", type=str, nargs="?", default=None, help="файл, в котором ищем"
+            "files", type=str, nargs="*", default=[], help="файлы, в которых ищем"
+        )
+        parser.add_argument(
+            "-r", dest="recursive", action="store_true", help="рекурсивный поиск по директориям"
+        )
+        parser.add_argument(
+            "-R",
+            dest="dereference_recursive",
+            action="store_true",
+            help="рекурсивный поиск с переходом по символическим ссылкам",
+        )
+        parser.add_argument(
+            "-e",
+            dest="patterns",
+            action="append",
+            default=[],
+            help="искомый шаблон; ключ можно повторять, тогда ищутся строки, совпавшие с любым из шаблонов",
+        )
+        parser.add_argument(
+            "-f", dest="pattern_files", action="append", default=[], help="файл с шаблонами, по одному на строку"
         )
         parser.add_argument(
             "-w", action="store_true", help="поиск только слова целиком"
@@ -44,59 +162,464 @@ class GrepCommand(Command):
         parser.add_argument(
             "-A",
             type=int,
-            default=0,
+            default=None,
             help="сколько строк после совпадения надо распечатать",
         )
+        parser.add_argument(
+            "-B",
+            type=int,
+            default=None,
+            help="сколько строк до совпадения надо распечатать",
+        )
+        parser.add_argument(
+            "-C",
+            type=int,
+            default=0,
+            help="сколько строк до и после совпадения надо распечатать",
+        )
+        parser.add_argument(
+            "-n", dest="line_number", action="store_true", help="выводить номера строк"
+        )
+        parser.add_argument(
+            "-c", dest="count", action="store_true", help="вывести количество совпавших строк"
+        )
+        parser.add_argument(
+            "-l", dest="files_with_matches", action="store_true", help="вывести имена файлов с совпадениями"
+        )
+        parser.add_argument(
+            "-m", dest="max_count", type=int, default=None, help="остановиться после указанного числа совпадений"
+        )
+        parser.add_argument(
+            "-q", dest="quiet", action="store_true", help="ничего не выводить, только вернуть код возврата"
+        )
+        parser.add_argument(
+            "--parallel",
+            action="store_true",
+            help="сопоставлять строки в пуле процессов независимо от объема ввода",
+        )
         self.arg_parser = parser
 
-    def execute(self) -> int:
-        word, filename, w_flag, i_flag, a_flag = self.__parse_arguments()
-        pattern, regex_flags = self.__resolve_regexp_parameters(word, i_flag, w_flag)
+    def stream(self, lines: Iterator[str]) -> Generator[str, None, int]:
+        options = self.__parse_arguments()
+        try:
+            words = self.__collect_patterns(options)
+        except OSError as e:
+            self.__report_error(e.filename, e)
+            return Command.ILLEGAL_ARGUMENT
+        patterns, regex_flags = self.__resolve_regexp_parameters(words, options.i, options.w)
+        recursive = options.recursive or options.dereference_recursive
+
+        if not options.files and not recursive:
+            if self.__is_summary(options):
+                matches = self.__matched_only(lines, patterns, regex_flags, options)
+                yield from self.__summarize(matches, options, None, False)
+            else:
+                yield from self.__search(lines, patterns, regex_flags, options)
+            return self.__result_code(options, Command.OK)
+
+        if len(options.files) == 1 and not recursive:
+            # Единственный файл читается и выводится потоково, без пула потоков
+            try:
+                yield from self.__search_file(options.files[0], patterns, regex_flags, options, False)
+                return self.__result_code(options, Command.OK)
+            except OSError as e:
+                self.__report_error(options.files[0], e)
+                return Command.ILLEGAL_ARGUMENT
+
+        result_code = Command.OK
+        has_context = any(self.__context_sizes(options))
+        printed = False
+        literals = [required_literals(pattern, regex_flags) for pattern in patterns]
+        files = self._while_output_needed(
+            self.__expand_operands(options.files or ["."], recursive, options, literals)
+        )
+        window = self.context.get_thread_pool_size()
+        for filename, (matches, error) in imap_ordered(
+                self.context.get_thread_pool(), self.__scan_file, files, window, patterns, regex_flags, options
+        ):
+            if error is not None:
+                self.__report_error(filename, error)
+                result_code = Command.ILLEGAL_ARGUMENT
+            if matches and printed and has_context:
+                yield "--\n"
+            printed = printed or bool(matches)
+            yield from matches
+            if options.quiet and self.__found:
+                # Ответ уже известен, остальные файлы можно не читать
+                return Command.OK
+        return self.__result_code(options, result_code)
+
+    def __result_code(self, options: argparse.Namespace, result_code: int) -> int:
+        """
+        :return: код возврата команды; `grep -q` без совпадений возвращает `NO_MATCH`
+        """
+        if options.quiet and result_code == Command.OK and not self.__found:
+            self.__no_match = True
+            return GrepCommand.NO_MATCH
+        return result_code
+
+    def is_failure(self, result_code: int) -> bool:
+        """
+        :return: `True`, если код ответа - ошибка; `NO_MATCH` у `grep -q` - обычный ответ "совпадений нет"
+        """
+        return super().is_failure(result_code) and not (result_code == GrepCommand.NO_MATCH and self.__no_match)
+
+    def __expand_operands(
+            self, operands: list[str], recursive: bool, options: argparse.Namespace, literals: list[list[str]]
+    ) -> Iterator[str]:
+        """
+        Раскрывает операнды в имена файлов. При рекурсивном поиске директории обходятся в порядке имен,
+        поэтому вывод не зависит от порядка, в котором файловая система возвращает записи.
+        Если для директории построен триграммный индекс (`index build`), файлы, в которых по индексу нет
+        обязательных подстрок шаблона, пропускаются без чтения
+        :param literals: для каждого шаблона - подстроки, которые содержит любая совпавшая с ним строка
+            (см. `required_literals`)
+        :return: итератор по именам файлов в том виде, в котором они выводятся пользователю
+        """
+        for operand in operands:
+            path = self.context.get_working_dir_absolute_path_with_file(operand)
+            if not recursive or not os.path.isdir(path):
+                yield operand
+                continue
+
+            index = TrigramIndex.load(path)
+            candidates = index.candidates_any(literals) if index is not None else None
+            for relative_path, status in walk_files(path, options.dereference_recursive):
+                if index is None or index.may_contain(relative_path, status, candidates):
+                    yield os.path.normpath(os.path.join(operand, relative_path))
 
+    def __scan_file(
+            self, patterns: tuple[str, ...], regex_flags: int, options: argparse.Namespace, filename: str
+    ) -> (list[str], OSError | None):
+        """
+        Ищет совпадения в одном файле. Исполняется в пуле потоков сессии
+        :return: строки вывода с префиксом имени файла и ошибка чтения файла, если она произошла
+        """
         try:
-            if self.input_stream is None:
-                absolute_path = self.context.get_working_dir_absolute_path_with_file(filename)
-                with open(absolute_path, "r") as file:
-                    content = file.readlines()
+            return list(self.__search_file(filename, patterns, regex_flags, options, True)), None
+        except OSError as e:
+            return [], e
+
+    def __search_file(
+            self,
+            filename: str,
+            patterns: tuple[str, ...],
+            regex_flags: int,
+            options: argparse.Namespace,
+            with_filename: bool,
+    ) -> Iterator[str]:
+        """
+        Ищет совпадения в файле
+        :param with_filename: выводить ли строки с префиксом имени файла
+        """
+        absolute_path = self.context.get_working_dir_absolute_path_with_file(filename)
+        summary = self.__is_summary(options)
+        bytes_patterns = to_bytes_patterns(patterns, regex_flags)
+        with FileReader(absolute_path) as reader:
+            ranges = self.__shard_ranges(reader, options)
+            if ranges is not None:
+                prefix_filename = filename if with_filename else None
+                yield from self.__search_sharded(
+                    absolute_path, ranges, patterns, bytes_patterns, regex_flags, options, prefix_filename
+                )
+                return
+
+            # Содержимое файла ищется целиком (большие файлы отображаются в память, см. `FileReader.content`), если
+            # этого не мешают ключи. Файл помещается в кэш сессии, только если он все равно читается до конца:
+            # с -q, -l, -m и при построчном поиске чтение может прекратиться раньше, и используется лишь то,
+            # что уже есть в кэше
+            mappable = summary or not (any(self.__context_sizes(options)) or options.line_number)
+            search_buffer = bytes_patterns is not None and reader.is_utf8 and mappable and not options.parallel
+            stops_early = options.quiet or options.files_with_matches or options.max_count is not None
+            cache = self.context.get_file_cache()
+            content = cache.load(absolute_path) if search_buffer and not stops_early else cache.get(absolute_path)
+            if search_buffer:
+                buffer = content if content is not None or not reader.is_plain_file else reader.content()
+                # Текстовый режим переводит `\r\n` в `\n`, и шаблоны с `$` совпали бы по-разному, поэтому содержимое
+                # с `\r` ищется построчно
+                if buffer and buffer.find(b"\r") < 0:
+                    yield from self.__search_buffer(buffer, bytes_patterns, options, filename, with_filename)
+                    return
+
+            # Как и при чтении файла в текстовом режиме, `\r\n` и `\r` считаются переводами строки
+            lines = self._while_output_needed(reader.decode_lines(content) if content is not None else reader.lines())
+            if summary:
+                matches = self.__matched_only(lines, patterns, regex_flags, options)
+                yield from self.__summarize(matches, options, filename, with_filename)
             else:
-                content = self.input_stream.read().split("\n")
-
-            # Построчно парсим
-            matches = []
-            for i, line in enumerate(content):
-                if re.search(pattern, line, regex_flags):
-                    matches.append(line.strip())
-                    if a_flag > 0:
-                        matches.extend(content[i + 1: i + 1 + a_flag])
-
-            self._write_output("\n".join(matches))
-            return Command.OK
-        except FileNotFoundError:
-            sys.stderr.write(f"grep: {filename}: No such file or directory\n")
-            return Command.ILLEGAL_ARGUMENT
+                yield from self.__search(lines, patterns, regex_flags, options, filename if with_filename else None)
+
+    def __search_buffer(
+            self,
+            buffer,
+            bytes_patterns: tuple[bytes, ...],
+            options: argparse.Namespace,
+            filename: str,
+            with_filename: bool,
+    ) -> Iterator[str]:
+        """
+        Ищет совпадения сразу во всем содержимом файла
+        :param buffer: содержимое файла (`bytes` из кэша сессии или `mmap`)
+        """
+        matches = self._while_output_needed(find_matching_lines(buffer, bytes_patterns))
+        if self.__is_summary(options):
+            yield from self.__summarize(matches, options, filename, with_filename)
+            return
+        prefix = f"{filename}:" if with_filename else ""
+        for line in islice(matches, options.max_count):
+            self.__found = True
+            yield prefix + line.decode("utf-8", errors="replace") + "\n"
 
-    def __parse_arguments(self) -> (str, str, bool, bool, int):
+    def __shard_ranges(self, reader: FileReader, options: argparse.Namespace) -> list[tuple[int, int]] | None:
+        """
+        :return: диапазоны, на которые делится файл для поиска в пуле процессов, или `None`, если файл ищется целиком:
+            он невелик, не является обычным несжатым файлом или ключи требуют последовательного чтения (контекст, ранняя
+            остановка -l, -q и -m)
+        """
+        if any(self.__context_sizes(options)) or options.files_with_matches or options.quiet:
+            return None
+        if options.max_count is not None:
+            return None
+        if not reader.is_plain_file or reader.size == 0:
+            return None
+        if not options.parallel and (
+                reader.size < GrepCommand.SHARD_THRESHOLD or self.context.get_process_pool_size() < 2
+        ):
+            return None
+        return split_file_ranges(reader.file, GrepCommand.SHARD_SIZE)
+
+    def __search_sharded(
+            self,
+            absolute_path: str,
+            ranges: list[tuple[int, int]],
+            patterns: tuple[str, ...],
+            bytes_patterns: tuple[bytes, ...] | None,
+            regex_flags: int,
+            options: argparse.Namespace,
+            filename: str | None,
+    ) -> Iterator[str]:
+        """
+        Ищет совпадения в диапазонах файла в пуле процессов и выводит их в порядке диапазонов.
+        Номер строки - это номер строки в диапазоне плюс количество строк в предыдущих диапазонах
+        :param filename: имя файла для префикса выводимых строк или `None`, если префикс не нужен
+        """
+        pool = self.context.get_process_pool()
+        window = 2 * self.context.get_process_pool_size()
+        results = imap_ordered(
+            pool,
+            _search_range,
+            self._while_output_needed(ranges),
+            window,
+            absolute_path,
+            patterns,
+            bytes_patterns,
+            regex_flags,
+            options.count,
+        )
+        if options.count:
+            count = sum(matched for _, (_, matched) in results)
+            self.__found = self.__found or count > 0
+            yield f"{filename}:{count}\n" if filename is not None else f"{count}\n"
+            return
+
+        first_number = 0
+        for _, (line_count, matches) in results:
+            for number, line in matches:
+                self.__found = True
+                yield self.__format_line(line, filename, first_number + number, options.line_number, ":")
+            first_number += line_count
+
+    @staticmethod
+    def __format_line(line: str, filename: str | None, number: int, line_number: bool, separator: str) -> str:
+        """
+        :param number: номер строки, начиная с 0
+        :param separator: `:` для совпавших строк, `-` для строк контекста
+        :return: строка вывода с префиксами имени файла и номера строки
+        """
+        prefix = "" if filename is None else filename + separator
+        if line_number:
+            prefix += f"{number + 1}{separator}"
+        return prefix + line + "\n"
+
+    @staticmethod
+    def __report_error(filename: str, error: OSError) -> None:
+        if isinstance(error, FileNotFoundError):
+            message = "No such file or directory"
+        elif isinstance(error, IsADirectoryError):
+            message = "Is a directory"
+        else:
+            message = error.strerror or str(error)
+        sys.stderr.write(f"grep: {filename}: {message}\n")
+
+    def __search(
+            self,
+            lines: Iterator[str],
+            patterns: tuple[str, ...],
+            regex_flags: int,
+            options: argparse.Namespace,
+            filename: str = None,
+    ) -> Iterator[str]:
+        """
+        Построчно ищет совпадения и отдает подходящие строки вместе со строками контекста.
+        Строки перед совпадением хранятся в кольцевом буфере размера `-B`, после совпадения отсчитываются `-A` строк,
+        поэтому память не зависит от объема ввода
+        :param filename: имя файла для префикса выводимых строк или `None`, если префикс не нужен
+        """
+        before, after = self.__context_sizes(options)
+        previous: deque[tuple[int, str]] = deque(maxlen=before)
+        after_left = 0
+        last_printed = None
+        matches_left = options.max_count
+        for number, (line, matched) in enumerate(self.__match_lines(lines, patterns, regex_flags, options.parallel)):
+            line = line.rstrip("\n")
+            if matches_left == 0:
+                # Достигнут предел -m: дописываем контекст после последнего совпадения и прекращаем чтение
+                if after_left == 0:
+                    break
+                after_left -= 1
+                yield self.__format_line(line, filename, number, options.line_number, "-")
+            elif matched:
+                self.__found = True
+                if matches_left is not None:
+                    matches_left -= 1
+                first = number - len(previous)
+                if (before or after) and last_printed is not None and first > last_printed + 1:
+                    yield "--\n"
+                for context_number, context_line in previous:
+                    yield self.__format_line(context_line, filename, context_number, options.line_number, "-")
+                previous.clear()
+                yield self.__format_line(line, filename, number, options.line_number, ":")
+                after_left = after
+                last_printed = number
+            elif after_left > 0:
+                after_left -= 1
+                last_printed = number
+                yield self.__format_line(line, filename, number, options.line_number, "-")
+            elif before:
+                previous.append((number, line))
+
+    @staticmethod
+    def __is_summary(options: argparse.Namespace) -> bool:
+        """
+        :return: `True`, если вместо совпавших строк нужно вывести только сводку по ним (-c, -l или -q)
+        """
+        return options.count or options.files_with_matches or options.quiet
+
+    def __matched_only(
+            self, lines: Iterator[str], patterns: tuple[str, ...], regex_flags: int, options: argparse.Namespace
+    ) -> Iterator[str]:
+        """
+        :return: итератор по строкам ввода, совпавшим с шаблоном
+        """
+        return (line for line, matched in self.__match_lines(lines, patterns, regex_flags, options.parallel) if matched)
+
+    def __summarize(
+            self, matches: Iterator, options: argparse.Namespace, filename: str | None, with_filename: bool
+    ) -> Iterator[str]:
+        """
+        Считает совпадения, не форматируя их, и читает ввод только до тех пор, пока ответ не известен
+        :param matches: итератор по совпавшим строкам
+        :param filename: имя файла или `None` для потока ввода
+        :param with_filename: выводить ли количество совпадений с префиксом имени файла
+        """
+        limit = 1 if options.quiet or options.files_with_matches else options.max_count
+        count = sum(1 for _ in islice(matches, limit))
+        if count:
+            self.__found = True
+        if options.quiet:
+            return
+        if options.files_with_matches:
+            if count:
+                yield f"{filename or '(standard input)'}\n"
+        elif with_filename:
+            yield f"{filename}:{count}\n"
+        else:
+            yield f"{count}\n"
+
+    @staticmethod
+    def __context_sizes(options: argparse.Namespace) -> (int, int):
+        """
+        :return: количество строк контекста до и после совпадения; -A и -B имеют приоритет над -C
+        """
+        before = options.B if options.B is not None else options.C
+        after = options.A if options.A is not None else options.C
+        return before, after
+
+    def __match_lines(
+            self, lines: Iterator[str], patterns: tuple[str, ...], regex_flags: int, parallel: bool
+    ) -> Iterator[tuple[str, bool]]:
+        """
+        Сопоставляет строки с шаблоном (шаблон без метасимволов ищется как подстрока).
+        Пока объем ввода невелик, строки проверяются в текущем потоке по одной;
+        если объем превысил `PARALLEL_THRESHOLD` (или указан ключ `--parallel`), остальные строки проверяются
+        пакетами в пуле процессов сессии
+        :return: итератор по парам `(строка, совпала ли строка с шаблоном)`
+        """
+        lines = iter(lines)
+        if not parallel:
+            matches = make_matcher(patterns, regex_flags)
+            processed = 0
+            for line in lines:
+                yield line, matches(line)
+                processed += len(line)
+                if processed >= GrepCommand.PARALLEL_THRESHOLD and self.context.get_process_pool_size() > 1:
+                    break
+            else:
+                return
+
+        pool = self.context.get_process_pool()
+        batches = batch_lines(lines, GrepCommand.PARALLEL_BATCH_SIZE)
+        window = 2 * self.context.get_process_pool_size()
+        for batch, matched_indices in imap_ordered(pool, _match_batch, batches, window, patterns, regex_flags):
+            matched_indices = set(matched_indices)
+            for i, line in enumerate(batch):
+                yield line, i in matched_indices
+
+    def __parse_arguments(self) -> argparse.Namespace:
         """Парсим аргументы"""
 
         try:
             command_args = self.args
             args = self.arg_parser.parse_args(command_args)
-            return args.word, args.file, args.w, args.i, args.A
         except SystemExit as e:
             raise RuntimeError("Произошла ошибка при разборе аргументов")
 
+        if args.patterns or args.pattern_files:
+            # Шаблоны заданы ключами, поэтому все позиционные аргументы - файлы
+            if args.word is not None:
+                args.files.insert(0, args.word)
+                args.word = None
+        elif args.word is None:
+            raise RuntimeError("Произошла ошибка при разборе аргументов: не задан шаблон")
+        return args
+
+    def __collect_patterns(self, options: argparse.Namespace) -> list[str]:
+        """
+        Собирает шаблоны из позиционного аргумента, ключей -e и файлов -f
+        """
+        words = [options.word] if options.word is not None else list(options.patterns)
+        for pattern_file in options.pattern_files:
+            absolute_path = self.context.get_working_dir_absolute_path_with_file(pattern_file)
+            try:
+                with FileReader(absolute_path) as reader:
+                    words.extend(line.rstrip("\n") for line in reader.lines())
+            except OSError as e:
+                e.filename = pattern_file
+                raise
+        return words
+
     @staticmethod
     def __resolve_regexp_parameters(
-            word: str, i_flag: bool, w_flag: bool
-    ) -> (str, int):
+            words: list[str], i_flag: bool, w_flag: bool
+    ) -> (tuple[str, ...], int):
         """Настраиваем параметры поиска"""
         regex_flags = 0
         if i_flag:
             regex_flags |= re.IGNORECASE
 
         if w_flag:
-            pattern = r"\b" + re.escape(word) + r"\b"  # ищем только целое слово
+            patterns = tuple(r"\b" + re.escape(word) + r"\b" for word in words)  # ищем только целое слово
         else:
-            pattern = word
+            patterns = tuple(words)
 
-        return pattern, regex_flags
+        return patterns, regex_flags
@@ -0,0 +1,63 @@
+import os
+import sys
+from datetime import datetime
+
+from cli_interpreter.commands.command import Command
+from cli_interpreter.context import CliContext
+from cli_interpreter.trigram_index import TrigramIndex
+
+
+class IndexCommand(Command):
+    """
+    Команда `index` — управление триграммным индексом директории, который `grep -r` использует для отбора файлов.
+
+    Подкоманды:
+        - `index build [DIR]` — построить индекс директории (по умолчанию текущей) или обновить существующий:
+          заново индексируются только новые и изменившиеся файлы;
+        - `index status [DIR]` — вывести размер индекса и количество устаревших и непроиндексированных файлов.
+    """
+
+    def __init__(self, args: list[str], context: CliContext):
+        super().__init__(args, context=context)
+
+    def execute(self) -> int:
+        if not self.args or self.args[0] not in ("build", "status") or len(self.args) > 2:
+            sys.stderr.write("usage: index build|status [DIR]\n")
+            return IndexCommand.ILLEGAL_ARGUMENT
+
+        directory = self.args[1] if len(self.args) > 1 else "."
+        root = os.path.normpath(self.context.get_working_dir_absolute_path_with_file(directory))
+        if not os.path.isdir(root):
+            sys.stderr.write(f"index: {directory}: Not a directory\n")
+            return IndexCommand.ILLEGAL_ARGUMENT
+
+        if self.args[0] == "build":
+            try:
+                index, indexed, removed = TrigramIndex.update(root)
+            except OSError as e:
+                sys.stderr.write(f"index: {directory}: {e.strerror or e}\n")
+                return IndexCommand.DEFAULT_ERROR
+            self._write_output(
+                f"{directory}: {len(index.files)} files, {len(index.postings)} trigrams "
+                f"({indexed} indexed, {removed} removed)"
+            )
+            return IndexCommand.OK
+
+        index = TrigramIndex.load(root)
+        if index is None:
+            sys.stderr.write(f"index: {directory}: not indexed\n")
+            return IndexCommand.ILLEGAL_ARGUMENT
+        status = index.status()
+        built_at = datetime.fromtimestamp(index.built_at).strftime("%Y-%m-%d %H:%M:%S")
+        self._write_output(
+            "\n".join([
+                f"index: {TrigramIndex.path_for(directory)}",
+                f"built: {built_at}",
+                f"files: {status['files']}",
+                f"trigrams: {status['trigrams']}",
+                f"size: {status['size']} bytes",
+                f"stale: {status['stale']}",
+                f"unindexed: {status['unindexed']}",
+            ])
+        )
+        return IndexCommand.OK
@@ -0,0 +1,21 @@
+from cli_interpreter.commands.command import Command
+from cli_interpreter.context import CliContext
+
+
+class JobsCommand(Command):
+    """
+    Команда `jobs` — вывести список фоновых заданий. Завершившиеся задания после вывода удаляются из таблицы
+    """
+
+    def __init__(self, args: list[str], context: CliContext):
+        super().__init__(args, context=context)
+
+    def execute(self) -> int:
+        job_table = self.context.get_job_table()
+        jobs = job_table.all()
+        if jobs:
+            self._write_output("\n".join(str(job) for job in jobs))
+        for job in jobs:
+            if job.is_done():
+                job_table.remove(job)
+        return JobsCommand.OK
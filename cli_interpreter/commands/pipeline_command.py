@@ -0,0 +1,50 @@
+import sys
+
+from cli_interpreter.commands.command import Command
+from cli_interpreter.context import CliContext
+
+
+class PipelineCommand(Command):
+    """
+    Команда `pipeline` — настройка исполнения pipeline в сессии.
+
+    Подкоманды:
+        - `pipeline stats` — вывести режим, ограничение памяти промежуточных буферов и статистику буферов
+          последовательного режима: сколько буферов создано, сколько байт через них прошло, сколько раз и сколько байт
+          перенесено во временный файл, пик памяти одного буфера;
+        - `pipeline mode concurrent|sequential` — исполнять команды pipeline одновременно через каналы (по умолчанию)
+          или по очереди через промежуточные буферы;
+        - `pipeline buffer-limit BYTES` — сколько байт промежуточного буфера хранится в памяти до переноса
+          во временный файл.
+    """
+
+    MODES: dict[str, bool] = {"concurrent": True, "sequential": False}
+
+    def __init__(self, args: list[str], context: CliContext):
+        super().__init__(args, context=context)
+
+    def execute(self) -> int:
+        settings = self.context.get_pipeline_settings()
+        if self.args == ["stats"]:
+            stats = settings.buffer_stats
+            self._write_output(
+                "\n".join([
+                    f"mode: {'concurrent' if settings.concurrent else 'sequential'}",
+                    f"buffer limit: {settings.buffer_memory_limit} bytes",
+                    f"buffers: {stats.buffers}",
+                    f"written: {stats.bytes_written} bytes",
+                    f"spills: {stats.spills}",
+                    f"spilled: {stats.bytes_spilled} bytes",
+                    f"peak memory: {stats.peak_memory_bytes} bytes",
+                ])
+            )
+            return PipelineCommand.OK
+        if len(self.args) == 2 and self.args[0] == "mode" and self.args[1] in PipelineCommand.MODES:
+            settings.concurrent = PipelineCommand.MODES[self.args[1]]
+            return PipelineCommand.OK
+        if len(self.args) == 2 and self.args[0] == "buffer-limit" and self.args[1].isdigit():
+            settings.buffer_memory_limit = int(self.args[1])
+            return PipelineCommand.OK
+
+        sys.stderr.write("usage: pipeline stats|mode concurrent|sequential|buffer-limit BYTES\n")
+        return PipelineCommand.ILLEGAL_ARGUMENT
@@ -0,0 +1,89 @@
+import sys
+from abc import abstractmethod
+from typing import Generator, Iterable, Iterator
+
+from cli_interpreter.commands.command import Command
+from cli_interpreter.pipe import CHUNK_SIZE, OutputSink, PipeWriter, read_chunks
+
+
+class StreamingCommand(Command):
+    """
+    Базовый класс команды, обрабатывающей данные потоково.
+
+    Вместо того чтобы целиком вычитывать поток ввода и записывать результат одной строкой, наследник реализует
+    генератор `stream`, который получает итератор по вводу и отдает свой вывод фрагментами.
+    Объем памяти, который нужен команде, таким образом не зависит от объема обрабатываемых данных.
+
+    По умолчанию команда получает ввод построчно в виде текста. Команды, которым не нужно декодировать ввод,
+    объявляют `BINARY_INPUT = True` и получают его фрагментами байт в том виде, в котором он пришел.
+    Фрагменты вывода могут быть как строками, так и байтами
+    """
+
+    BINARY_INPUT: bool = False
+
+    @abstractmethod
+    def stream(self, lines: Iterator[str | bytes]) -> Generator[str | bytes, None, int]:
+        """
+        Абстрактный генератор, реализующий логику работы команды в наследнике
+
+        :param lines: итератор по строкам потока ввода (вместе с символами перевода строки),
+            либо по фрагментам байт, если `BINARY_INPUT = True`
+        :return: генератор фрагментов вывода; значение, возвращаемое генератором, - код ответа команды
+        """
+        pass
+
+    def execute(self) -> int:
+        """
+        Обертка над `stream`, сохраняющая интерфейс `Command.execute`: пишет фрагменты вывода в поток вывода
+        по мере их появления. Как и `Command._write_output`, гарантирует, что текстовый вывод успешно завершившейся
+        команды завершается переводом строки; двоичный вывод дополняется им только в терминале
+        (см. `OutputSink.needs_trailing_newline`)
+
+        :return: код ответа команды
+        """
+        sink = OutputSink(self.output_stream)
+        chunks = self.stream(self._input_chunks() if self.BINARY_INPUT else self._input_lines())
+        try:
+            while True:
+                sink.write(next(chunks))
+        except StopIteration as stop:
+            result_code = Command.OK if stop.value is None else stop.value
+        finally:
+            chunks.close()
+
+        if result_code == Command.OK and sink.needs_trailing_newline():
+            sink.write("\n")
+        sink.flush()
+        return result_code
+
+    def _input_lines(self) -> Iterator[str]:
+        """
+        Лениво итерируется по строкам потока ввода команды (или стандартного ввода, если поток не задан)
+        """
+        input_stream = self.input_stream if self.input_stream is not None else sys.stdin
+        yield from self._while_output_needed(input_stream)
+
+    def _input_chunks(self, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        Лениво итерируется по фрагментам байт потока ввода команды (или стандартного ввода, если поток не задан)
+        :param chunk_size: размер фрагмента для потоков, отличных от канала (из канала фрагменты отдаются в том виде,
+            в котором они были записаны)
+        """
+        input_stream = self.input_stream if self.input_stream is not None else sys.stdin
+        yield from self._while_output_needed(read_chunks(input_stream, chunk_size))
+
+    def _is_output_needed(self) -> bool:
+        """
+        :return: `False`, если следующая команда pipeline завершилась и вывод этой команды больше никто не прочитает
+        """
+        return not (isinstance(self.output_stream, PipeWriter) and self.output_stream.reader_closed)
+
+    def _while_output_needed(self, items: Iterable) -> Iterator:
+        """
+        Итерируется по элементам, пока вывод команды кому-то нужен. Позволяет прекратить чтение ввода,
+        как только следующая команда pipeline сообщила, что больше не нуждается в данных
+        """
+        for item in items:
+            if not self._is_output_needed():
+                return
+            yield item
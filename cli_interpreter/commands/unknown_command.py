@@ -4,11 +4,14 @@ from typing import TextIO
 
 from cli_interpreter.commands.command import Command
 from cli_interpreter.context import CliContext
+from cli_interpreter.pipe import OutputSink, read_chunks
 
 
 class UnknownCommand(Command):
     """
-    Любая другая команда, которую мы не смогли определить. Передает выполнение команды ядру ОС
+    Любая другая команда, которую мы не смогли определить. Передает выполнение команды ядру ОС.
+    Ввод и вывод процесса передаются байтами без перекодирования, как и в `ExternalPipelineCommand`,
+    поэтому вывод не в UTF-8 (например, двоичные данные) доходит до потока вывода без изменений
     """
 
     def __init__(self, args: list[str] = None, input_stream: TextIO = None, output_stream: TextIO = None, context: CliContext = None):
@@ -16,17 +19,27 @@ class UnknownCommand(Command):
 
     def execute(self):
         try:
-            arguments = [
-                # считаем кавычки лишними среди аргументов, если мы передаем их на откуп терминалу
-                arg.replace('"', "").replace("'", "")
-                for arg in self.args
-            ]
+            arguments = self.get_arguments()
             proc_in = (
-                self.input_stream.read().encode("utf-8") if self.input_stream else None
+                b"".join(read_chunks(self.input_stream)) if self.input_stream else None
             )
             proc = subprocess.run(arguments, input=proc_in, capture_output=True, cwd=self.context.get_working_dir())
-            self._write_output(proc.stdout.decode("utf-8"))
+            sink = OutputSink(self.output_stream)
+            sink.write(proc.stdout)
+            if sink.needs_trailing_newline():
+                sink.write("\n")
+            sink.flush()
             return proc.returncode
         except Exception as e:
             sys.stderr.write(f"{str(e)}\n")
             return UnknownCommand.DEFAULT_ERROR
+
+    def get_arguments(self) -> list[str]:
+        """
+        Возвращает аргументы для запуска процесса
+        """
+        return [
+            # считаем кавычки лишними среди аргументов, если мы передаем их на откуп терминалу
+            arg.replace('"', "").replace("'", "")
+            for arg in self.args
+        ]
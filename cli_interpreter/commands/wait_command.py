@@ -0,0 +1,36 @@
+import sys
+
+from cli_interpreter.commands.command import Command
+from cli_interpreter.context import CliContext
+
+
+class WaitCommand(Command):
+    """
+    Команда `wait [ID ...]` — дождаться завершения указанных фоновых заданий (без аргументов — всех заданий).
+    Номер задания можно указывать как `1` или `%1`
+    """
+
+    def __init__(self, args: list[str], context: CliContext):
+        super().__init__(args, context=context)
+
+    def execute(self) -> int:
+        job_table = self.context.get_job_table()
+        if not self.args:
+            for job in job_table.all():
+                job.wait()
+                job_table.remove(job)
+            return WaitCommand.OK
+
+        result_code = WaitCommand.OK
+        for arg in self.args:
+            try:
+                job = job_table.get(int(arg.lstrip("%")))
+            except ValueError:
+                job = None
+            if job is None:
+                sys.stderr.write(f"wait: {arg}: no such job\n")
+                result_code = WaitCommand.ILLEGAL_ARGUMENT
+                continue
+            result_code = job.wait()
+            job_table.remove(job)
+        return result_code
@@ -1,40 +1,292 @@
-import os
+import argparse
 import sys
+from typing import Generator, Iterable, Iterator
 
-from cli_interpreter.commands.command import Command
+from cli_interpreter.commands.streaming_command import StreamingCommand
+from cli_interpreter.context import CliContext
+from cli_interpreter.parallel import imap_ordered, split_file_ranges
+from cli_interpreter.pipe import CHUNK_SIZE
+from cli_interpreter.reader import FileReader
 
 
-class WcCommand(Command):
+# Счетчики `wc` в порядке вывода: строки (-l), слова (-w), символы (-m) и байты (-c)
+COUNTERS: str = "lwmc"
+# Счетчики, которые выводятся без ключей
+DEFAULT_COUNTERS: str = "lwc"
+
+# Таблица для `bytes.translate`: пробельные байты (те же, что у `bytes.split()`) переводятся в пробел, остальные - в `x`
+_WORD_TABLE: bytes = bytes(ord(" ") if bytes([i]).isspace() else ord("x") for i in range(256))
+# Байты UTF-8, с которых начинается символ (все, кроме байт продолжения 0x80-0xBF)
+_CHAR_START_BYTES: bytes = bytes(i for i in range(256) if not 0x80 <= i <= 0xBF)
+
+
+def _count_chunk(counters: str, chunk: bytes) -> (int, int, int, int, bool, bool):
+    """
+    Считает количество строк, слов, символов и байт во фрагменте данных.
+    Может исполняться в процессе из пула процессов сессии
+
+    Слова считаются как переходы от пробельного байта к непробельному: фрагмент переводится в строку из пробелов
+    и `x` одним вызовом `bytes.translate`, и количество переходов - это количество подстрок ` x`. Символы UTF-8
+    считаются как байты, не являющиеся байтами продолжения, поэтому фрагмент не нужно декодировать
+
+    :param counters: какие счетчики нужны (см. `COUNTERS`); остальные, кроме количества байт, не считаются и равны 0
+    :return: количество строк, слов, символов и байт, а также признаки того, что фрагмент начинается
+        и заканчивается внутри слова
     """
-    Команда `wc [FILE]` — вывести количество строк, слов и байт в файле
+    chunk = bytes(chunk)
+    num_lines = chunk.count(b"\n") if "l" in counters else 0
+    num_words = num_chars = 0
+    starts_in_word = ends_in_word = False
+    if "w" in counters and chunk:
+        transitions = chunk.translate(_WORD_TABLE)
+        starts_in_word = transitions[0] == ord("x")
+        ends_in_word = transitions[-1] == ord("x")
+        num_words = transitions.count(b" x") + starts_in_word
+    if "m" in counters:
+        num_chars = len(chunk) - len(chunk.translate(None, _CHAR_START_BYTES))
+    return num_lines, num_words, num_chars, len(chunk), starts_in_word, ends_in_word
+
+
+def _combine_counts(counts: Iterable[tuple]) -> (int, int, int, int, bool, bool):
+    """
+    Складывает статистику идущих подряд фрагментов. Слово, разрезанное границей фрагментов, учитывается один раз
+
+    :param counts: статистика фрагментов в том виде, в котором ее возвращает `_count_chunk`
+    :return: статистика всех фрагментов вместе в том же виде
+    """
+    num_lines = num_words = num_chars = num_bytes = 0
+    starts_in_word = ends_in_word = False
+    for chunk_lines, chunk_words, chunk_chars, chunk_bytes, chunk_starts_in_word, chunk_ends_in_word in counts:
+        if not chunk_bytes:
+            continue
+        if not num_bytes:
+            starts_in_word = chunk_starts_in_word
+        elif ends_in_word and chunk_starts_in_word:
+            # Первое слово фрагмента - продолжение последнего слова предыдущего фрагмента
+            chunk_words -= 1
+        num_lines += chunk_lines
+        num_words += chunk_words
+        num_chars += chunk_chars
+        num_bytes += chunk_bytes
+        ends_in_word = chunk_ends_in_word
+    return num_lines, num_words, num_chars, num_bytes, starts_in_word, ends_in_word
+
+
+def _count_range(
+        path: str, chunk_size: int, counters: str, byte_range: tuple[int, int]
+) -> (int, int, int, int, bool, bool):
+    """
+    Считает статистику диапазона байт файла. Исполняется в процессе из пула процессов сессии:
+    файл читается самим процессом, а не передается ему
+    """
+    start, end = byte_range
+    with FileReader(path, buffer_size=chunk_size) as reader:
+        return _combine_counts(_count_chunk(counters, chunk) for chunk in reader.chunks(start, end))
+
+
+class WcCommand(StreamingCommand):
+    """
+    Команда `wc [-l] [-w] [-m] [-c] [FILE ...]` — вывести количество строк, слов, символов UTF-8 и байт в файле.
+    Без ключей выводятся строки, слова и байты; с ключами - только выбранные счетчики (в порядке строки, слова,
+    символы, байты), а остальные не считаются.
+    Подсчет ведется по фрагментам байт фиксированного размера без декодирования, поэтому память не зависит
+    от объема ввода.
+    Файлы, которые помещаются в кэш содержимого файлов сессии (`CliContext.get_file_cache()`), читаются через него.
+    Если файлов несколько, они считаются одновременно в пуле потоков сессии; строки со статистикой выводятся в порядке
+    аргументов с именем файла, а за ними - строка `total` с суммой. Статистика единственного файла выводится без имени.
+    С ключом `--parallel` (или автоматически на большом вводе) фрагменты обрабатываются в пуле процессов.
+    Большой обычный файл (от `SHARD_THRESHOLD` байт или любой с ключом `--parallel`) делится на диапазоны,
+    которые процессы пула читают и считают сами, а результаты диапазонов складываются.
+    Сжатые файлы (gzip, bzip2, xz) считаются в распакованном виде, распаковка идет фрагментами (см. `FileReader`)
     """
 
     MISSING_INPUT: int = 2
+    BINARY_INPUT: bool = True
+
+    # Объем ввода в байтах, после которого подсчет переносится в пул процессов
+    PARALLEL_THRESHOLD: int = 8 * 1024 * 1024
+    # Размер фрагмента, передаваемого процессу из пула
+    PARALLEL_BATCH_SIZE: int = 1024 * 1024
+    # Размер файла в байтах, начиная с которого файл считается по диапазонам в пуле процессов
+    SHARD_THRESHOLD: int = 64 * 1024 * 1024
+    # Размер диапазона файла, который считает один процесс из пула
+    SHARD_SIZE: int = 16 * 1024 * 1024
 
-    def execute(self) -> int:
-        has_args = len(self.args) > 0
-        if not has_args and self.input_stream is None:
+    def __init__(self, args: list[str] = None, input_stream=None, output_stream=None, context: CliContext = None):
+        super().__init__(args=args, input_stream=input_stream, output_stream=output_stream, context=context)
+
+        parser = argparse.ArgumentParser(add_help=False)
+        parser.add_argument("files", type=str, nargs="*", default=[], help="файлы для подсчета")
+        parser.add_argument("-l", dest="lines", action="store_true", help="вывести количество строк")
+        parser.add_argument("-w", dest="words", action="store_true", help="вывести количество слов")
+        parser.add_argument("-m", dest="chars", action="store_true", help="вывести количество символов")
+        parser.add_argument("-c", dest="bytes", action="store_true", help="вывести количество байт")
+        parser.add_argument(
+            "--parallel",
+            action="store_true",
+            help="считать в пуле процессов независимо от объема ввода",
+        )
+        self.arg_parser = parser
+
+    def stream(self, lines: Iterator[bytes]) -> Generator[str, None, int]:
+        filenames, counters, parallel = self.__parse_arguments()
+        if not filenames and self.input_stream is None:
             sys.stderr.write("wc: Missing file argument\n")
             return WcCommand.ILLEGAL_ARGUMENT
 
+        if not filenames:
+            yield self.__format(self.__count(lines, counters, parallel), counters)
+            return WcCommand.OK
+
+        if len(filenames) == 1:
+            counts, error = self.__count_file(counters, parallel, filenames[0])
+            if error is not None:
+                return self.__report_error(filenames[0], error)
+            yield self.__format(counts, counters)
+            return WcCommand.OK
+
+        result_code = WcCommand.OK
+        total = (0, 0, 0, 0)
+        window = self.context.get_thread_pool_size()
+        for filename, (counts, error) in imap_ordered(
+                self.context.get_thread_pool(),
+                self.__count_file,
+                self._while_output_needed(filenames),
+                window,
+                counters,
+                parallel,
+        ):
+            if error is not None:
+                result_code = self.__report_error(filename, error)
+                continue
+            total = tuple(total_count + count for total_count, count in zip(total, counts))
+            yield f"{self.__format(counts, counters)} {filename}\n"
+        yield f"{self.__format(total, counters)} total\n"
+        return result_code
+
+    def __count_file(
+            self, counters: str, parallel: bool, filename: str
+    ) -> (tuple[int, int, int, int] | None, OSError | None):
+        """
+        Считает статистику одного файла. При подсчете нескольких файлов исполняется в пуле потоков сессии
+        :return: количество строк, слов, символов и байт или ошибка чтения файла
+        """
+        absolute_path = self.context.get_working_dir_absolute_path_with_file(filename)
+        try:
+            with FileReader(absolute_path) as reader:
+                ranges = self.__shard_ranges(reader, parallel)
+                if ranges is not None:
+                    return self.__count_sharded(absolute_path, ranges, counters), None
+                content = self.context.get_file_cache().load(absolute_path)
+                if content is not None:
+                    view = memoryview(content)
+                    chunks = (view[i:i + CHUNK_SIZE] for i in range(0, len(view), CHUNK_SIZE))
+                else:
+                    chunks = reader.chunks()
+                return self.__count(self._while_output_needed(chunks), counters, parallel), None
+        except OSError as e:
+            return None, e
+
+    @staticmethod
+    def __report_error(filename: str, error: OSError) -> int:
+        """
+        Сообщает об ошибке чтения файла
+        :return: код возврата команды
+        """
+        if isinstance(error, FileNotFoundError):
+            sys.stderr.write(f"wc: {filename}: No such file or directory\n")
+            return WcCommand.MISSING_INPUT
+        sys.stderr.write(f"wc: Error reading {filename}: {error}\n")
+        return WcCommand.DEFAULT_ERROR
+
+    @staticmethod
+    def __format(counts: tuple[int, int, int, int], counters: str) -> str:
+        """
+        :return: выбранные счетчики через пробел
+        """
+        return " ".join(str(count) for counter, count in zip(COUNTERS, counts) if counter in counters)
+
+    def __parse_arguments(self) -> (list[str], str, bool):
+        """
+        Парсим аргументы
+        :return: имена файлов, выбранные счетчики (см. `COUNTERS`) и признак подсчета в пуле процессов
+        """
         try:
-            if has_args:
-                absolute_path = self.context.get_working_dir_absolute_path_with_file(self.args[0])
-                with open(absolute_path, "r") as file:
-                    content = file.read()
+            args = self.arg_parser.parse_args(self.args)
+        except SystemExit:
+            raise RuntimeError("Произошла ошибка при разборе аргументов")
+        selected = (args.lines, args.words, args.chars, args.bytes)
+        counters = "".join(counter for counter, flag in zip(COUNTERS, selected) if flag) or DEFAULT_COUNTERS
+        return args.files, counters, args.parallel
+
+    def __count(self, chunks: Iterator[bytes], counters: str, parallel: bool) -> (int, int, int, int):
+        """
+        Считает количество строк, слов, символов и байт по фрагментам данных.
+        Слово, разрезанное границей фрагментов, учитывается один раз
+        """
+        return _combine_counts(self.__count_chunks(chunks, counters, parallel))[:4]
+
+    def __shard_ranges(self, reader: FileReader, parallel: bool) -> list[tuple[int, int]] | None:
+        """
+        :return: диапазоны, на которые делится файл для подсчета в пуле процессов, или `None`,
+            если файл невелик или не является обычным несжатым файлом
+        """
+        if not reader.is_plain_file or reader.size == 0:
+            return None
+        if not parallel and (reader.size < WcCommand.SHARD_THRESHOLD or self.context.get_process_pool_size() < 2):
+            return None
+        return split_file_ranges(reader.file, WcCommand.SHARD_SIZE)
+
+    def __count_sharded(
+            self, absolute_path: str, ranges: list[tuple[int, int]], counters: str
+    ) -> (int, int, int, int):
+        """
+        Считает диапазоны файла в пуле процессов и складывает их статистику в порядке диапазонов
+        """
+        pool = self.context.get_process_pool()
+        window = 2 * self.context.get_process_pool_size()
+        results = imap_ordered(
+            pool,
+            _count_range,
+            self._while_output_needed(ranges),
+            window,
+            absolute_path,
+            WcCommand.PARALLEL_BATCH_SIZE,
+            counters,
+        )
+        return _combine_counts(counts for _, counts in results)[:4]
+
+    def __count_chunks(self, chunks: Iterator[bytes], counters: str, parallel: bool) -> Iterator[tuple]:
+        """
+        Считает статистику фрагментов. Пока объем ввода невелик, фрагменты обрабатываются в текущем потоке;
+        если объем превысил `PARALLEL_THRESHOLD` (или указан ключ `--parallel`), остальные фрагменты
+        объединяются в пакеты и обрабатываются в пуле процессов сессии
+        """
+        chunks = iter(chunks)
+        if not parallel:
+            processed = 0
+            for chunk in chunks:
+                counts = _count_chunk(counters, chunk)
+                yield counts
+                processed += counts[3]
+                if processed >= WcCommand.PARALLEL_THRESHOLD and self.context.get_process_pool_size() > 1:
+                    break
             else:
-                content = self.input_stream.read()
+                return
 
-            num_lines = content.count("\n")
-            num_words = len(content.split())
-            num_bytes = len(content.encode("utf-8"))
+        pool = self.context.get_process_pool()
+        window = 2 * self.context.get_process_pool_size()
+        for _, counts in imap_ordered(pool, _count_chunk, self.__batch_chunks(chunks), window, counters):
+            yield counts
 
-            result = f"{num_lines} {num_words} {num_bytes}"
-            self._write_output(result)
-            return WcCommand.OK
-        except FileNotFoundError:
-            sys.stderr.write(f"wc: {self.args[0]}: No such file or directory\n")
-            return WcCommand.MISSING_INPUT
-        except Exception as e:
-            sys.stderr.write(f"wc: Error reading {file}: {e}\n")
-            return WcCommand.DEFAULT_ERROR
+    @staticmethod
+    def __batch_chunks(chunks: Iterator[bytes]) -> Iterator[bytes]:
+        """Объединяет фрагменты в пакеты размером не менее `PARALLEL_BATCH_SIZE` байт"""
+        batch = bytearray()
+        for chunk in chunks:
+            batch += chunk
+            if len(batch) >= WcCommand.PARALLEL_BATCH_SIZE:
+                yield bytes(batch)
+                batch.clear()
+        if batch:
+            yield bytes(batch)
@@ -1,5 +1,12 @@
+import multiprocessing
 import os
 import re
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from cli_interpreter.file_cache import FileCache
+from cli_interpreter.jobs import JobTable
+from cli_interpreter.pipe import PipelineSettings
 
 
 class CliContext:
@@ -7,6 +14,12 @@ class CliContext:
     def __init__(self):
         self._env: dict[str, str] = dict(os.environ)
         self._working_dir: str = os.getcwd()
+        self._process_pool: ProcessPoolExecutor | None = None
+        self._process_pool_lock = threading.Lock()
+        self._thread_pool: ThreadPoolExecutor | None = None
+        self._job_table = JobTable()
+        self._file_cache = FileCache()
+        self._pipeline_settings = PipelineSettings()
 
     @staticmethod
     def _is_valid_variable_name(variable: str):
@@ -40,4 +53,55 @@ class CliContext:
     
     def get_working_dir_absolute_path_with_file(self, filename) -> str:
         return os.path.join(self.get_working_dir(), filename)
-    
\ No newline at end of file
+
+    def get_process_pool(self) -> ProcessPoolExecutor:
+        """
+        Возвращает пул процессов для CPU-емкой работы встроенных команд.
+        Пул создается при первом обращении и переиспользуется всеми командами сессии,
+        поэтому затраты на запуск процессов-исполнителей оплачиваются один раз
+        """
+        with self._process_pool_lock:
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self.get_process_pool_size(),
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._process_pool
+
+    @staticmethod
+    def get_process_pool_size() -> int:
+        return os.cpu_count() or 1
+
+    def get_thread_pool(self) -> ThreadPoolExecutor:
+        """
+        Возвращает пул потоков для ввода-вывода встроенных команд (например, одновременного чтения нескольких файлов).
+        Как и пул процессов, создается при первом обращении и переиспользуется всеми командами сессии
+        """
+        with self._process_pool_lock:
+            if self._thread_pool is None:
+                self._thread_pool = ThreadPoolExecutor(max_workers=self.get_thread_pool_size())
+            return self._thread_pool
+
+    @staticmethod
+    def get_thread_pool_size() -> int:
+        return min(32, (os.cpu_count() or 1) + 4)
+
+    def get_job_table(self) -> JobTable:
+        """
+        Возвращает таблицу фоновых заданий сессии
+        """
+        return self._job_table
+
+    def get_file_cache(self) -> FileCache:
+        """
+        Возвращает кэш содержимого файлов сессии, через который встроенные команды читают файлы,
+        к которым в сессии обращаются повторно
+        """
+        return self._file_cache
+
+    def get_pipeline_settings(self) -> PipelineSettings:
+        """
+        Возвращает настройки исполнения pipeline сессии (режим, ограничение памяти промежуточных буферов)
+        и статистику буферов
+        """
+        return self._pipeline_settings
@@ -1,6 +1,33 @@
-from io import StringIO
+import threading
+import time
+import tracemalloc
+from typing import Callable, TextIO
 
 from cli_interpreter.commands.command import Command
+from cli_interpreter.commands.external_pipeline_command import ExternalPipelineCommand
+from cli_interpreter.commands.unknown_command import UnknownCommand
+from cli_interpreter.instrumentation import StageStats
+from cli_interpreter.pipe import (
+    BUFFER_MEMORY_LIMIT,
+    BufferStats,
+    OutputSink,
+    PipelineSettings,
+    PipeReader,
+    SpillBuffer,
+    make_pipe,
+)
+
+
+class CommandExecutionError(RuntimeError):
+    """
+    Ошибка исполнения команды: команда завершилась с ненулевым кодом ответа
+    """
+
+    def __init__(self, command: Command, return_code: int):
+        super().__init__(f"Command {command} ended with unexpected error code {return_code}")
+        self.return_code = return_code
+        # Ненулевой код может быть и обычным результатом команды (см. `Command.is_failure`)
+        self.failure = command.is_failure(return_code)
 
 
 class CommandExecutor:
@@ -9,27 +36,63 @@ class CommandExecutor:
     По длине последовательности определяет, какой обработчик должен выполнять обработку команд.
     """
 
-    def __init__(self):
+    def __init__(self, pipeline_settings: PipelineSettings = None):
         """
         Конструктор класса. Инициализирует обработчики команд
+        :param pipeline_settings: настройки исполнения pipeline (см. `CliContext.get_pipeline_settings`); изменения
+            настроек действуют со следующего исполнения
         """
         self.__sce = SingleCommandExecutor()
-        self.__pe = PipeExecutor()
+        self.__pe = PipeExecutor(settings=pipeline_settings)
+        self.__stats_hooks: list[Callable[[list[StageStats]], None]] = []
 
-    def execute(self, commands: list[Command]) -> None:
+    def execute(
+            self,
+            commands: list[Command],
+            stats_hook: Callable[[list[StageStats]], None] = None,
+            trace_memory: bool = False,
+    ) -> None:
         """
         Запуск обработки списка команд.
         Если список единичной длины, передает обработку первого элемента списка в `SingleCommandExecutor`.
         Если длина списка больше одного, то передает список целиком в `PipeExecutor`.
-        Иначе должен выбросить исключение
+        Иначе должен выбросить исключение.
+
+        Если задан `stats_hook` или зарегистрированы обработчики `add_stats_hook`, команды исполняются
+        с замером статистики стадий (см. `PipeExecutor.execute`), и обработчики получают её после исполнения,
+        в том числе завершившегося ошибкой
         :param commands: список команд на исполнение
+        :param stats_hook: обработчик статистики стадий только для этого исполнения
+        :param trace_memory: замерять пиковую память встроенных команд (см. `PipeExecutor.execute`)
         :return: результат исполнения списка команд
         """
-        if len(commands) == 1:
+        hooks = self.__stats_hooks + ([stats_hook] if stats_hook is not None else [])
+        if hooks:
+            stats: list[StageStats] = []
+            try:
+                self.__pe.execute(commands, stats, trace_memory)
+            finally:
+                for hook in hooks:
+                    hook(stats)
+        elif len(commands) == 1:
             self.__sce.execute(commands[0])
         else:
             self.__pe.execute(commands)
 
+    def add_stats_hook(self, hook: Callable[[list[StageStats]], None]) -> None:
+        """
+        Регистрирует обработчик, который после исполнения каждой строки команд получает статистику её стадий
+        :param hook: функция, принимающая список `StageStats` в порядке следования стадий
+        """
+        self.__stats_hooks.append(hook)
+
+    def get_buffer_stats(self) -> BufferStats:
+        """
+        Возвращает накопленную за сессию статистику промежуточных буферов pipeline:
+        сколько данных прошло через буферы и сколько раз они переносились во временный файл
+        """
+        return self.__pe.buffer_stats
+
 
 class SingleCommandExecutor:
     """
@@ -46,9 +109,7 @@ class SingleCommandExecutor:
         result_code = command.execute()
 
         if result_code != Command.OK:
-            raise RuntimeError(
-                f"Command {command} ended with unexpected error code {result_code}"
-            )
+            raise CommandExecutionError(command, result_code)
 
 
 class PipeExecutor:
@@ -56,29 +117,248 @@ class PipeExecutor:
     Обработчик нескольких команд, выстроенных в pipeline
     """
 
-    @staticmethod
-    def execute(commands: list[Command]) -> None:
+    # Сколько символов может накопиться в канале между двумя командами, прежде чем пишущая команда будет приостановлена
+    PIPE_CAPACITY: int = 64 * 1024
+
+    # Сколько байт промежуточного буфера последовательного режима хранится в памяти до переноса во временный файл
+    BUFFER_MEMORY_LIMIT: int = BUFFER_MEMORY_LIMIT
+
+    def __init__(
+            self,
+            concurrent: bool = True,
+            pipe_capacity: int = PIPE_CAPACITY,
+            buffer_memory_limit: int = BUFFER_MEMORY_LIMIT,
+            settings: PipelineSettings = None,
+    ):
         """
-        Последовательно исполняет каждую команду, для команд не в начале и не в конце последовательности
-        переопределяет потоки ввода и вывода
+        :param concurrent: если `True`, все команды pipeline работают одновременно и обмениваются данными
+            через ограниченные каналы; иначе команды исполняются по очереди через промежуточные буферы
+        :param pipe_capacity: размер буфера канала между соседними командами
+        :param buffer_memory_limit: ограничение памяти промежуточного буфера последовательного режима
+        :param settings: общие настройки сессии вместо `concurrent` и `buffer_memory_limit`: режим и ограничение
+            читаются из них при каждом исполнении, а статистика буферов накапливается в них же
+        """
+        self.__pipe_capacity = pipe_capacity
+        self.settings = settings if settings is not None else PipelineSettings(concurrent, buffer_memory_limit)
+
+    @property
+    def buffer_stats(self) -> BufferStats:
+        return self.settings.buffer_stats
+
+    def execute(self, commands: list[Command], stats: list[StageStats] = None, trace_memory: bool = False) -> None:
+        """
+        Исполняет последовательность команд, передавая поток вывода каждой команды в поток ввода следующей.
+
+        Если передан список `stats`, команды исполняются одновременно независимо от режима, а в список добавляется
+        статистика каждой стадии: внешние команды группы `ExternalPipelineCommand` описываются отдельными стадиями
         :param commands: список команд для исполнения
+        :param stats: список, в который записывается статистика стадий
+        :param trace_memory: замерять пиковую память встроенных команд через `tracemalloc`. Трассировка замедляет
+            выделение памяти во всем интерпретаторе, а с ним и время стадий, поэтому по умолчанию выключена
         :return: результат выполнения последней команды из списка
         """
         if not commands:
             return None
 
+        commands = self.__group_external_commands(commands)
+        if stats is not None:
+            self.__execute_instrumented(commands, stats, trace_memory)
+        elif self.settings.concurrent:
+            self.__execute_concurrently(commands)
+        else:
+            self.__execute_sequentially(commands)
+
+    @staticmethod
+    def __group_external_commands(commands: list[Command]) -> list[Command]:
+        """
+        Объединяет идущие подряд внешние команды в `ExternalPipelineCommand`, чтобы соединить их процессы
+        напрямую средствами ОС
+        :param commands: список команд pipeline
+        :return: список команд, в котором каждая группа внешних команд заменена одной командой
+        """
+        grouped: list[Command] = []
+        external: list[UnknownCommand] = []
+        for command in commands + [None]:
+            if isinstance(command, UnknownCommand):
+                external.append(command)
+                continue
+            if external:
+                grouped.append(
+                    ExternalPipelineCommand(
+                        external,
+                        input_stream=external[0].input_stream,
+                        output_stream=external[-1].output_stream,
+                    )
+                )
+                external = []
+            if command is not None:
+                grouped.append(command)
+        return grouped
+
+    def __execute_concurrently(
+            self,
+            commands: list[Command],
+            stage_stats: list[StageStats] = None,
+            owns_last_output: bool = False,
+            trace_memory: bool = False,
+    ) -> None:
+        """
+        Запускает каждую команду в отдельном потоке, соединяя соседние команды каналами `make_pipe`.
+        Память, занимаемая промежуточными данными, ограничена суммарным размером буферов каналов,
+        а вывод последней команды появляется сразу, как только она его производит
+        :param commands: список команд для исполнения
+        :param stage_stats: статистика команд, в которую записываются время и код возврата каждой стадии
+        :param owns_last_output: если `True`, поток вывода последней команды закрывается по её завершении
+        :param trace_memory: записывать в статистику команд пик памяти `tracemalloc` на момент их завершения
+        """
         for i in range(1, len(commands)):
-            if not commands[i - 1].output_stream:
-                commands[i - 1].output_stream = StringIO()
-            commands[i].input_stream = commands[i - 1].output_stream
+            reader, writer = make_pipe(self.__pipe_capacity, counted=stage_stats is not None)
+            commands[i - 1].output_stream = writer
+            commands[i].input_stream = reader
+
+        result_codes: list[int | None] = [None] * len(commands)
+        errors: list[BaseException | None] = [None] * len(commands)
+        threads = [
+            threading.Thread(
+                target=self.__run_stage,
+                args=(commands, i, result_codes, errors, stage_stats, owns_last_output, trace_memory),
+                daemon=True,
+            )
+            for i in range(len(commands))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
 
+        for command, result_code, error in zip(commands, result_codes, errors):
+            if error is not None:
+                raise error
+            if result_code != Command.OK:
+                raise CommandExecutionError(command, result_code)
+
+    @staticmethod
+    def __run_stage(
+            commands: list[Command],
+            i: int,
+            result_codes: list[int | None],
+            errors: list[BaseException | None],
+            stage_stats: list[StageStats] | None,
+            owns_last_output: bool,
+            trace_memory: bool,
+    ) -> None:
+        """
+        Исполняет одну команду pipeline в рабочем потоке и закрывает принадлежащие ей концы каналов
+        """
+        command = commands[i]
+        started, cpu_started = time.perf_counter(), time.thread_time()
+        try:
+            result_codes[i] = command.execute()
+        except BrokenPipeError:
+            # Следующая команда завершилась и больше не читает вывод - это штатное завершение
+            result_codes[i] = Command.OK
+        except BaseException as e:
+            errors[i] = e
+        finally:
+            if stage_stats is not None:
+                stats = stage_stats[i]
+                stats.wall_time = time.perf_counter() - started
+                stats.cpu_time = time.thread_time() - cpu_started
+                stats.return_code = result_codes[i]
+                if trace_memory:
+                    stats.peak_memory = tracemalloc.get_traced_memory()[1]
+            if i < len(commands) - 1 or owns_last_output:
+                # Сообщаем следующей команде, что данных больше не будет
+                command.output_stream.close()
+            if i > 0:
+                # Отпускаем предыдущую команду, если она еще пытается писать
+                command.input_stream.close()
+
+    def __execute_instrumented(self, commands: list[Command], stats: list[StageStats], trace_memory: bool) -> None:
+        """
+        Исполняет команды одновременно, замеряя для каждой стадии:
+
+        - время работы и процессорное время (для встроенных команд - время потока стадии по `time.thread_time`,
+          для внешних - время процесса по `os.wait4`);
+        - количество байт и строк на входе и выходе - на границах стадий, по счетчикам каналов;
+        - пиковый объем памяти: для внешних команд - резидентная память процесса, для встроенных (только
+          с `trace_memory`) - пик памяти интерпретатора по `tracemalloc` от начала pipeline до завершения стадии.
+          Встроенные команды работают в одном процессе одновременно, поэтому значение включает память стадий,
+          работавших параллельно с ней.
+
+        Вывод последней команды проходит через дополнительный канал, чтобы его объем тоже был посчитан
+        :param commands: список команд для исполнения, внешние команды уже сгруппированы
+        :param stats: список, в который добавляется статистика стадий
+        :param trace_memory: замерять пиковую память встроенных команд
+        """
+        output_stream = commands[-1].output_stream
+        reader, commands[-1].output_stream = make_pipe(self.__pipe_capacity, counted=True)
+        drain = threading.Thread(target=self.__drain, args=(reader, output_stream), daemon=True)
+
+        started_tracing = trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        baseline = 0
+        if trace_memory:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+
+        stage_stats = [StageStats.for_command(command) for command in commands]
+        drain.start()
+        try:
+            self.__execute_concurrently(commands, stage_stats, owns_last_output=True, trace_memory=trace_memory)
+        finally:
+            drain.join()
+            if started_tracing:
+                tracemalloc.stop()
+
+            for i, (command, command_stats) in enumerate(zip(commands, stage_stats)):
+                if command_stats.peak_memory is not None:
+                    command_stats.peak_memory = max(command_stats.peak_memory - baseline, 0)
+                if i > 0:
+                    _, _, command_stats.bytes_in, command_stats.lines_in = command.input_stream.counters
+                command_stats.bytes_out, command_stats.lines_out = (
+                    commands[i + 1].input_stream if i < len(commands) - 1 else reader
+                ).counters[:2]
+
+                if isinstance(command, ExternalPipelineCommand) and command.stage_stats:
+                    # Внешние команды группы показываются отдельными стадиями, объем данных известен на её границах
+                    command.stage_stats[0].bytes_in = command_stats.bytes_in
+                    command.stage_stats[0].lines_in = command_stats.lines_in
+                    command.stage_stats[-1].bytes_out = command_stats.bytes_out
+                    command.stage_stats[-1].lines_out = command_stats.lines_out
+                    stats.extend(command.stage_stats)
+                else:
+                    stats.append(command_stats)
+
+    @staticmethod
+    def __drain(reader: PipeReader, output_stream: TextIO | None) -> None:
+        """
+        Переносит вывод последней команды из канала в исходный поток вывода
+        """
+        try:
+            sink = OutputSink(output_stream)
+            for chunk in reader.read_chunks():
+                sink.write(chunk)
+            sink.flush()
+        finally:
+            # Если вывод перестали принимать, последняя команда не должна зависнуть на заполненном канале
+            reader.close()
+
+    def __execute_sequentially(self, commands: list[Command]) -> None:
+        """
+        Последовательно исполняет каждую команду, для команд не в начале и не в конце последовательности
+        переопределяет потоки ввода и вывода. Промежуточные данные хранятся в `SpillBuffer`, который при превышении
+        ограничения памяти переносит их во временный файл; статистика буферов накапливается в `buffer_stats`
+        :param commands: список команд для исполнения
+        """
         for i, command in enumerate(commands):
             is_first = i == 0
             is_last = i == (len(commands) - 1)
 
             if not is_last:
                 # Для не последней команды заводим временной поток ввода/вывода
-                command.output_stream = StringIO()
+                command.output_stream = SpillBuffer(self.settings.buffer_memory_limit, self.buffer_stats)
 
             if not is_first:
                 # Для не первой команды
@@ -93,9 +373,7 @@ class PipeExecutor:
 
             if result_code != Command.OK:
                 # TODO: наверное, поведение должно быть все-таки немного другим
-                raise RuntimeError(
-                    f"Command {command} ended with unexpected error code {result_code}"
-                )
+                raise CommandExecutionError(command, result_code)
 
             # Закрываем поток на ввод, который больше не пригодится
             if command.input_stream:
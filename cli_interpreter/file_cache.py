@@ -0,0 +1,116 @@
+import os
+import threading
+from collections import OrderedDict
+
+from cli_interpreter.reader import FileReader
+
+# Объем содержимого файлов в байтах, который по умолчанию хранит кэш сессии
+FILE_CACHE_BUDGET: int = 256 * 1024 * 1024
+
+# Какую долю объема кэша может занимать один файл: большие файлы не кэшируются, чтобы не вытеснять все остальные
+MAX_ENTRY_FRACTION: int = 4
+
+
+class FileCache:
+    """
+    Кэш содержимого файлов сессии с вытеснением давно не использованных файлов (LRU).
+
+    Файл идентифицируется устройством, inode, размером и временем изменения, поэтому измененный или замененный
+    файл читается заново, а устаревшая запись со временем вытесняется. Содержимое хранится как неизменяемый `bytes`
+    и отдается командам без копирования; кэш можно использовать из нескольких потоков одновременно
+    """
+
+    def __init__(self, budget: int = FILE_CACHE_BUDGET):
+        """
+        :param budget: максимальный суммарный размер содержимого файлов в кэше в байтах
+        """
+        self.__budget = budget
+        self.__entries: OrderedDict[tuple[int, int, int, int], bytes] = OrderedDict()
+        self.__size = 0
+        self.__lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, path: str) -> bytes | None:
+        """
+        Ищет содержимое файла в кэше, не читая файл
+        :return: содержимое файла или `None`, если его нет в кэше (или оно устарело)
+        """
+        key = self.__key(os.stat(path))
+        with self.__lock:
+            content = self.__entries.get(key)
+            if content is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.__entries.move_to_end(key)
+            return content
+
+    def load(self, path: str) -> bytes | None:
+        """
+        Возвращает содержимое файла из кэша, а если его там нет - читает файл целиком и кэширует
+        :return: содержимое файла или `None`, если файл не кэшируется: он не является обычным несжатым файлом
+            или больше `budget / MAX_ENTRY_FRACTION` байт
+        """
+        with FileReader(path) as reader:
+            status = reader.status
+            if not reader.is_plain_file or status.st_size > self.__budget // MAX_ENTRY_FRACTION:
+                return None
+            key = self.__key(status)
+            with self.__lock:
+                content = self.__entries.get(key)
+                if content is not None:
+                    self.hits += 1
+                    self.__entries.move_to_end(key)
+                    return content
+                self.misses += 1
+            content = reader.read_all()
+
+        if len(content) != status.st_size:
+            # Файл изменился во время чтения - отдаем прочитанное, но не кэшируем его
+            return content
+        with self.__lock:
+            if key not in self.__entries:
+                self.__entries[key] = content
+                self.__size += len(content)
+                self.__evict()
+        return content
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries.clear()
+            self.__size = 0
+
+    def set_budget(self, budget: int) -> None:
+        """
+        Меняет объем кэша, вытесняя лишние файлы
+        """
+        with self.__lock:
+            self.__budget = budget
+            self.__evict()
+
+    def stats(self) -> dict[str, int]:
+        """
+        :return: количество файлов и байт в кэше, объем кэша, количество попаданий, промахов и вытеснений
+        """
+        with self.__lock:
+            return {
+                "entries": len(self.__entries),
+                "size": self.__size,
+                "budget": self.__budget,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def __evict(self) -> None:
+        """Вытесняет давно не использованные файлы, пока кэш не уложится в объем. Вызывается под блокировкой"""
+        while self.__size > self.__budget:
+            _, content = self.__entries.popitem(last=False)
+            self.__size -= len(content)
+            self.evictions += 1
+
+    @staticmethod
+    def __key(status: os.stat_result) -> tuple[int, int, int, int]:
+        return status.st_dev, status.st_ino, status.st_size, status.st_mtime_ns
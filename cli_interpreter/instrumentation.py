@@ -0,0 +1,79 @@
+from cli_interpreter.commands.command import Command
+from cli_interpreter.commands.unknown_command import UnknownCommand
+
+
+class StageStats:
+    """
+    Статистика исполнения одной стадии pipeline.
+
+    Поля, которые для стадии измерить нельзя (например, объем ввода команды, читающей файл), остаются `None`.
+    Объем данных на входе и выходе измеряется на границах стадий: для байтовых фрагментов - в байтах,
+    для текстовых - в байтах их представления в UTF-8
+    """
+
+    def __init__(self, name: str):
+        """
+        :param name: строка команды стадии
+        """
+        self.name = name
+        self.wall_time: float = 0.0
+        self.cpu_time: float | None = None
+        self.bytes_in: int | None = None
+        self.lines_in: int | None = None
+        self.bytes_out: int | None = None
+        self.lines_out: int | None = None
+        self.peak_memory: int | None = None
+        self.return_code: int | None = None
+
+    @staticmethod
+    def for_command(command: Command) -> "StageStats":
+        """
+        Создает пустую статистику стадии, названную по команде и её аргументам
+        """
+        if isinstance(command, UnknownCommand):
+            return StageStats(" ".join(command.args))
+        name = type(command).__name__.removesuffix("Command").lower()
+        return StageStats(" ".join([name] + command.args))
+
+    def __str__(self):
+        return (
+            f"{self.name}: wall={self.wall_time:.3f}s cpu={_format(self.cpu_time, '.3f')}s "
+            f"in={_format(self.bytes_in)}B/{_format(self.lines_in)}L "
+            f"out={_format(self.bytes_out)}B/{_format(self.lines_out)}L "
+            f"peak_mem={_format(self.peak_memory)}B code={_format(self.return_code)}"
+        )
+
+
+def _format(value, spec: str = "") -> str:
+    return "-" if value is None else format(value, spec)
+
+
+def format_stats(stats: list[StageStats]) -> str:
+    """
+    Форматирует статистику стадий в таблицу для вывода пользователю
+    :param stats: статистика стадий в порядке их следования в pipeline
+    :return: таблица с заголовком, по строке на стадию
+    """
+    header = ("stage", "wall, s", "cpu, s", "bytes in", "lines in", "bytes out", "lines out", "peak mem", "code")
+    rows = [header] + [
+        (
+            stage.name,
+            f"{stage.wall_time:.3f}",
+            _format(stage.cpu_time, ".3f"),
+            _format(stage.bytes_in),
+            _format(stage.lines_in),
+            _format(stage.bytes_out),
+            _format(stage.lines_out),
+            _format(stage.peak_memory),
+            _format(stage.return_code),
+        )
+        for stage in stats
+    ]
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    return "\n".join(
+        "  ".join(
+            cell.ljust(width) if i == 0 else cell.rjust(width)
+            for i, (cell, width) in enumerate(zip(row, widths))
+        ).rstrip()
+        for row in rows
+    )
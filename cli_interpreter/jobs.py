@@ -0,0 +1,90 @@
+import threading
+from concurrent.futures import Future
+
+
+class Job:
+    """
+    Фоновое задание: строка команд, запущенная с `&`
+    """
+
+    def __init__(self, job_id: int, command_line: str, future: Future):
+        """
+        :param job_id: номер задания в рамках сессии
+        :param command_line: строка команд, из которой создано задание
+        :param future: результат исполнения задания - код возврата
+        """
+        self.job_id = job_id
+        self.command_line = command_line
+        self.future = future
+
+    def is_done(self) -> bool:
+        return self.future.done()
+
+    def wait(self) -> int:
+        """
+        Дожидается завершения задания
+        :return: код возврата задания
+        """
+        return self.future.result()
+
+    def __str__(self):
+        if not self.is_done():
+            status = "Running"
+        elif self.wait() == 0:
+            status = "Done"
+        else:
+            status = f"Exit {self.wait()}"
+        return f"[{self.job_id}]  {status:<10} {self.command_line}"
+
+
+class JobTable:
+    """
+    Таблица фоновых заданий сессии
+    """
+
+    def __init__(self):
+        self._jobs: dict[int, Job] = {}
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def add(self, command_line: str, future: Future) -> Job:
+        """
+        Регистрирует новое задание
+        :return: зарегистрированное задание
+        """
+        with self._lock:
+            job = Job(self._next_id, command_line, future)
+            self._jobs[job.job_id] = job
+            self._next_id += 1
+            return job
+
+    def get(self, job_id: int) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def current(self) -> Job | None:
+        """
+        :return: последнее запущенное задание из оставшихся в таблице
+        """
+        with self._lock:
+            return self._jobs[max(self._jobs)] if self._jobs else None
+
+    def all(self) -> list[Job]:
+        with self._lock:
+            return [self._jobs[job_id] for job_id in sorted(self._jobs)]
+
+    def remove(self, job: Job) -> None:
+        with self._lock:
+            self._jobs.pop(job.job_id, None)
+            if not self._jobs:
+                self._next_id = 1
+
+    def pop_finished(self) -> list[Job]:
+        """
+        Удаляет из таблицы завершившиеся задания
+        :return: удаленные задания
+        """
+        finished = [job for job in self.all() if job.is_done()]
+        for job in finished:
+            self.remove(job)
+        return finished
@@ -0,0 +1,222 @@
+import functools
+import re
+from typing import AnyStr, Callable, Iterator
+
+from cli_interpreter.aho_corasick import AhoCorasick
+
+# Сколько скомпилированных шаблонов хранится в кэше сессии
+PATTERN_CACHE_SIZE: int = 256
+
+# Начиная с какого количества подстрок набор ищется автоматом Ахо-Корасик, а не регулярным выражением (см.
+# `combine_literals`). Автомат проверяет каждый символ циклом Python, поэтому выигрывает только на очень больших
+# наборах, где регулярное выражение долго компилируется (замер:
+# `CLI_THROUGHPUT_TESTS=1 pytest tests/test_matching.py -k benchmark -s`)
+AHO_CORASICK_MIN_PATTERNS: int = 10000
+
+# Символы, при наличии которых шаблон не может искаться как обычная подстрока
+_REGEX_METACHARACTERS = frozenset(".^$*+?{}[]\\|()")
+
+
+@functools.lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def compile_pattern(pattern: AnyStr, regex_flags: int) -> re.Pattern:
+    """
+    Компилирует регулярное выражение. Скомпилированные шаблоны кэшируются по паре (шаблон, флаги) на время
+    работы процесса, поэтому повторные запросы в сессии не компилируют шаблон заново
+    """
+    return re.compile(pattern, regex_flags)
+
+
+@functools.lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def build_automaton(patterns: tuple) -> AhoCorasick:
+    """
+    Строит автомат Ахо-Корасик для набора подстрок. Автоматы кэшируются так же, как скомпилированные шаблоны
+    """
+    return AhoCorasick(patterns)
+
+
+def combine_patterns(patterns: tuple) -> AnyStr:
+    """
+    Объединяет несколько регулярных выражений в одно, совпадающее там, где совпадает любое из них
+    """
+    if len(patterns) == 1:
+        return patterns[0]
+    if isinstance(patterns[0], bytes):
+        return b"|".join(b"(?:" + pattern + b")" for pattern in patterns)
+    return "|".join(f"(?:{pattern})" for pattern in patterns)
+
+
+def combine_literals(literals: tuple) -> AnyStr:
+    """
+    Объединяет набор подстрок в одно регулярное выражение в виде префиксного дерева: `ab(?:c|d)|x` вместо `abc|abd|x`.
+    Движок регулярных выражений проверяет альтернативы по очереди, поэтому плоская альтернатива сравнивает каждую
+    позицию текста со всеми подстроками, а дерево - только с подстроками, начало которых уже совпало
+    """
+    trie: dict = {}
+    for literal in literals:
+        node = trie
+        for i in range(len(literal)):
+            node = node.setdefault(literal[i:i + 1], {})
+        # Ключ `None` отмечает конец подстроки
+        node[None] = {}
+    return _trie_to_regex(trie, literals[0][:0])
+
+
+def _trie_to_regex(node: dict, empty: AnyStr) -> AnyStr:
+    """
+    :param node: узел префиксного дерева (символ -> дочерний узел, `None` - конец подстроки)
+    :param empty: пустая строка нужного типа (`""` или `b""`)
+    :return: регулярное выражение для подстрок поддерева
+    """
+    syntax = (lambda text: text) if isinstance(empty, str) else (lambda text: text.encode("ascii"))
+    branches = []
+    for key in sorted(key for key in node if key is not None):
+        # Цепочка узлов с единственным потомком записывается одной подстрокой
+        run, child = key, node[key]
+        while len(child) == 1 and None not in child:
+            (next_key, child), = child.items()
+            run += next_key
+        branches.append(re.escape(run) + _trie_to_regex(child, empty))
+    if not branches:
+        return empty
+    body = branches[0] if len(branches) == 1 else syntax("(?:") + syntax("|").join(branches) + syntax(")")
+    if None in node:
+        # Подстрока заканчивается в этом узле, поэтому продолжение необязательно
+        return syntax("(?:") + body + syntax(")?") if len(branches) == 1 else body + syntax("?")
+    return body
+
+
+def _compile_set(patterns: tuple, regex_flags: int) -> re.Pattern:
+    """
+    Компилирует набор шаблонов в одно регулярное выражение; набор подстрок - в виде префиксного дерева
+    """
+    if all(is_literal(pattern) for pattern in patterns):
+        try:
+            return compile_pattern(combine_literals(patterns), regex_flags)
+        except RecursionError:
+            # Слишком глубокое дерево (например, `a`, `aa`, `aaa`, ...): компилируем плоскую альтернативу
+            pass
+    return compile_pattern(combine_patterns(patterns), regex_flags)
+
+
+def is_literal(pattern: AnyStr) -> bool:
+    """
+    :return: `True`, если шаблон не содержит метасимволов регулярных выражений и совпадает только сам с собой
+    """
+    if isinstance(pattern, bytes):
+        pattern = pattern.decode("latin-1")
+    return not _REGEX_METACHARACTERS.intersection(pattern)
+
+
+def make_matcher(pattern: AnyStr | tuple, regex_flags: int) -> Callable[[AnyStr], bool]:
+    """
+    Создает функцию, проверяющую, есть ли в строке совпадение с шаблоном или с любым шаблоном из набора.
+    Шаблон без метасимволов и флагов ищется как подстрока, без участия движка регулярных выражений; очень большой
+    набор таких шаблонов - автоматом Ахо-Корасик; остальные наборы объединяются в одно регулярное выражение
+    (набор подстрок - в виде префиксного дерева, см. `combine_literals`)
+
+    :param pattern: регулярное выражение или кортеж выражений (строки или байты - в зависимости от того,
+        что будет проверяться)
+    :param regex_flags: флаги модуля `re`
+    :return: функция от строки, возвращающая `True`, если в строке найдено совпадение
+    """
+    patterns = pattern if isinstance(pattern, tuple) else (pattern,)
+    if not patterns:
+        # Пустой набор шаблонов (например, пустой файл `grep -f`) не совпадает ни с чем
+        return lambda line: False
+    if not regex_flags and all(is_literal(pattern) for pattern in patterns):
+        if len(patterns) == 1:
+            literal = patterns[0]
+            return lambda line: literal in line
+        if len(patterns) >= AHO_CORASICK_MIN_PATTERNS:
+            return build_automaton(patterns).search
+    search = _compile_set(patterns, regex_flags).search
+    return lambda line: search(line) is not None
+
+
+def to_bytes_patterns(patterns: tuple[str, ...], regex_flags: int) -> tuple[bytes, ...] | None:
+    """
+    Переводит набор шаблонов в байтовые (см. `to_bytes_pattern`)
+    :return: кортеж байтовых шаблонов или `None`, если хотя бы один шаблон небезопасен
+    """
+    converted = tuple(to_bytes_pattern(pattern, regex_flags) for pattern in patterns)
+    return None if None in converted else converted
+
+
+def to_bytes_pattern(pattern: str, regex_flags: int) -> bytes | None:
+    """
+    Переводит шаблон в байтовый, если поиск им в байтах UTF-8 дает те же строки, что и поиск исходным шаблоном в тексте.
+
+    Безопасны шаблоны без метасимволов (подстрока UTF-8 находится ровно там, где находится исходная подстрока) и
+    ASCII-шаблоны без конструкций, которые в байтах означают другое: `.` и `[^...]` (совпадают с отдельным байтом
+    многобайтового символа), экранирования вида `\\w`, `\\d`, `\\b` (в байтах учитывают только ASCII),
+    групп с флагами `(?...)` и без регистронезависимого поиска
+
+    :return: байтовый шаблон или `None`, если шаблон небезопасен
+    """
+    if regex_flags & ~re.MULTILINE or "\n" in pattern:
+        return None
+    if is_literal(pattern):
+        return pattern.encode("utf-8")
+    if not pattern.isascii() or "." in pattern or "[^" in pattern or "(?" in pattern:
+        return None
+    if re.search(r"\\[0-9A-Za-z]", pattern):
+        return None
+    return pattern.encode("ascii")
+
+
+def find_matching_lines(buffer, pattern: bytes | tuple[bytes, ...]) -> Iterator[bytes]:
+    """
+    Ищет совпадения по всему буферу сразу и возвращает строки, в которых они найдены.
+    Границы строки ищутся только вокруг найденного совпадения, поэтому строки без совпадений не копируются
+
+    :param buffer: буфер с содержимым файла (`bytes` или `mmap`)
+    :param pattern: байтовый шаблон или набор шаблонов, полученные `to_bytes_pattern`/`to_bytes_patterns`
+    :return: итератор по строкам с совпадениями без завершающего перевода строки
+    """
+    for line_start, line_end in find_matching_spans(buffer, pattern):
+        yield buffer[line_start:line_end]
+
+
+def find_matching_spans(buffer, pattern: bytes | tuple[bytes, ...]) -> Iterator[tuple[int, int]]:
+    """
+    То же, что `find_matching_lines`, но возвращает границы строк, а не сами строки
+    :return: итератор по парам `(начало строки, конец строки без перевода строки)`
+    """
+    find = _make_finder(pattern if isinstance(pattern, tuple) else (pattern,))
+    position = 0
+    size = len(buffer)
+    while position <= size:
+        start = find(buffer, position)
+        if start < 0:
+            return
+
+        line_start = buffer.rfind(b"\n", 0, start) + 1
+        line_end = buffer.find(b"\n", start)
+        if line_end < 0:
+            line_end = size
+        if line_start < size or line_start == 0:
+            yield line_start, line_end
+        position = line_end + 1
+
+
+def _make_finder(patterns: tuple[bytes, ...]) -> Callable:
+    """
+    :return: функция `find(buffer, position)`, возвращающая позицию внутри первого совпадения, начиная с `position`,
+        или -1, если совпадений нет
+    """
+    if not patterns:
+        return lambda buffer, position: -1
+    if all(is_literal(pattern) for pattern in patterns):
+        if len(patterns) == 1:
+            literal = patterns[0]
+            return lambda buffer, position: buffer.find(literal, position)
+        if len(patterns) >= AHO_CORASICK_MIN_PATTERNS:
+            return build_automaton(patterns).find
+
+    search = _compile_set(patterns, re.MULTILINE).search
+
+    def find(buffer, position: int) -> int:
+        match = search(buffer, position)
+        return -1 if match is None else match.start()
+
+    return find
@@ -0,0 +1,85 @@
+import os
+from collections import deque
+from concurrent.futures import Executor
+from typing import BinaryIO, Callable, Iterable, Iterator
+
+
+def imap_ordered(executor: Executor, func: Callable, items: Iterable, window: int, *args) -> Iterator:
+    """
+    Применяет функцию к элементам в пуле исполнителей, сохраняя порядок результатов.
+    Одновременно в работе находится не более `window` элементов, поэтому входной итератор
+    может быть сколь угодно длинным
+
+    :param executor: пул, в котором исполняется функция
+    :param func: функция `func(*args, item)`
+    :param items: элементы для обработки
+    :param window: максимальное количество элементов, обрабатываемых одновременно
+    :param args: дополнительные аргументы функции, передаваемые перед элементом
+    :return: итератор по парам `(item, result)` в порядке входных элементов
+    """
+    pending = deque()
+    for item in items:
+        pending.append((item, executor.submit(func, *args, item)))
+        if len(pending) >= window:
+            item, future = pending.popleft()
+            yield item, future.result()
+    while pending:
+        item, future = pending.popleft()
+        yield item, future.result()
+
+
+def batch_lines(lines: Iterable[str], batch_size: int) -> Iterator[list[str]]:
+    """
+    Группирует строки в пакеты суммарной длиной не менее `batch_size` символов
+
+    :param lines: итератор по строкам
+    :param batch_size: минимальная суммарная длина строк пакета (последний пакет может быть короче)
+    :return: итератор по пакетам строк
+    """
+    batch = []
+    size = 0
+    for line in lines:
+        batch.append(line)
+        size += len(line)
+        if size >= batch_size:
+            yield batch
+            batch = []
+            size = 0
+    if batch:
+        yield batch
+
+
+def split_file_ranges(file: BinaryIO, shard_size: int) -> list[tuple[int, int]]:
+    """
+    Делит файл на диапазоны байт размером около `shard_size`. Граница диапазона сдвигается вперед до ближайшего
+    перевода строки, поэтому каждая строка целиком попадает в один диапазон, и диапазоны можно обрабатывать
+    независимо (например, в разных процессах), а результаты - склеивать в порядке диапазонов
+
+    :param file: файл, открытый в двоичном режиме (позиция чтения файла меняется)
+    :param shard_size: желаемый размер диапазона в байтах
+    :return: список пар `(начало, конец)`, покрывающих файл целиком
+    """
+    size = os.fstat(file.fileno()).st_size
+    ranges = []
+    start = 0
+    while start < size:
+        end = start + shard_size
+        if end >= size:
+            end = size
+        else:
+            # Ищем перевод строки, начиная с последнего байта диапазона
+            end -= 1
+            file.seek(end)
+            while True:
+                chunk = file.read(64 * 1024)
+                if not chunk:
+                    end = size
+                    break
+                newline = chunk.find(b"\n")
+                if newline >= 0:
+                    end += newline + 1
+                    break
+                end += len(chunk)
+        ranges.append((start, end))
+        start = end
+    return ranges
@@ -1,14 +1,20 @@
 import re
 
 from cli_interpreter.commands.assign_command import AssignCommand
+from cli_interpreter.commands.cache_command import CacheCommand
 from cli_interpreter.commands.cat_command import CatCommand
 from cli_interpreter.commands.cd_command import CdCommand
 from cli_interpreter.commands.command import Command
 from cli_interpreter.commands.echo_command import EchoCommand
 from cli_interpreter.commands.exit_command import ExitCommand
+from cli_interpreter.commands.fg_command import FgCommand
 from cli_interpreter.commands.grep_command import GrepCommand
+from cli_interpreter.commands.index_command import IndexCommand
+from cli_interpreter.commands.jobs_command import JobsCommand
+from cli_interpreter.commands.pipeline_command import PipelineCommand
 from cli_interpreter.commands.pwd_command import PwdCommand
 from cli_interpreter.commands.unknown_command import UnknownCommand
+from cli_interpreter.commands.wait_command import WaitCommand
 from cli_interpreter.commands.wc_command import WcCommand
 from cli_interpreter.commands.ls_command import LsCommand
 from cli_interpreter.context import CliContext
@@ -50,6 +56,45 @@ class UserInputParser:
 
         return commands
 
+    @staticmethod
+    def split_background(input_string: str) -> (str, bool):
+        """
+        Отделяет от строки завершающий оператор фонового исполнения `&`, если он стоит вне кавычек
+
+        :param input_string: строка, введенная пользователем
+        :return: строка без оператора `&` и признак того, что её нужно исполнить в фоне
+        """
+        in_single_quote = False
+        in_double_quote = False
+        for ch in input_string:
+            if ch == "'" and not in_double_quote:
+                in_single_quote = not in_single_quote
+            elif ch == '"' and not in_single_quote:
+                in_double_quote = not in_double_quote
+
+        stripped = input_string.rstrip()
+        if stripped.endswith("&") and not in_single_quote and not in_double_quote:
+            return stripped[:-1], True
+        return input_string, False
+
+    @staticmethod
+    def split_time_prefix(input_string: str) -> (str, bool, bool):
+        """
+        Отделяет от строки префикс `time` (или `time -m`), запрашивающий статистику исполнения каждой стадии pipeline
+
+        :param input_string: строка, введенная пользователем
+        :return: строка без префикса, признак того, что статистику нужно вывести, и признак замера пиковой памяти
+            встроенных команд (ключ `-m`)
+        """
+        stripped = input_string.lstrip()
+        if stripped != "time" and not stripped.startswith(("time ", "time\t")):
+            return input_string, False, False
+        rest = stripped[len("time"):]
+        option = rest.lstrip()
+        if option == "-m" or option.startswith(("-m ", "-m\t")):
+            return option[len("-m"):], True, True
+        return rest, True, False
+
     @staticmethod
     def __tokenize_command(command_string: str) -> list[str]:
         """
@@ -202,6 +247,18 @@ class UserInputParser:
             return CdCommand(self.__strip_quotes(command_args), self.__context)
         elif command_name == "ls":
             return LsCommand(self.__strip_quotes(command_args), self.__context)
+        elif command_name == "jobs":
+            return JobsCommand(self.__strip_quotes(command_args), self.__context)
+        elif command_name == "wait":
+            return WaitCommand(self.__strip_quotes(command_args), self.__context)
+        elif command_name == "fg":
+            return FgCommand(self.__strip_quotes(command_args), self.__context)
+        elif command_name == "index":
+            return IndexCommand(self.__strip_quotes(command_args), self.__context)
+        elif command_name == "cache":
+            return CacheCommand(self.__strip_quotes(command_args), self.__context)
+        elif command_name == "pipeline":
+            return PipelineCommand(self.__strip_quotes(command_args), self.__context)
 
         return UnknownCommand(args=tokens, context=self.__context)  # Передадим все токены на исполнение ОС
 
@@ -0,0 +1,615 @@
+import codecs
+import errno
+import io
+import os
+import stat
+import sys
+import tempfile
+import threading
+from collections import deque
+from typing import BinaryIO, Iterator, TextIO
+
+# Размер фрагмента, которым данные по умолчанию читаются из потоков
+CHUNK_SIZE: int = 64 * 1024
+
+# Сколько байт промежуточного буфера последовательного режима хранится в памяти до переноса во временный файл
+BUFFER_MEMORY_LIMIT: int = 64 * 1024 * 1024
+
+# Сколько байт копируется силами ядра (`os.sendfile`, `os.copy_file_range`) за один системный вызов
+KERNEL_COPY_SIZE: int = 8 * 1024 * 1024
+
+
+class _Channel:
+    """
+    Ограниченная по размеру очередь фрагментов данных, разделяемая концами канала `PipeReader` и `PipeWriter`
+    """
+
+    def __init__(self, capacity: int, counted: bool = False):
+        """
+        :param capacity: максимальный суммарный размер фрагментов, которые могут находиться в очереди одновременно
+        :param counted: если `True`, канал считает количество переданных через него байт и строк
+        """
+        self._capacity = capacity
+        self._counted = counted
+        self.bytes_put = self.lines_put = self.bytes_got = self.lines_got = 0
+        self._chunks: deque = deque()
+        self._size = 0
+        self._cond = threading.Condition()
+        self._write_closed = False
+        self._read_closed = False
+
+    def put(self, chunk) -> None:
+        """
+        Кладет фрагмент в очередь, блокируясь, пока в очереди нет места.
+        Если читающий конец уже закрыт, выбрасывает `BrokenPipeError`
+        """
+        with self._cond:
+            while self._size >= self._capacity and not self._read_closed:
+                self._cond.wait()
+            if self._read_closed:
+                raise BrokenPipeError("pipe reader is closed")
+            self._chunks.append(chunk)
+            self._size += len(chunk)
+            if self._counted:
+                num_bytes, num_lines = self.__measure(chunk)
+                self.bytes_put += num_bytes
+                self.lines_put += num_lines
+            self._cond.notify_all()
+
+    def get(self):
+        """
+        Достает очередной фрагмент из очереди, блокируясь, пока очередь пуста.
+        :return: фрагмент данных или `None`, если один из концов закрыт и данных больше не будет
+        """
+        with self._cond:
+            while not self._chunks and not self._write_closed and not self._read_closed:
+                self._cond.wait()
+            if not self._chunks:
+                return None
+            chunk = self._chunks.popleft()
+            self._size -= len(chunk)
+            if self._counted:
+                num_bytes, num_lines = self.__measure(chunk)
+                self.bytes_got += num_bytes
+                self.lines_got += num_lines
+            self._cond.notify_all()
+            return chunk
+
+    @staticmethod
+    def __measure(chunk) -> (int, int):
+        """
+        :return: размер фрагмента в байтах и количество переводов строки в нем
+        """
+        if isinstance(chunk, str):
+            return len(chunk.encode("utf-8")), chunk.count("\n")
+        chunk = bytes(chunk) if isinstance(chunk, memoryview) else chunk
+        return len(chunk), chunk.count(b"\n")
+
+    def close_write(self) -> None:
+        with self._cond:
+            self._write_closed = True
+            self._cond.notify_all()
+
+    def close_read(self) -> None:
+        with self._cond:
+            self._read_closed = True
+            self._chunks.clear()
+            self._size = 0
+            self._cond.notify_all()
+
+    @property
+    def read_closed(self) -> bool:
+        return self._read_closed
+
+    @property
+    def buffered(self) -> int:
+        """Суммарный размер фрагментов, ожидающих чтения"""
+        with self._cond:
+            return self._size
+
+
+class PipeReader:
+    """
+    Читающий конец канала. Повторяет интерфейс текстового потока ввода (`read`, `readline`, итерация по строкам),
+    а также позволяет читать данные без декодирования фрагментами байт (`read_chunks`).
+
+    Через канал могут передаваться как строки, так и байты (`bytes`, `bytearray`, `memoryview`). Байтовые фрагменты
+    декодируются из UTF-8 только при чтении в текстовом режиме
+    """
+
+    def __init__(self, channel: _Channel):
+        self._channel = channel
+        # Прочитанный из канала текст; символы до `_position` уже отданы читателю. Буфер сжимается только при
+        # дочитывании, поэтому чтение строки стоит пропорционально ее длине, а не остатку фрагмента
+        self._pending = ""
+        self._position = 0
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._eof = False
+        self.closed = False
+
+    def readable(self) -> bool:
+        return True
+
+    def _next_text(self) -> str | None:
+        """
+        Достает из канала очередной фрагмент в виде строки
+        :return: строка или `None`, если данных больше не будет
+        """
+        while not self._eof:
+            chunk = self._channel.get()
+            if chunk is None:
+                self._eof = True
+                return self._decoder.decode(b"", final=True)
+            if isinstance(chunk, str):
+                return chunk
+            text = self._decoder.decode(chunk)
+            if text:
+                return text
+        return None
+
+    def _fill(self) -> bool:
+        """
+        Дочитывает из канала очередной фрагмент в буфер
+        :return: `False`, если данных больше не будет
+        """
+        text = self._next_text()
+        if text is None:
+            return False
+        self._pending = self._pending[self._position:] + text
+        self._position = 0
+        return True
+
+    def _take(self, end: int) -> str:
+        """
+        Отдает символы буфера от текущей позиции до `end`
+        """
+        result = self._pending[self._position:end]
+        if end == len(self._pending):
+            self._pending, self._position = "", 0
+        else:
+            self._position = end
+        return result
+
+    def read(self, size: int = -1) -> str:
+        """
+        Читает не более `size` символов; при `size < 0` читает все данные до закрытия пишущего конца
+        """
+        if size is None or size < 0:
+            parts = [self._take(len(self._pending))]
+            while (text := self._next_text()) is not None:
+                parts.append(text)
+            return "".join(parts)
+
+        while len(self._pending) - self._position < size and self._fill():
+            pass
+        return self._take(min(self._position + size, len(self._pending)))
+
+    def read_chunks(self) -> Iterator[bytes | bytearray | memoryview]:
+        """
+        Отдает оставшиеся в канале данные фрагментами байт в том виде, в котором они были записаны.
+        Строковые фрагменты кодируются в UTF-8
+        """
+        pending = self._take(len(self._pending)).encode("utf-8") + self._decoder.getstate()[0]
+        self._decoder.reset()
+        if pending:
+            yield pending
+        while not self._eof:
+            chunk = self._channel.get()
+            if chunk is None:
+                self._eof = True
+            elif isinstance(chunk, str):
+                yield chunk.encode("utf-8")
+            else:
+                yield chunk
+
+    def readline(self) -> str:
+        """
+        Читает одну строку вместе с завершающим переводом строки
+        """
+        start = self._position
+        while True:
+            index = self._pending.find("\n", start)
+            if index >= 0:
+                return self._take(index + 1)
+            # После дочитывания непрочитанный остаток начинается с начала буфера
+            start = len(self._pending) - self._position
+            if not self._fill():
+                return self._take(len(self._pending))
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        line = self.readline()
+        if not line:
+            raise StopIteration
+        return line
+
+    @property
+    def counters(self) -> (int, int, int, int):
+        """
+        Счетчики канала, созданного с `counted=True`
+        :return: количество записанных в канал байт и строк, количество прочитанных из канала байт и строк
+        """
+        channel = self._channel
+        return channel.bytes_put, channel.lines_put, channel.bytes_got, channel.lines_got
+
+    def close(self) -> None:
+        """
+        Закрывает читающий конец: пишущий конец больше не будет блокироваться и получит `BrokenPipeError`
+        """
+        if not self.closed:
+            self.closed = True
+            self._channel.close_read()
+
+
+class PipeWriter:
+    """
+    Пишущий конец канала. Повторяет интерфейс потока вывода (`write`, `flush`) и принимает как строки, так и байты.
+    Байтовые фрагменты передаются читающему концу без копирования, поэтому записанный буфер не должен изменяться
+    """
+
+    def __init__(self, channel: _Channel):
+        self._channel = channel
+        self.closed = False
+
+    def writable(self) -> bool:
+        return True
+
+    @property
+    def reader_closed(self) -> bool:
+        """
+        `True`, если читающий конец закрыт: следующая команда завершилась и больше не нуждается во вводе
+        """
+        return self._channel.read_closed
+
+    def write(self, data: str | bytes | bytearray | memoryview) -> int:
+        if self.closed:
+            raise ValueError("write to closed pipe")
+        if data:
+            self._channel.put(data)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        """
+        Закрывает пишущий конец: читающий конец получит конец данных после того, как вычитает очередь
+        """
+        if not self.closed:
+            self.closed = True
+            self._channel.close_write()
+
+
+def make_pipe(capacity: int, counted: bool = False) -> (PipeReader, PipeWriter):
+    """
+    Создает канал с ограниченным буфером для передачи данных между одновременно работающими командами
+
+    :param capacity: максимальное количество символов, которое может находиться в канале одновременно
+    :param counted: если `True`, канал считает переданные байты и строки (см. `PipeReader.counters`)
+    :return: пара из читающего и пишущего концов канала
+    """
+    channel = _Channel(capacity, counted)
+    return PipeReader(channel), PipeWriter(channel)
+
+
+class BufferStats:
+    """
+    Счетчики использования промежуточных буферов `SpillBuffer`
+    """
+
+    def __init__(self):
+        self.buffers: int = 0
+        self.bytes_written: int = 0
+        self.spills: int = 0
+        self.bytes_spilled: int = 0
+        self.peak_memory_bytes: int = 0
+
+    def __str__(self):
+        return (
+            f"buffers={self.buffers} bytes_written={self.bytes_written} spills={self.spills} "
+            f"bytes_spilled={self.bytes_spilled} peak_memory_bytes={self.peak_memory_bytes}"
+        )
+
+
+class PipelineSettings:
+    """
+    Настройки исполнения pipeline сессии, которые можно менять командой `pipeline`, и накопленная
+    в этом режиме статистика промежуточных буферов
+    """
+
+    def __init__(self, concurrent: bool = True, buffer_memory_limit: int = BUFFER_MEMORY_LIMIT):
+        """
+        :param concurrent: если `True`, команды pipeline работают одновременно и обмениваются данными через каналы;
+            иначе исполняются по очереди через промежуточные буферы `SpillBuffer`
+        :param buffer_memory_limit: ограничение памяти промежуточного буфера последовательного режима
+        """
+        self.concurrent = concurrent
+        self.buffer_memory_limit = buffer_memory_limit
+        self.buffer_stats = BufferStats()
+
+
+class SpillBuffer:
+    """
+    Промежуточный буфер для последовательного исполнения pipeline с ограничением на занимаемую память.
+
+    Пока объем записанных данных не превышает `memory_limit`, данные хранятся в памяти; после этого буфер прозрачно
+    переносит их во временный файл и дописывает туда. После `seek(0)` буфер читается как текстовый поток
+    (`read`, `readline`, итерация по строкам), а через атрибут `buffer` - как двоичный, фрагментами
+    """
+
+    def __init__(self, memory_limit: int, stats: BufferStats = None):
+        """
+        :param memory_limit: максимальный объем данных в байтах, хранимых в памяти
+        :param stats: счетчики, в которые буфер записывает статистику использования
+        """
+        self._memory_limit = memory_limit
+        self._stats = stats if stats is not None else BufferStats()
+        self._chunks: list[bytes] = []
+        self._size = 0
+        self._file = None
+        self._reader: io.TextIOWrapper | None = None
+        self.closed = False
+        self._stats.buffers += 1
+
+    @property
+    def spilled(self) -> bool:
+        """`True`, если данные буфера перенесены во временный файл"""
+        return self._file is not None
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: str | bytes | bytearray | memoryview) -> int:
+        chunk = data.encode("utf-8") if isinstance(data, str) else bytes(data)
+        self._stats.bytes_written += len(chunk)
+        if self._file is None and self._size + len(chunk) > self._memory_limit:
+            self.__spill()
+        if self._file is not None:
+            self._file.write(chunk)
+            self._stats.bytes_spilled += len(chunk)
+        else:
+            self._chunks.append(chunk)
+            self._size += len(chunk)
+            self._stats.peak_memory_bytes = max(self._stats.peak_memory_bytes, self._size)
+        return len(data)
+
+    def __spill(self) -> None:
+        """Переносит накопленные в памяти данные во временный файл"""
+        self._file = tempfile.TemporaryFile()
+        for chunk in self._chunks:
+            self._file.write(chunk)
+        self._stats.spills += 1
+        self._stats.bytes_spilled += self._size
+        self._chunks = []
+        self._size = 0
+
+    def flush(self) -> None:
+        if self._file is not None:
+            self._file.flush()
+
+    def seek(self, offset: int) -> int:
+        """
+        Переводит буфер в режим чтения с начала. Поддерживается только `offset = 0`
+        """
+        if offset != 0:
+            raise ValueError("SpillBuffer supports only seek(0)")
+        if self._file is not None:
+            self._file.seek(0)
+            binary = self._file
+        else:
+            binary = io.BytesIO(b"".join(self._chunks))
+            self._chunks = []
+        self._reader = io.TextIOWrapper(binary, encoding="utf-8", newline="\n")
+        return 0
+
+    @property
+    def buffer(self):
+        """Двоичный поток для чтения данных буфера без декодирования"""
+        return self._reader.buffer
+
+    def readable(self) -> bool:
+        return self._reader is not None
+
+    def read(self, size: int = -1) -> str:
+        return self._reader.read(size)
+
+    def readline(self) -> str:
+        return self._reader.readline()
+
+    def __iter__(self):
+        return iter(self._reader)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        if self._reader is not None:
+            self._reader.close()
+        elif self._file is not None:
+            self._file.close()
+        self._chunks = []
+
+
+class FileSegment:
+    """
+    Фрагмент вывода - остаток открытого файла начиная с текущей позиции.
+
+    Команда, которая выводит содержимое файла без изменений, отдает `FileSegment` вместо прочитанных байт, и
+    `OutputSink` сам выбирает способ копирования: если поток вывода связан с файловым дескриптором, данные копируются
+    силами ядра, не попадая в память интерпретатора; иначе файл читается фрагментами
+    """
+
+    def __init__(self, file: BinaryIO, buffer_size: int = CHUNK_SIZE):
+        """
+        :param file: файл, открытый в двоичном режиме
+        :param buffer_size: размер фрагмента, которым файл читается, если его нельзя скопировать силами ядра
+        """
+        self.file = file
+        self.buffer_size = buffer_size
+
+    def copy_to_fd(self, fd: int) -> bool:
+        """
+        Копирует остаток файла в файловый дескриптор силами ядра: в обычный файл - `os.copy_file_range`,
+        в остальные (терминал, канал, сокет) - `os.sendfile`. Позиция файла сдвигается на скопированные байты
+        :return: `False`, если ядро не поддерживает копирование между такими дескрипторами и остаток файла нужно
+            скопировать чтением и записью
+        """
+        copy_functions = []
+        if hasattr(os, "copy_file_range") and stat.S_ISREG(os.fstat(fd).st_mode):
+            copy_functions.append(lambda in_fd, offset: os.copy_file_range(in_fd, fd, KERNEL_COPY_SIZE, offset))
+        if hasattr(os, "sendfile"):
+            copy_functions.append(lambda in_fd, offset: os.sendfile(fd, in_fd, offset, KERNEL_COPY_SIZE))
+
+        in_fd = self.file.fileno()
+        offset = self.file.tell()
+        try:
+            for copy in copy_functions:
+                try:
+                    while sent := copy(in_fd, offset):
+                        offset += sent
+                    return True
+                except OSError as e:
+                    if isinstance(e, BrokenPipeError) or e.errno == errno.EPIPE:
+                        raise
+                    # Например, `EXDEV`, `EINVAL` для дескриптора с `O_APPEND`: пробуем следующий способ
+                    # с того места, до которого дошло копирование
+            return False
+        finally:
+            self.file.seek(offset)
+
+    def read_chunks(self, reuse_buffer: bool) -> Iterator[bytes | memoryview]:
+        """
+        Читает остаток файла фрагментами
+        :param reuse_buffer: читать все фрагменты в один и тот же буфер (`readinto`); допустимо, только если
+            получатель копирует фрагмент до того, как запросит следующий
+        """
+        if not reuse_buffer:
+            while chunk := self.file.read(self.buffer_size):
+                yield chunk
+            return
+
+        buffer = bytearray(self.buffer_size)
+        view = memoryview(buffer)
+        while size := self.file.readinto(buffer):
+            yield view[:size]
+
+
+class OutputSink:
+    """
+    Пишет в поток вывода фрагменты вывода команды - строки, байты или остаток файла `FileSegment`.
+
+    В канал `PipeWriter` и буфер `SpillBuffer` фрагменты передаются как есть. Байты, адресованные текстовому потоку, записываются
+    в его двоичный буфер (`sys.stdout.buffer`), если он есть, либо декодируются из UTF-8.
+    Запоминает, завершается ли записанный вывод переводом строки (см. `needs_trailing_newline`)
+    """
+
+    def __init__(self, output_stream: TextIO = None):
+        """
+        :param output_stream: поток вывода; если не задан, используется стандартный поток вывода
+        """
+        self._stream = output_stream if output_stream else sys.stdout
+        self._decoder = None
+        # Был ли последний фрагмент вывода текстом и остался ли вывод без завершающего перевода строки
+        self.__text_output = False
+        self.__line_open = False
+
+    def write(self, chunk: str | bytes | bytearray | memoryview | FileSegment) -> None:
+        if isinstance(chunk, FileSegment):
+            self.__write_file(chunk)
+            return
+        if not chunk:
+            if isinstance(chunk, str):
+                # Пустая текстовая строка - тоже вывод: например, `echo` без аргументов выводит пустую строку
+                self.__text_output, self.__line_open = True, True
+            return
+        if isinstance(chunk, str) or isinstance(self._stream, (PipeWriter, SpillBuffer)):
+            self._stream.write(chunk)
+        elif hasattr(self._stream, "buffer"):
+            self._stream.flush()
+            self._stream.buffer.write(chunk)
+        else:
+            if self._decoder is None:
+                self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            self._stream.write(self._decoder.decode(chunk))
+        self.__text_output = isinstance(chunk, str)
+        self.__line_open = chunk[-1:] not in ("\n", b"\n")
+
+    def __write_file(self, segment: FileSegment) -> None:
+        """
+        Копирует остаток файла в поток вывода: силами ядра, если поток связан с файловым дескриптором,
+        иначе фрагментами. Канал `PipeWriter` хранит записанные в него фрагменты, поэтому для него каждый фрагмент
+        читается в новый буфер; остальные потоки копируют фрагмент при записи, и буфер переиспользуется
+        """
+        fd = self.__target_fd()
+        start = segment.file.tell()
+        if fd is not None and segment.copy_to_fd(fd):
+            end = segment.file.tell()
+            if end > start:
+                self.__text_output = False
+                self.__line_open = os.pread(segment.file.fileno(), 1, end - 1) != b"\n"
+            return
+        for chunk in segment.read_chunks(reuse_buffer=not isinstance(self._stream, PipeWriter)):
+            self.write(chunk)
+
+    def __target_fd(self) -> int | None:
+        """
+        :return: файловый дескриптор потока вывода (после сброса его буферов) или `None`, если поток с ним не связан
+        """
+        if isinstance(self._stream, (PipeWriter, SpillBuffer)):
+            return None
+        try:
+            fd = self._stream.fileno()
+        except (AttributeError, OSError, ValueError):
+            return None
+        # Уже записанный через буферы потока вывод должен попасть в дескриптор раньше копируемого файла
+        self._stream.flush()
+        if hasattr(self._stream, "buffer"):
+            self._stream.buffer.flush()
+        return fd
+
+    def needs_trailing_newline(self) -> bool:
+        """
+        Текстовый вывод, не завершающийся переводом строки, дополняется им всегда. Байты (например, содержимое файла
+        у `cat`) передаются дальше по pipeline и в файлы без изменений, а дополняются только при выводе в терминал,
+        чтобы следующий вывод и приглашение ввода начинались с новой строки
+        :return: `True`, если вывод нужно дополнить переводом строки; команда без вывода его не дополняет
+        """
+        return self.__line_open and (self.__text_output or self.__is_terminal())
+
+    def __is_terminal(self) -> bool:
+        if isinstance(self._stream, (PipeWriter, SpillBuffer)):
+            return False
+        try:
+            return self._stream.isatty()
+        except (AttributeError, OSError, ValueError):
+            return False
+
+    def flush(self) -> None:
+        if self._decoder is not None:
+            self._stream.write(self._decoder.decode(b"", final=True))
+        if hasattr(self._stream, "buffer"):
+            self._stream.flush()
+            self._stream.buffer.flush()
+        else:
+            self._stream.flush()
+
+
+def read_chunks(input_stream, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes | bytearray | memoryview]:
+    """
+    Читает поток ввода фрагментами байт, не декодируя их
+
+    :param input_stream: канал `PipeReader`, текстовый или двоичный поток
+    :param chunk_size: размер фрагмента для потоков, отличных от канала
+    :return: итератор по фрагментам данных
+    """
+    if isinstance(input_stream, PipeReader):
+        yield from input_stream.read_chunks()
+        return
+
+    if hasattr(input_stream, "buffer"):
+        input_stream = input_stream.buffer
+    read = getattr(input_stream, "read1", input_stream.read)
+    while chunk := read(chunk_size):
+        yield chunk.encode("utf-8") if isinstance(chunk, str) else chunk
@@ -0,0 +1,264 @@
+import bz2
+import codecs
+import gzip
+import io
+import lzma
+import mmap
+import os
+import stat
+import zlib
+from typing import BinaryIO, Callable, Iterator
+
+from cli_interpreter.pipe import FileSegment
+
+# Размер буфера, которым файлы читаются последовательно
+READ_BUFFER_SIZE: int = 256 * 1024
+
+# Файлы не меньше этого размера при чтении целиком отображаются в память, а не читаются
+MMAP_THRESHOLD: int = 1024 * 1024
+
+# Кодировка и политика обработки ошибок декодирования текста файлов
+DEFAULT_ENCODING: str = "utf-8"
+DEFAULT_ERRORS: str = "replace"
+
+# Сигнатуры сжатых файлов (первые байты файла) и функции, открывающие их распакованное содержимое как поток.
+# У bzip2 кроме `BZh` и размера блока проверяется сигнатура первого блока (или конца потока), чтобы текст,
+# начинающийся с `BZh`, не принимался за сжатый файл
+_DECOMPRESSORS: dict[str, tuple[tuple[bytes, ...], Callable[[BinaryIO], BinaryIO]]] = {
+    "gzip": ((b"\x1f\x8b\x08",), lambda file: gzip.GzipFile(fileobj=file, mode="rb")),
+    "bz2": (
+        tuple(b"BZh%d" % level + block for level in range(1, 10) for block in (b"1AY&SY", b"\x17rE8P\x90")),
+        lambda file: bz2.BZ2File(file, mode="rb"),
+    ),
+    "xz": ((b"\xfd7zXZ\x00",), lambda file: lzma.LZMAFile(file, mode="rb")),
+}
+
+
+def _detect_compression(fd: int) -> str | None:
+    """
+    Определяет формат сжатия обычного файла по первым байтам, не сдвигая позицию чтения
+    :return: формат сжатия (ключ `_DECOMPRESSORS`) или `None`, если файл не сжат
+    """
+    header = os.pread(fd, 16, 0)
+    for compression, (signatures, _) in _DECOMPRESSORS.items():
+        if header.startswith(signatures):
+            return compression
+    return None
+
+
+class _DecompressedFile(io.RawIOBase):
+    """
+    Распакованное содержимое сжатого файла, которое читается так же, как несжатый файл: `readinto` распаковывает
+    очередной фрагмент, поэтому память не зависит от размера файла. Ошибки распаковки (поврежденные
+    или обрезанные данные) сообщаются как `OSError`, как и ошибки чтения файла
+    """
+
+    def __init__(self, stream: BinaryIO):
+        """
+        :param stream: поток распакованных данных (`gzip.GzipFile`, `bz2.BZ2File`, `lzma.LZMAFile`)
+        """
+        super().__init__()
+        self.__stream = stream
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        try:
+            return self.__stream.readinto(buffer)
+        except (EOFError, lzma.LZMAError, zlib.error) as e:
+            raise OSError(f"invalid compressed data: {e}") from e
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return self.__stream.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self.__stream.tell()
+
+    def close(self) -> None:
+        self.__stream.close()
+        super().close()
+
+
+class FileReader:
+    """
+    Чтение файла встроенными командами. Все файлы, которые читают `cat`, `wc` и `grep`, открываются через него,
+    поэтому способ чтения настраивается в одном месте:
+        - файл открывается в двоичном режиме без буферизации Python, и ядру сообщается, что файл будет читаться
+          последовательно (`posix_fadvise(POSIX_FADV_SEQUENTIAL)`: ядро читает файл с упреждением большими блоками);
+        - фрагменты читаются `readinto` в один переиспользуемый буфер;
+        - содержимое файла целиком отдается как `bytes`, а начиная с `mmap_threshold` байт - как отображение в память;
+        - текст декодируется в заданной кодировке с заданной политикой ошибок, переводы строк `\\r\\n` и `\\r`
+          приводятся к `\\n`, как при чтении файла в текстовом режиме;
+        - сжатый обычный файл (gzip, bzip2, xz - определяется по первым байтам, а не по расширению) читается
+          распакованным: данные распаковываются по мере чтения, поэтому память не зависит от размера файла.
+          Такой файл нельзя делить на диапазоны, отображать в память и копировать силами ядра (см. `is_plain_file`).
+
+    Используется как контекстный менеджер: при выходе закрываются файл и его отображение в память
+    """
+
+    def __init__(
+            self,
+            path: str,
+            buffer_size: int = READ_BUFFER_SIZE,
+            mmap_threshold: int = MMAP_THRESHOLD,
+            encoding: str = DEFAULT_ENCODING,
+            errors: str = DEFAULT_ERRORS,
+            decompress: bool = True,
+    ):
+        """
+        :param path: путь к файлу
+        :param buffer_size: размер буфера последовательного чтения
+        :param mmap_threshold: размер файла, начиная с которого `content` отображает файл в память
+        :param encoding: кодировка текста файла
+        :param errors: политика обработки ошибок декодирования (как у `bytes.decode`)
+        :param decompress: читать сжатый файл распакованным
+        """
+        self.path = path
+        self.buffer_size = buffer_size
+        self.mmap_threshold = mmap_threshold
+        self.encoding = encoding
+        self.errors = errors
+        self.file = open(path, "rb", buffering=0)
+        self.__mapping: mmap.mmap | None = None
+        try:
+            self.status = os.fstat(self.file.fileno())
+            self.compression = _detect_compression(self.file.fileno()) if decompress and self.is_regular else None
+        except OSError:
+            self.file.close()
+            raise
+        self.__stream: BinaryIO = self.file
+        if self.compression is not None:
+            self.__stream = _DecompressedFile(_DECOMPRESSORS[self.compression][1](self.file))
+        if self.is_regular and hasattr(os, "posix_fadvise"):
+            try:
+                os.posix_fadvise(self.file.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            except OSError:
+                pass
+
+    def __enter__(self) -> "FileReader":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self.__mapping is not None:
+            self.__mapping.close()
+            self.__mapping = None
+        self.__stream.close()
+        self.file.close()
+
+    @property
+    def is_regular(self) -> bool:
+        return stat.S_ISREG(self.status.st_mode)
+
+    @property
+    def is_plain_file(self) -> bool:
+        """
+        :return: `True`, если файл обычный и несжатый: его байты - это его содержимое, поэтому файл можно делить
+            на диапазоны, отображать в память, кэшировать по размеру и копировать силами ядра
+        """
+        return self.is_regular and self.compression is None
+
+    @property
+    def size(self) -> int:
+        """
+        :return: размер файла на диске (для сжатого файла - размер сжатых данных)
+        """
+        return self.status.st_size
+
+    @property
+    def is_utf8(self) -> bool:
+        """
+        :return: `True`, если текст файла декодируется как UTF-8: тогда в байтах файла можно искать
+            байтовыми шаблонами (см. `to_bytes_patterns`)
+        """
+        return codecs.lookup(self.encoding).name == "utf-8"
+
+    def chunks(self, start: int = 0, end: int | None = None, reuse_buffer: bool = True) -> Iterator[memoryview]:
+        """
+        Читает файл (или диапазон байт файла) фрагментами в один переиспользуемый буфер.
+        Фрагмент действителен только до запроса следующего: получатель должен обработать или скопировать его сразу
+
+        :param start: позиция начала чтения
+        :param end: позиция конца чтения или `None`, чтобы читать до конца файла
+        :param reuse_buffer: `False`, если получатель хранит фрагменты (например, передает их в канал pipeline):
+            тогда каждый фрагмент читается в новый буфер
+        :return: итератор по фрагментам
+        """
+        view = memoryview(bytearray(self.buffer_size))
+        self.__stream.seek(start)
+        remaining = None if end is None else end - start
+        while remaining is None or remaining > 0:
+            if not reuse_buffer:
+                view = memoryview(bytearray(self.buffer_size))
+            target = view if remaining is None or remaining >= len(view) else view[:remaining]
+            size = self.__stream.readinto(target)
+            if not size:
+                return
+            if remaining is not None:
+                remaining -= size
+            yield view[:size]
+
+    def read_range(self, start: int, end: int) -> bytearray:
+        """
+        Читает диапазон байт файла в один буфер без промежуточных копий
+        :return: байты файла с позиции `start` до позиции `end` (меньше, если файл короче)
+        """
+        data = bytearray(end - start)
+        with memoryview(data) as view:
+            self.__stream.seek(start)
+            filled = 0
+            while filled < len(data) and (size := self.__stream.readinto(view[filled:])):
+                filled += size
+        del data[filled:]
+        return data
+
+    def read_all(self) -> bytes:
+        """
+        :return: все содержимое файла начиная с текущей позиции
+        """
+        return self.__stream.readall()
+
+    def content(self) -> bytes | mmap.mmap:
+        """
+        :return: содержимое файла целиком: отображение в память для обычных несжатых файлов от `mmap_threshold` байт,
+            иначе прочитанные байты
+        """
+        if self.is_plain_file and self.size >= max(self.mmap_threshold, 1):
+            try:
+                self.__mapping = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+                return self.__mapping
+            except (OSError, ValueError):
+                pass
+        self.__stream.seek(0)
+        return self.read_all()
+
+    def lines(self) -> Iterator[str]:
+        """
+        :return: итератор по строкам текста файла (вместе с переводом строки)
+        """
+        self.__stream.seek(0)
+        return io.TextIOWrapper(
+            io.BufferedReader(self.__stream, self.buffer_size), encoding=self.encoding, errors=self.errors, newline=None
+        )
+
+    def decode_lines(self, content: bytes) -> Iterator[str]:
+        """
+        Декодирует уже прочитанное содержимое файла (например, из кэша сессии) так же, как `lines`: по мере чтения
+        строк, поэтому ранняя остановка поиска не декодирует остаток
+        :return: итератор по строкам текста (вместе с переводом строки)
+        """
+        return io.TextIOWrapper(io.BytesIO(content), encoding=self.encoding, errors=self.errors, newline=None)
+
+    def segment(self) -> FileSegment:
+        """
+        :return: остаток несжатого файла для копирования в поток вывода (см. `FileSegment`)
+        """
+        if self.compression is not None:
+            raise ValueError("сжатый файл нельзя копировать силами ядра")
+        return FileSegment(self.file, self.buffer_size)
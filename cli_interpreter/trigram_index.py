@@ -0,0 +1,329 @@
+import functools
+import json
+import os
+import re
+import stat
+import time
+
+from cli_interpreter.reader import FileReader
+
+# Имя файла индекса в корне проиндексированной директории
+INDEX_FILENAME: str = ".cli_trigram_index.json"
+
+# Файлы больше этого размера не индексируются и всегда считаются кандидатами на поиск
+MAX_FILE_SIZE: int = 64 * 1024 * 1024
+
+# Сколько загруженных индексов хранится в памяти сессии
+INDEX_CACHE_SIZE: int = 8
+
+
+class TrigramIndex:
+    """
+    Триграммный индекс файлов директории.
+
+    Для каждого файла хранятся его размер и время изменения, а для каждой триграммы (трех подряд идущих байт
+    содержимого, ASCII-буквы приводятся к нижнему регистру) - множество файлов, в которых она встречается.
+    Сжатые файлы индексируются по распакованному содержимому, в котором их ищет `grep` (см. `FileReader`).
+    Файл, в котором нет хотя бы одной триграммы обязательной подстроки шаблона, не может содержать совпадений
+    и не читается. Файлы, изменившиеся после построения индекса или отсутствующие в нем, всегда считаются кандидатами,
+    поэтому устаревший индекс замедляет поиск, но не искажает его результат
+    """
+
+    VERSION: int = 2
+
+    def __init__(self, root: str):
+        """
+        :param root: абсолютный путь к проиндексированной директории
+        """
+        self.root = root
+        # Относительный путь файла -> (размер, время изменения в нс, проиндексирован ли файл)
+        self.files: dict[str, tuple[int, int, bool]] = {}
+        self.postings: dict[bytes, set[str]] = {}
+        self.built_at: float | None = None
+
+    @staticmethod
+    def path_for(root: str) -> str:
+        return os.path.join(root, INDEX_FILENAME)
+
+    @staticmethod
+    def load(root: str) -> "TrigramIndex | None":
+        """
+        Загружает индекс директории. Загруженные индексы кэшируются до изменения файла индекса
+        :return: индекс или `None`, если директория не проиндексирована
+        """
+        try:
+            status = os.stat(TrigramIndex.path_for(root))
+        except OSError:
+            return None
+        return _load_cached(root, status.st_size, status.st_mtime_ns)
+
+    @staticmethod
+    def update(root: str) -> "tuple[TrigramIndex, int, int]":
+        """
+        Строит индекс директории или обновляет существующий: заново индексируются только новые и изменившиеся файлы,
+        удаленные файлы исключаются из индекса
+        :return: индекс, количество (пере)индексированных и количество удаленных из индекса файлов
+        """
+        # Загруженный индекс может использоваться параллельным поиском, поэтому обновляется свежая копия
+        index = _read_index(root) or TrigramIndex(root)
+        present = set()
+        changed = []
+        for relative_path, status in walk_files(root):
+            present.add(relative_path)
+            if not index.__is_fresh(relative_path, status):
+                changed.append((relative_path, status))
+
+        removed = [relative_path for relative_path in index.files if relative_path not in present]
+        index.__remove({relative_path for relative_path, _ in changed} | set(removed))
+        for relative_path, status in changed:
+            index.__add(relative_path, status)
+
+        index.built_at = time.time()
+        index.__save()
+        return index, len(changed), len(removed)
+
+    def status(self) -> dict[str, int]:
+        """
+        Сверяет индекс с текущим состоянием директории
+        :return: количество файлов и триграмм в индексе, размер файла индекса, количество устаревших
+            (изменившихся или удаленных) и отсутствующих в индексе файлов
+        """
+        present = {}
+        for relative_path, status in walk_files(self.root):
+            present[relative_path] = status
+        stale = sum(
+            1 for relative_path in self.files
+            if relative_path not in present or not self.__is_fresh(relative_path, present[relative_path])
+        )
+        return {
+            "files": len(self.files),
+            "trigrams": len(self.postings),
+            "size": os.path.getsize(TrigramIndex.path_for(self.root)),
+            "stale": stale,
+            "unindexed": sum(1 for relative_path in present if relative_path not in self.files),
+        }
+
+    def candidates(self, literals: list[str]) -> "set[str] | None":
+        """
+        :param literals: подстроки, которые обязательно содержит любая совпавшая строка
+        :return: проиндексированные файлы, которые могут содержать все подстроки, или `None`,
+            если подстроки не сужают поиск (например, короче трех байт)
+        """
+        result = None
+        for literal in literals:
+            for trigram in _trigrams(literal.encode("utf-8").lower()):
+                files = self.postings.get(trigram, set())
+                result = set(files) if result is None else result & files
+                if not result:
+                    return result
+        return result
+
+    def candidates_any(self, literal_sets: list[list[str]]) -> "set[str] | None":
+        """
+        :param literal_sets: для каждого из шаблонов - его обязательные подстроки
+        :return: проиндексированные файлы, которые могут содержать совпадение хотя бы с одним шаблоном, или `None`,
+            если хотя бы один шаблон не сужает поиск
+        """
+        result = set()
+        for literals in literal_sets:
+            candidates = self.candidates(literals)
+            if candidates is None:
+                return None
+            result |= candidates
+        return result
+
+    def may_contain(self, relative_path: str, status: os.stat_result, candidates: "set[str] | None") -> bool:
+        """
+        :param relative_path: путь к файлу относительно корня индекса
+        :param status: текущий `os.stat` файла
+        :param candidates: результат `candidates`
+        :return: `False`, только если по актуальным данным индекса в файле точно нет совпадений
+        """
+        if candidates is None or not self.__is_fresh(relative_path, status):
+            return True
+        return not self.files[relative_path][2] or relative_path in candidates
+
+    def __is_fresh(self, relative_path: str, status: os.stat_result) -> bool:
+        entry = self.files.get(relative_path)
+        return entry is not None and entry[:2] == (status.st_size, status.st_mtime_ns)
+
+    def __add(self, relative_path: str, status: os.stat_result) -> None:
+        indexed = status.st_size <= MAX_FILE_SIZE
+        if indexed:
+            # Файл читается так же, как его читает `grep` (сжатые файлы - распакованными), и фрагментами:
+            # последние два байта фрагмента переносятся в следующий, чтобы не потерять триграммы на границе
+            trigrams = set()
+            tail = b""
+            try:
+                with FileReader(os.path.join(self.root, relative_path)) as reader:
+                    for chunk in reader.chunks():
+                        data = tail + bytes(chunk).lower()
+                        trigrams |= _trigrams(data)
+                        tail = data[-2:]
+            except OSError:
+                return
+            for trigram in trigrams:
+                self.postings.setdefault(trigram, set()).add(relative_path)
+        self.files[relative_path] = (status.st_size, status.st_mtime_ns, indexed)
+
+    def __remove(self, relative_paths: set[str]) -> None:
+        """
+        Исключает файлы из индекса за один проход по спискам файлов триграмм, поэтому время обновления индекса
+        не зависит от количества изменившихся файлов
+        """
+        stale = {relative_path for relative_path in relative_paths if self.files.pop(relative_path, None) is not None}
+        if not stale:
+            return
+        for trigram in list(self.postings):
+            files = self.postings[trigram]
+            files -= stale
+            if not files:
+                del self.postings[trigram]
+
+    def __save(self) -> None:
+        """
+        Сохраняет индекс в JSON: файлы нумеруются, списки файлов триграмм хранят номера
+        """
+        paths = sorted(self.files)
+        ids = {relative_path: i for i, relative_path in enumerate(paths)}
+        data = {
+            "version": TrigramIndex.VERSION,
+            "built_at": self.built_at,
+            "files": [[relative_path, *self.files[relative_path]] for relative_path in paths],
+            "postings": {
+                trigram.hex(): sorted(ids[relative_path] for relative_path in files)
+                for trigram, files in self.postings.items()
+            },
+        }
+        path = TrigramIndex.path_for(self.root)
+        temporary_path = path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(data, file, separators=(",", ":"))
+        os.replace(temporary_path, path)
+
+
+@functools.lru_cache(maxsize=INDEX_CACHE_SIZE)
+def _load_cached(root: str, size: int, mtime_ns: int) -> TrigramIndex | None:
+    """
+    Размер и время изменения файла индекса входят в ключ кэша, поэтому перестроенный индекс читается заново
+    """
+    return _read_index(root)
+
+
+def _read_index(root: str) -> TrigramIndex | None:
+    """
+    Читает файл индекса
+    :return: индекс или `None`, если файла нет или он записан другой версией
+    """
+    try:
+        with open(TrigramIndex.path_for(root), "r", encoding="utf-8") as file:
+            data = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != TrigramIndex.VERSION:
+        return None
+
+    index = TrigramIndex(root)
+    index.built_at = data["built_at"]
+    paths = []
+    for relative_path, file_size, file_mtime_ns, indexed in data["files"]:
+        index.files[relative_path] = (file_size, file_mtime_ns, indexed)
+        paths.append(relative_path)
+    index.postings = {
+        bytes.fromhex(trigram): {paths[i] for i in ids} for trigram, ids in data["postings"].items()
+    }
+    return index
+
+
+def _trigrams(data: bytes) -> set[bytes]:
+    return {data[i:i + 3] for i in range(len(data) - 2)}
+
+
+def walk_files(root: str, follow_links: bool = False):
+    """
+    Обходит обычные файлы директории в порядке имен, пропуская файл индекса
+    :return: итератор по парам `(путь относительно root, os.stat файла)`
+    """
+    for dirpath, dirnames, filenames in os.walk(root, followlinks=follow_links):
+        dirnames.sort()
+        relative = os.path.relpath(dirpath, root)
+        for filename in sorted(filenames):
+            if relative == "." and filename in (INDEX_FILENAME, INDEX_FILENAME + ".tmp"):
+                continue
+            path = os.path.join(dirpath, filename)
+            try:
+                status = os.stat(path)
+            except OSError:
+                continue
+            if stat.S_ISREG(status.st_mode):
+                yield os.path.normpath(os.path.join(relative, filename)), status
+
+
+def _class_end(pattern: str, start: int) -> int:
+    """
+    Находит конец класса символов `[...]`: `]` сразу после `[` или `[^` и экранированные символы (`\\]`)
+    класс не закрывают
+    :param start: позиция `[`
+    :return: позиция закрывающей `]` или длина шаблона, если класс не закрыт
+    """
+    i = start + 1
+    if i < len(pattern) and pattern[i] == "^":
+        i += 1
+    if i < len(pattern) and pattern[i] == "]":
+        i += 1
+    while i < len(pattern) and pattern[i] != "]":
+        i += 2 if pattern[i] == "\\" else 1
+    return min(i, len(pattern))
+
+
+def required_literals(pattern: str, regex_flags: int) -> list[str]:
+    """
+    Выделяет из регулярного выражения подстроки, которые содержит любая совпавшая с ним строка.
+    Разбор консервативен: шаблоны с альтернативами и группами не сужаются вовсе
+
+    :return: список обязательных подстрок (возможно, пустой)
+    """
+    if "|" in pattern or "(" in pattern:
+        return []
+
+    literals = []
+    current = ""
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "\\" and i + 1 < len(pattern):
+            following = pattern[i + 1]
+            i += 2
+            if following.isalnum():
+                # `\w`, `\d`, `\b` и т.п. - не буквальный символ
+                literals.append(current)
+                current = ""
+            else:
+                current += following
+            continue
+        if ch in "?*{":
+            # Предыдущий символ необязателен
+            literals.append(current[:-1])
+            current = ""
+            if ch == "{":
+                closing = pattern.find("}", i)
+                i = len(pattern) if closing < 0 else closing
+        elif ch == "[":
+            literals.append(current)
+            current = ""
+            i = _class_end(pattern, i)
+        elif ch in ".^$+":
+            literals.append(current)
+            current = ""
+        else:
+            current += ch
+        i += 1
+    literals.append(current)
+
+    # Текст файлов читается с заменой некорректных байт, такие символы в байтах файла не встречаются
+    literals = [literal for literal in literals if "�" not in literal]
+    if regex_flags & re.IGNORECASE:
+        # Индекс приводит к нижнему регистру только ASCII-буквы, а `i`, `k` и `s` без учета регистра совпадают
+        # и с не-ASCII символами (`İ`, `K`, `ſ`), поэтому такие символы разделяют подстроки
+        literals = [part for literal in literals if literal.isascii() for part in re.split("[iksIKS]", literal)]
+    return [literal for literal in literals if len(literal.encode("utf-8")) >= 3]
@@ -0,0 +1,25 @@
+import pytest
+
+from cli_interpreter.aho_corasick import AhoCorasick
+
+
+def test_find_returns_end_of_first_match():
+    automaton = AhoCorasick(["he", "she", "his", "hers"])
+
+    assert automaton.find("ushers") == 3
+    assert automaton.find("ushers", 4) == -1
+    assert automaton.find("xyz") == -1
+
+
+def test_match_through_fail_link():
+    """Совпадение внутри более длинной несостоявшейся подстроки находится по суффиксной ссылке"""
+    automaton = AhoCorasick(["abcd", "bc"])
+
+    assert automaton.find("xabcx") == 3
+
+
+@pytest.mark.parametrize("text, expected", [(b"id=1042 ok", True), (b"id=1043 ok", False)])
+def test_search_in_bytes(text, expected):
+    automaton = AhoCorasick([f"id={i}".encode() for i in range(1000, 1043)])
+
+    assert automaton.search(text) == expected
@@ -1,8 +1,16 @@
+import errno
 import io
+import os
+import threading
+import time
+import tracemalloc
 from unittest.mock import patch
 
+import pytest
+
 from cli_interpreter.commands.cat_command import CatCommand
 from cli_interpreter.context import CliContext
+from cli_interpreter.pipe import FileSegment, make_pipe
 
 
 def test_cat_command_with_existing_file(tmp_path):
@@ -33,3 +41,146 @@ def test_cat_command_with_missing_file():
 
     # Проверяем, что вывод в stderr содержит сообщение об ошибке
     assert "non_existing_file.txt" in error_output
+
+
+def test_cat_command_with_multiple_files(tmp_path):
+    """Тест команды CatCommand для нескольких файлов: ошибка в одном файле не прерывает вывод остальных"""
+    first = tmp_path / "first.txt"
+    second = tmp_path / "second.txt"
+    first.write_text("one\n")
+    second.write_text("two\n")
+
+    output_stream = io.StringIO()
+
+    cmd = CatCommand(args=[str(first), "missing.txt", str(second)], output_stream=output_stream, context=CliContext())
+    with patch("sys.stderr", new_callable=io.StringIO) as mock_stderr:
+        assert CatCommand.MISSING_INPUT == cmd.execute()
+        assert "missing.txt" in mock_stderr.getvalue()
+
+    assert output_stream.getvalue() == "one\ntwo\n"
+
+
+def test_cat_command_copies_to_file_descriptor_in_kernel(tmp_path, monkeypatch):
+    """В поток вывода с файловым дескриптором файл копируется силами ядра, без чтения в память интерпретатора"""
+    source = tmp_path / "source.bin"
+    source.write_bytes(bytes(range(256)) * 1000)
+    target = tmp_path / "target.bin"
+
+    def fail_read_chunks(*args, **kwargs):
+        raise AssertionError("file must not be read by the interpreter")
+
+    monkeypatch.setattr(FileSegment, "read_chunks", fail_read_chunks)
+    with open(target, "w") as output_stream:
+        output_stream.write("header\n")
+        cmd = CatCommand(args=[str(source), str(source)], output_stream=output_stream, context=CliContext())
+        assert CatCommand.OK == cmd.execute()
+
+    assert target.read_bytes() == b"header\n" + source.read_bytes() * 2
+
+
+def test_cat_command_falls_back_to_reading(tmp_path, monkeypatch):
+    """Если ядро отказывается копировать между дескрипторами, файл копируется чтением и записью"""
+    source = tmp_path / "source.txt"
+    source.write_text("payload\n" * 100)
+
+    def refuse(*args):
+        raise OSError(errno.EINVAL, "Invalid argument")
+
+    monkeypatch.setattr(os, "sendfile", refuse)
+    monkeypatch.setattr(os, "copy_file_range", refuse, raising=False)
+    read_fd, write_fd = os.pipe()
+    with open(write_fd, "w") as output_stream:
+        cmd = CatCommand(args=[str(source)], output_stream=output_stream, context=CliContext())
+        assert CatCommand.OK == cmd.execute()
+    with open(read_fd, "rb") as pipe:
+        assert pipe.read() == source.read_bytes()
+
+
+@pytest.mark.skipif(not hasattr(os, "openpty"), reason="псевдотерминалы недоступны")
+def test_cat_ends_terminal_output_with_newline(tmp_path):
+    """Файл без завершающего перевода строки дополняется им только при выводе в терминал, в файл он копируется как есть"""
+    import tty  # только POSIX
+
+    source = tmp_path / "nonl.txt"
+    source.write_bytes(b"hello\nworld")
+    target = tmp_path / "target.txt"
+
+    with open(target, "w") as output_stream:
+        assert CatCommand.OK == CatCommand(args=[str(source)], output_stream=output_stream, context=CliContext()).execute()
+    assert target.read_bytes() == b"hello\nworld"
+
+    master_fd, slave_fd = os.openpty()
+    tty.setraw(slave_fd)
+    with open(master_fd, "rb", buffering=0) as terminal, open(slave_fd, "w") as output_stream:
+        assert CatCommand.OK == CatCommand(args=[str(source)], output_stream=output_stream, context=CliContext()).execute()
+        assert terminal.read(64) == b"hello\nworld\n"
+
+
+class _SyntheticStream(io.RawIOBase):
+    """Двоичный поток заданного размера из повторяющихся строк лога, данные которого создаются по мере чтения"""
+
+    BLOCK: bytes = b"2024-01-01 12:00:00 INFO request handled by worker-7 in 12 ms\n" * (4 * 1024 * 1024 // 63)
+
+    def __init__(self, size: int):
+        self.remaining = size
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), self.remaining, len(_SyntheticStream.BLOCK))
+        buffer[:size] = _SyntheticStream.BLOCK[:size]
+        self.remaining -= size
+        return size
+
+
+def _copy_through_cat(size: int, args: list[str]) -> (int, float):
+    """
+    Пропускает синтетический поток через `cat` в канал, который вычитывает отдельный поток
+    :return: количество байт, дошедших до конца канала, и время копирования в секундах
+    """
+    reader, writer = make_pipe(1024 * 1024)
+    received = []
+    consumer = threading.Thread(target=lambda: received.append(sum(len(chunk) for chunk in reader.read_chunks())))
+    consumer.start()
+    cmd = CatCommand(args=args, input_stream=_SyntheticStream(size), output_stream=writer, context=CliContext())
+
+    started = time.perf_counter()
+    assert CatCommand.OK == cmd.execute()
+    writer.close()
+    consumer.join()
+    return received[0], time.perf_counter() - started
+
+
+def test_cat_streams_piped_input_in_constant_memory():
+    """`cat` без файлов копирует поток ввода фрагментами заданного размера, и память не зависит от объема потока"""
+    size = 64 * 1024 * 1024
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        received, _ = _copy_through_cat(size, ["--buffer-size", "64K"])
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert received == size
+    assert peak < 4 * 1024 * 1024
+
+
+def test_cat_rejects_invalid_buffer_size():
+    cmd = CatCommand(args=["--buffer-size", "0"], input_stream=io.BytesIO(b""), context=CliContext())
+
+    with pytest.raises(RuntimeError):
+        cmd.execute()
+
+
+@pytest.mark.skipif(not os.environ.get("CLI_THROUGHPUT_TESTS"), reason="set CLI_THROUGHPUT_TESTS=1 to measure")
+@pytest.mark.parametrize("buffer_size", ["64K", "256K", "1M"])
+def test_cat_piped_input_throughput(buffer_size, capsys):
+    """Пропускная способность `... | cat | ...` на синтетическом потоке в 1 ГиБ"""
+    size = 1024 ** 3
+    received, seconds = _copy_through_cat(size, ["--buffer-size", buffer_size])
+
+    assert received == size
+    with capsys.disabled():
+        print(f"\ncat --buffer-size {buffer_size}: {size / seconds / 1024 ** 2:.0f} MiB/s ({seconds:.2f} s for 1 GiB)")
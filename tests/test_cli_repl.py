@@ -3,7 +3,8 @@ import re
 
 import pytest
 
-from cli_interpreter.cli_repl import REPL
+from cli_interpreter.cli_repl import REPL, main
+from cli_interpreter.commands.command import Command
 
 
 @pytest.fixture
@@ -151,3 +152,43 @@ def test_exit_first(monkeypatch, repl, capsys):
 
     captured = capsys.readouterr()
     pass  # TODO: подумать, что мы хотим увидеть в результате
+
+
+def test_run_script_returns_last_status(repl, capsys):
+    """Тест исполнения сценария без приглашения ко вводу"""
+    status = repl.run_script(["# комментарий", "echo 1", "", "cat non_existing_file.txt", "echo 2"])
+
+    captured = capsys.readouterr()
+    assert captured.out == "1\n2\n"
+    assert "non_existing_file.txt" in captured.err
+    assert status == 0
+
+
+def test_run_script_stop_on_error(repl, capsys):
+    """Тест исполнения сценария с остановкой на первой ошибке"""
+    status = repl.run_script(["echo 1", "cat non_existing_file.txt", "echo 2"], stop_on_error=True)
+
+    captured = capsys.readouterr()
+    assert captured.out == "1\n"
+    assert status == 2
+
+
+def test_main_command_string(capsys):
+    """Тест запуска интерпретатора с ключом -c"""
+    status = main(["-c", "A=5\necho $A | wc"])
+
+    captured = capsys.readouterr()
+    assert captured.out == "1 1 2\n"
+    assert status == 0
+
+
+def test_main_script_file(tmp_path, capsys):
+    """Тест запуска интерпретатора с файлом сценария"""
+    script = tmp_path / "script.sh"
+    script.write_text("echo start\nasd\n")
+
+    status = main([str(script)])
+
+    captured = capsys.readouterr()
+    assert captured.out == "start\n"
+    assert status == Command.DEFAULT_ERROR
@@ -60,3 +60,9 @@ class TestCliContext:
         with pytest.raises(ValueError):
             self.cli_context.set("INVALID-VAR$", "value")
         assert self.cli_context.get("VALID_VAR") == "valid_value"
+
+    def test_process_pool_is_reused(self):
+        """Test that the process pool is created once per session."""
+        pool = self.cli_context.get_process_pool()
+        assert self.cli_context.get_process_pool() is pool
+        pool.shutdown()
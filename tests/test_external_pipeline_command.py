@@ -0,0 +1,68 @@
+import io
+from unittest.mock import patch
+
+from cli_interpreter.commands.cat_command import CatCommand
+from cli_interpreter.commands.external_pipeline_command import ExternalPipelineCommand
+from cli_interpreter.commands.unknown_command import UnknownCommand
+from cli_interpreter.context import CliContext
+from cli_interpreter.executor import PipeExecutor
+
+
+def test_external_commands_are_connected_directly(tmp_path):
+    """Идущие подряд внешние команды запускаются одновременно, минуя `subprocess.run`"""
+    file_path = tmp_path / "words.txt"
+    file_path.write_text("b\na\nb\nc\na\n")
+    context = CliContext()
+    output_stream = io.StringIO()
+    commands = [
+        CatCommand([str(file_path)], context=context),
+        UnknownCommand(["sort"], context=context),
+        UnknownCommand(["uniq"], context=context),
+        UnknownCommand(["head", "-n", "2"], output_stream=output_stream, context=context),
+    ]
+
+    with patch("subprocess.run") as mock_run:
+        PipeExecutor().execute(commands)
+        mock_run.assert_not_called()
+
+    assert output_stream.getvalue() == "a\nb\n"
+
+
+def test_external_pipeline_without_input_stream():
+    """Первый процесс группы может не иметь потока ввода от интерпретатора"""
+    context = CliContext()
+    output_stream = io.StringIO()
+    cmd = ExternalPipelineCommand(
+        [UnknownCommand(["yes"], context=context), UnknownCommand(["head", "-n", "3"], context=context)],
+        output_stream=output_stream,
+    )
+
+    # `yes` завершается по SIGPIPE, когда `head` перестает читать - это не ошибка
+    assert ExternalPipelineCommand.OK == cmd.execute()
+    assert output_stream.getvalue() == "y\ny\ny\n"
+
+
+def test_external_pipeline_reports_failure():
+    """Код возврата упавшего процесса группы возвращается как код ответа команды"""
+    context = CliContext()
+    cmd = ExternalPipelineCommand(
+        [UnknownCommand(["cat"], context=context), UnknownCommand(["false"], context=context)],
+        input_stream=io.StringIO("data\n"),
+        output_stream=io.StringIO(),
+    )
+
+    assert 1 == cmd.execute()
+
+
+def test_external_pipeline_missing_program():
+    """Ошибка запуска процесса выводится в stderr"""
+    context = CliContext()
+    cmd = ExternalPipelineCommand(
+        [UnknownCommand(["sort"], context=context), UnknownCommand(["no_such_program_xyz"], context=context)],
+        input_stream=io.StringIO("data\n"),
+        output_stream=io.StringIO(),
+    )
+
+    with patch("sys.stderr", new_callable=io.StringIO) as mock_stderr:
+        assert ExternalPipelineCommand.DEFAULT_ERROR == cmd.execute()
+        assert "no_such_program_xyz" in mock_stderr.getvalue()
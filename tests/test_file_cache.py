@@ -0,0 +1,105 @@
+import io
+import os
+
+from cli_interpreter.cli_repl import REPL
+from cli_interpreter.commands.cache_command import CacheCommand
+from cli_interpreter.file_cache import FileCache
+
+
+def test_cached_content_is_shared(tmp_path):
+    """Повторное чтение файла отдает тот же объект без обращения к диску"""
+    file_path = tmp_path / "log.txt"
+    file_path.write_text("ERROR 1\n")
+    cache = FileCache()
+
+    assert cache.get(str(file_path)) is None
+    content = cache.load(str(file_path))
+
+    assert content == b"ERROR 1\n"
+    assert cache.load(str(file_path)) is content
+    assert cache.get(str(file_path)) is content
+    assert cache.stats()["hits"] == 2
+
+
+def test_modified_file_is_read_again(tmp_path):
+    """Изменение размера или времени изменения файла делает запись кэша устаревшей"""
+    file_path = tmp_path / "log.txt"
+    file_path.write_text("one\n")
+    cache = FileCache()
+    cache.load(str(file_path))
+
+    file_path.write_text("two\n")
+    os.utime(file_path, ns=(0, 10 ** 9))
+
+    assert cache.get(str(file_path)) is None
+    assert cache.load(str(file_path)) == b"two\n"
+
+
+def test_least_recently_used_files_are_evicted(tmp_path):
+    paths = []
+    for name in "abc":
+        path = tmp_path / name
+        path.write_bytes(name.encode() * 100)
+        paths.append(str(path))
+    cache = FileCache(budget=400)
+
+    cache.load(paths[0])
+    cache.load(paths[1])
+    cache.load(paths[0])
+    cache.load(paths[2])
+    cache.load(paths[0])
+    cache.load(paths[2])
+
+    stats = cache.stats()
+    assert (stats["entries"], stats["size"], stats["evictions"]) == (3, 300, 0)
+    cache.set_budget(200)
+    assert cache.get(paths[1]) is None
+    assert cache.get(paths[0]) is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_large_files_are_not_cached(tmp_path):
+    file_path = tmp_path / "big.bin"
+    file_path.write_bytes(b"x" * 101)
+
+    assert FileCache(budget=400).load(str(file_path)) is None
+
+
+def test_cache_command(tmp_path, capsys):
+    """Файл, прочитанный `grep`, выводят из кэша `cat` и `wc`; `cache stats` показывает попадания"""
+    file_path = tmp_path / "log.txt"
+    file_path.write_text("INFO 1\nERROR 2\n")
+    repl = REPL()
+
+    for line in (f'grep ERROR "{file_path}"', f'cat "{file_path}" | wc', f'wc -l "{file_path}"', "cache stats"):
+        assert repl.execute_line(line, io.StringIO()) == 0
+
+    output = capsys.readouterr().out
+    assert output.startswith("ERROR 2\n2 4 15\n2\nentries: 1\nsize: 15 bytes\n")
+    assert "hits: 2\nmisses: 1\n" in output
+
+    assert repl.execute_line("cache clear", io.StringIO()) == 0
+    assert repl.context.get_file_cache().stats()["entries"] == 0
+    assert CacheCommand(["budget"], repl.context).execute() == CacheCommand.ILLEGAL_ARGUMENT
+
+
+def test_grep_stopping_early_does_not_fill_cache(tmp_path, capsys):
+    """`grep` с -q, -l, -m и построчный поиск не читают файл в кэш целиком, но используют уже закэшированный"""
+    file_path = tmp_path / "log.txt"
+    file_path.write_text("ERROR first\n" + "INFO filler\n" * 10000)
+    repl = REPL()
+    cache = repl.context.get_file_cache()
+
+    for line in ("grep -q ERROR", "grep -l ERROR", "grep -m 1 ERROR", "grep -n -m 1 ERROR", "grep -A 1 ERROR"):
+        assert repl.execute_line(f'{line} "{file_path}"', io.StringIO()) == 0
+    assert cache.stats()["entries"] == 0
+
+    assert repl.execute_line(f'grep -c ERROR "{file_path}"', io.StringIO()) == 0
+    assert cache.stats()["entries"] == 1
+    hits = cache.stats()["hits"]
+    assert repl.execute_line(f'grep -n -m 1 ERROR "{file_path}"', io.StringIO()) == 0
+    assert cache.stats()["hits"] == hits + 1
+
+    output = capsys.readouterr().out.splitlines()
+    assert output[-1] == "1:ERROR first"
+    assert output[-2] == "1"
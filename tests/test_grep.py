@@ -1,8 +1,12 @@
+import io
+import itertools
 import os
 
 import pytest
 
 from cli_interpreter.cli_repl import REPL
+from cli_interpreter.commands.grep_command import GrepCommand
+from cli_interpreter.context import CliContext
 
 
 @pytest.fixture
@@ -121,3 +125,219 @@ def test_grep_pipe(monkeypatch, repl, tmp_path, capsys):
 
     captured = capsys.readouterr()
     assert "Минимальный синтаксис grep" in captured.out
+
+
+def test_grep_parallel(monkeypatch, repl, tmp_path, capsys):
+    """Тест на ключ --parallel: результат совпадает с последовательным поиском"""
+    file_path = tmp_path / "log.txt"
+    file_path.write_text("".join(f"{'ERROR' if i % 7 == 0 else 'INFO'} {i}\n" for i in range(1000)))
+    inputs = iter([f'grep --parallel -A 1 "ERROR" "{file_path}"', f'grep -A 1 "ERROR" "{file_path}"', "exit"])
+
+    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+
+    with pytest.raises(SystemExit):
+        repl.run()
+
+    captured = capsys.readouterr()
+    parallel_output, sequential_output = captured.out.split("ERROR 0\n")[1:]
+    assert parallel_output == sequential_output
+    assert "ERROR 994\nINFO 995\n" in parallel_output
+
+
+@pytest.mark.parametrize("line_end", ["\n", "\r\n"])
+def test_grep_sharded(monkeypatch, repl, tmp_path, capsys, line_end):
+    """Тест на поиск по диапазонам файла в пуле процессов: вывод и номера строк совпадают с последовательным поиском"""
+    monkeypatch.setattr(GrepCommand, "SHARD_SIZE", 1000)
+    file_path = tmp_path / "log.txt"
+    file_path.write_bytes("".join(f"{'ERROR' if i % 7 == 0 else 'ИНФО'} {i}{line_end}" for i in range(1000)).encode())
+    inputs = iter([
+        f'grep --parallel -n "ERROR" "{file_path}"',
+        f'grep -n "ERROR" "{file_path}"',
+        f'grep --parallel -c -i "error" "{file_path}"',
+        "exit",
+    ])
+
+    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+
+    with pytest.raises(SystemExit):
+        repl.run()
+
+    captured = capsys.readouterr()
+    expected = "".join(f"{i + 1}:ERROR {i}\n" for i in range(0, 1000, 7))
+    assert captured.out == expected + expected + "143\n"
+
+
+def test_grep_line_numbers_with_context(monkeypatch, repl, tmp_path, capsys):
+    """Тест на ключ -n: строки контекста отмечаются номером с `-`"""
+    file_path = tmp_path / "log.txt"
+    file_path.write_text("INFO 1\nERROR 2\nINFO 3\n")
+    inputs = iter([f'grep -n -B 1 "ERROR" "{file_path}" "{file_path}"', "exit"])
+
+    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+
+    with pytest.raises(SystemExit):
+        repl.run()
+
+    captured = capsys.readouterr()
+    group = f"{file_path}-1-INFO 1\n{file_path}:2:ERROR 2\n"
+    assert captured.out == f"{group}--\n{group}"
+
+
+def test_grep_multiple_files(monkeypatch, repl, tmp_path, capsys):
+    """Тест на несколько файлов: строки выводятся с именем файла в порядке аргументов"""
+    first = tmp_path / "first.txt"
+    second = tmp_path / "second.txt"
+    first.write_text("ERROR one\nINFO two\n")
+    second.write_text("ERROR three\n")
+    inputs = iter([f'grep "ERROR" "{second}" "{tmp_path / "missing.txt"}" "{first}"', "exit"])
+
+    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+
+    with pytest.raises(SystemExit):
+        repl.run()
+
+    captured = capsys.readouterr()
+    assert captured.out.startswith(f"{second}:ERROR three\n{first}:ERROR one\n")
+    assert "missing.txt: No such file or directory" in captured.err
+
+
+def test_grep_recursive(monkeypatch, repl, tmp_path, capsys):
+    """Тест на ключ -r: директории обходятся рекурсивно в порядке имен"""
+    (tmp_path / "src" / "nested").mkdir(parents=True)
+    (tmp_path / "src" / "b.py").write_text("# TODO: b\n")
+    (tmp_path / "src" / "a.py").write_text("pass\n# TODO: a\n")
+    (tmp_path / "src" / "nested" / "c.py").write_text("# TODO: c\n")
+    inputs = iter([f'cd "{tmp_path}"', 'grep -r "TODO" src', 'grep "TODO" src', "exit"])
+
+    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+
+    with pytest.raises(SystemExit):
+        repl.run()
+
+    captured = capsys.readouterr()
+    assert captured.out.startswith("src/a.py:# TODO: a\nsrc/b.py:# TODO: b\nsrc/nested/c.py:# TODO: c\n")
+    assert captured.err == "grep: src: Is a directory\n"
+
+
+def test_grep_context(monkeypatch, repl, tmp_path, capsys):
+    """Тест на ключи -B и -C: перекрывающиеся окна объединяются, несмежные группы разделяются `--`"""
+    file_path = tmp_path / "log.txt"
+    file_path.write_text("a\nERROR 1\nb\nc\nERROR 2\nd\ne\nf\ng\nERROR 3\n")
+    inputs = iter([f'cat "{file_path}" | grep -B 1 "ERROR"', f'cat "{file_path}" | grep -C 1 "ERROR"', "exit"])
+
+    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+
+    with pytest.raises(SystemExit):
+        repl.run()
+
+    captured = capsys.readouterr()
+    assert captured.out == (
+        "a\nERROR 1\n--\nc\nERROR 2\n--\ng\nERROR 3\n"
+        "a\nERROR 1\nb\nc\nERROR 2\nd\n--\ng\nERROR 3\n"
+    )
+
+
+def test_grep_context_with_filenames(monkeypatch, repl, tmp_path, capsys):
+    """Тест на контекст в нескольких файлах: строки контекста отмечаются префиксом `имя_файла-`"""
+    first = tmp_path / "first.txt"
+    second = tmp_path / "second.txt"
+    first.write_text("before\nERROR one\n")
+    second.write_text("ERROR two\nafter\n")
+    inputs = iter([f'grep -C 1 "ERROR" "{first}" "{second}"', "exit"])
+
+    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+
+    with pytest.raises(SystemExit):
+        repl.run()
+
+    captured = capsys.readouterr()
+    assert captured.out == f"{first}-before\n{first}:ERROR one\n--\n{second}:ERROR two\n{second}-after\n"
+
+
+def test_grep_summary_modes(monkeypatch, repl, tmp_path, capsys):
+    """Тест на ключи -c, -l и -m"""
+    first = tmp_path / "first.txt"
+    second = tmp_path / "second.txt"
+    first.write_text("ERROR 1\nINFO 2\nERROR 3\nINFO 4\nERROR 5\n")
+    second.write_text("INFO\n")
+    inputs = iter([
+        f'grep -c "ERROR" "{first}"',
+        f'grep -c "ERROR" "{first}" "{second}"',
+        f'grep -l "ERROR" "{first}" "{second}"',
+        f'grep -m 2 -A 1 "ERROR" "{first}"',
+        "exit",
+    ])
+
+    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+
+    with pytest.raises(SystemExit):
+        repl.run()
+
+    captured = capsys.readouterr()
+    assert captured.out == (
+        "3\n"
+        f"{first}:3\n{second}:0\n"
+        f"{first}\n"
+        "ERROR 1\nINFO 2\nERROR 3\nINFO 4\n"
+    )
+
+
+def test_grep_multiple_patterns(monkeypatch, repl, tmp_path, capsys):
+    """Тест на ключи -e и -f: строка выводится, если совпал любой из шаблонов"""
+    log = tmp_path / "log.txt"
+    log.write_text("".join(f"request {i} from user-{i:04}\n" for i in range(0, 300, 7)) + "ERROR disk\nWARN 5\n")
+    patterns = tmp_path / "patterns.txt"
+    patterns.write_text("".join(f"user-{i:04}\n" for i in range(0, 300, 3)))
+    inputs = iter([
+        f'grep -e ERROR -e "WARN [0-9]" "{log}"',
+        f'grep -f "{patterns}" "{log}"',
+        f'cat "{log}" | grep -c -f "{patterns}"',
+        f'grep -f "{tmp_path / "missing.txt"}" "{log}"',
+        "exit",
+    ])
+
+    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+
+    with pytest.raises(SystemExit):
+        repl.run()
+
+    captured = capsys.readouterr()
+    expected = "".join(f"request {i} from user-{i:04}\n" for i in range(0, 300, 21))
+    assert captured.out.startswith(f"ERROR disk\nWARN 5\n{expected}15\n")
+    assert f"grep: {tmp_path / 'missing.txt'}: No such file or directory\n" in captured.err
+
+
+@pytest.mark.parametrize("word, expected_code", [("ERROR", GrepCommand.OK), ("FATAL", GrepCommand.NO_MATCH)])
+def test_grep_quiet(word, expected_code, capsys):
+    """Тест на ключ -q: ничего не выводится, отсутствие совпадений сообщается кодом возврата"""
+    command = GrepCommand(["-q", word], CliContext())
+    command.input_stream = io.StringIO("INFO\nERROR\n")
+
+    assert command.execute() == expected_code
+    assert capsys.readouterr().out == ""
+
+
+def test_grep_quiet_without_match_is_not_an_error(repl, tmp_path, capsys):
+    """`grep -q` без совпадений возвращает код `NO_MATCH`, но интерпретатор не сообщает об ошибке"""
+    file_path = tmp_path / "ab.txt"
+    file_path.write_text("a\nb\n")
+    error_stream = io.StringIO()
+
+    assert repl.execute_line(f'grep -q zz "{file_path}"', error_stream) == GrepCommand.NO_MATCH
+    assert repl.execute_line(f'cat "{file_path}" | grep -q zz', error_stream) == GrepCommand.NO_MATCH
+    assert repl.execute_line(f'grep -q a "{file_path}"', error_stream) == GrepCommand.OK
+    assert error_stream.getvalue() == ""
+    assert capsys.readouterr().out == ""
+
+    assert repl.execute_line(f'grep -q zz "{tmp_path / "missing.txt"}"', error_stream) == GrepCommand.ILLEGAL_ARGUMENT
+    assert error_stream.getvalue().startswith("Error while executing commands")
+
+
+def test_grep_stops_reading_when_answer_is_known():
+    """Ключи -q, -l и -m прекращают чтение бесконечного ввода, как только ответ известен"""
+    for args in (["-q", "ERROR"], ["-l", "ERROR"], ["-m", "2", "ERROR"], ["-c", "-m", "3", "ERROR"]):
+        command = GrepCommand(args, CliContext())
+        command.input_stream = (f"{'ERROR' if i % 2 else 'INFO'} {i}\n" for i in itertools.count())
+        command.output_stream = io.StringIO()
+
+        assert command.execute() == GrepCommand.OK
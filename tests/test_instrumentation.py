@@ -0,0 +1,119 @@
+import io
+import tracemalloc
+
+import pytest
+
+from cli_interpreter.cli_repl import REPL
+from cli_interpreter.commands.cat_command import CatCommand
+from cli_interpreter.commands.echo_command import EchoCommand
+from cli_interpreter.commands.unknown_command import UnknownCommand
+from cli_interpreter.commands.wc_command import WcCommand
+from cli_interpreter.context import CliContext
+from cli_interpreter.executor import CommandExecutor
+from cli_interpreter.instrumentation import StageStats, format_stats
+from cli_interpreter.parser import UserInputParser
+
+
+def test_stats_of_builtin_pipeline(tmp_path):
+    """Для каждой встроенной стадии замеряются время, объем данных на её границах и код возврата"""
+    source = tmp_path / "data.txt"
+    source.write_text("one two\nthree\n")
+    context = CliContext()
+    output_stream = io.StringIO()
+    commands = [
+        CatCommand([str(source)], context=context),
+        WcCommand(output_stream=output_stream, context=context),
+    ]
+    collected = []
+
+    CommandExecutor().execute(commands, collected.extend)
+
+    assert output_stream.getvalue() == "2 3 14\n"
+    cat, wc = collected
+    assert cat.name == f"cat {source}"
+    assert (cat.bytes_in, cat.bytes_out, cat.lines_out) == (None, 14, 2)
+    assert (wc.bytes_in, wc.lines_in, wc.bytes_out, wc.lines_out) == (14, 2, 7, 1)
+    for stats in collected:
+        assert stats.return_code == 0
+        assert stats.wall_time >= 0 and stats.cpu_time >= 0
+        # Без `trace_memory` память встроенных команд не замеряется, чтобы не замедлять их
+        assert stats.peak_memory is None
+
+
+def test_builtin_memory_is_traced_on_request(tmp_path):
+    """Пиковая память встроенных стадий замеряется только по запросу (`time -m`), и трассировка затем выключается"""
+    source = tmp_path / "data.txt"
+    source.write_text("one two\nthree\n")
+    context = CliContext()
+    commands = [CatCommand([str(source)], context=context), WcCommand(output_stream=io.StringIO(), context=context)]
+    collected = []
+
+    CommandExecutor().execute(commands, collected.extend, trace_memory=True)
+
+    assert all(stats.peak_memory is not None for stats in collected)
+    assert not tracemalloc.is_tracing()
+
+
+def test_stats_of_external_commands():
+    """Внешние команды группы описываются отдельными стадиями с ресурсами их процессов"""
+    context = CliContext()
+    output_stream = io.StringIO()
+    commands = [
+        EchoCommand(["b\na\nb"]),
+        UnknownCommand(["sort"], context=context),
+        UnknownCommand(["uniq"], output_stream=output_stream, context=context),
+    ]
+    collected = []
+
+    CommandExecutor().execute(commands, collected.extend)
+
+    assert output_stream.getvalue() == "a\nb\n"
+    assert [stats.name for stats in collected] == ["echo b\na\nb", "sort", "uniq"]
+    _, sort, uniq = collected
+    assert (sort.bytes_in, sort.lines_in, sort.bytes_out) == (6, 3, None)
+    assert (uniq.bytes_in, uniq.bytes_out, uniq.lines_out) == (None, 4, 2)
+    assert sort.cpu_time is not None and sort.peak_memory > 0
+    assert uniq.return_code == 0
+
+
+def test_stats_hook_is_called_on_error():
+    """Зарегистрированный обработчик получает статистику и тогда, когда строка завершилась ошибкой"""
+    executor = CommandExecutor()
+    collected = []
+    executor.add_stats_hook(collected.append)
+
+    with pytest.raises(RuntimeError):
+        executor.execute([WcCommand(["non_existing_file.txt"], context=CliContext())])
+
+    [stats] = collected
+    assert stats[0].return_code == WcCommand.MISSING_INPUT
+
+
+def test_split_time_prefix():
+    assert UserInputParser.split_time_prefix("time cat a | wc") == (" cat a | wc", True, False)
+    assert UserInputParser.split_time_prefix("time -m cat a | wc") == (" cat a | wc", True, True)
+    assert UserInputParser.split_time_prefix("time -mx") == (" -mx", True, False)
+    assert UserInputParser.split_time_prefix("timeout 1 cat") == ("timeout 1 cat", False, False)
+    assert UserInputParser.split_time_prefix("echo time") == ("echo time", False, False)
+
+
+def test_time_prefix_reports_to_stderr(capsys):
+    """Строка с префиксом `time` исполняется как обычно, а статистика стадий выводится в поток ошибок"""
+    status = REPL().execute_line("time echo hello | wc", io.StringIO())
+
+    captured = capsys.readouterr()
+    assert status == 0
+    assert captured.out == "1 1 6\n"
+    header, echo, wc = captured.err.splitlines()
+    assert header.split()[0] == "stage"
+    assert echo.startswith("echo hello")
+    assert wc.startswith("wc")
+
+
+def test_format_stats_marks_unknown_values():
+    stats = StageStats("cat file")
+    stats.bytes_out = 10
+
+    header, row = format_stats([stats]).splitlines()
+
+    assert row.split() == ["cat", "file", "0.000", "-", "-", "-", "10", "-", "-", "-"]
@@ -0,0 +1,83 @@
+import io
+import time
+
+import pytest
+
+from cli_interpreter.async_executor import AsyncCommandExecutor
+from cli_interpreter.cli_repl import REPL
+from cli_interpreter.commands.echo_command import EchoCommand
+from cli_interpreter.commands.unknown_command import UnknownCommand
+from cli_interpreter.context import CliContext
+from cli_interpreter.executor import CommandExecutionError
+
+
+@pytest.fixture
+def repl():
+    """Создание экземпляра REPL для тестов"""
+    return REPL()
+
+
+def test_background_jobs_overlap(repl, capsys):
+    """Фоновые задания исполняются одновременно, `wait` дожидается их всех"""
+    start = time.monotonic()
+    status = repl.run_script(["sleep 0.5 &", "sleep 0.5 &", "wait"])
+    elapsed = time.monotonic() - start
+
+    captured = capsys.readouterr()
+    assert captured.out == "[1]\n[2]\n"
+    assert status == 0
+    assert elapsed < 0.9
+    assert repl.context.get_job_table().all() == []
+
+
+def test_jobs_lists_running_jobs(repl, capsys):
+    """`jobs` выводит список заданий, а завершившиеся задания удаляются из таблицы после вывода"""
+    repl.run_script(["sleep 0.3 &", "jobs"])
+    assert "[1]  Running    sleep 0.3" in capsys.readouterr().out
+
+    repl.run_script(["wait %1"])
+    assert repl.context.get_job_table().all() == []
+
+
+def test_fg_returns_job_status(repl, capsys):
+    """`fg` дожидается последнего задания и возвращает его код возврата"""
+    status = repl.run_script(["echo 1 &", "cat non_existing_file.txt &", "fg"])
+
+    captured = capsys.readouterr()
+    assert "cat non_existing_file.txt" in captured.out
+    assert status == 2
+
+
+def test_wait_unknown_job(repl, capsys):
+    """`wait` с номером несуществующего задания завершается ошибкой"""
+    status = repl.run_script(["wait 42"])
+
+    assert "no such job" in capsys.readouterr().err
+    assert status != 0
+
+
+def test_async_executor_foreground_processes():
+    """Внешние команды исполняются через asyncio и соединяются каналами"""
+    context = CliContext()
+    output_stream = io.StringIO()
+    executor = AsyncCommandExecutor(context)
+
+    executor.execute([
+        UnknownCommand(["printf", "b\\na\\n"], context=context),
+        UnknownCommand(["sort"], output_stream=output_stream, context=context),
+    ])
+
+    assert output_stream.getvalue() == "a\nb\n"
+
+
+def test_async_executor_builtins_and_errors():
+    """Встроенные команды исполняются в пуле потоков, ошибки возвращаются как `CommandExecutionError`"""
+    context = CliContext()
+    output_stream = io.StringIO()
+    executor = AsyncCommandExecutor(context)
+
+    executor.execute([EchoCommand(["hello"], output_stream=output_stream)])
+    assert output_stream.getvalue() == "hello\n"
+
+    with pytest.raises(CommandExecutionError):
+        executor.execute([UnknownCommand(["false"], context=context)])
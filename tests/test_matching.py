@@ -0,0 +1,121 @@
+import os
+import random
+import re
+import time
+
+import pytest
+
+from cli_interpreter import matching
+from cli_interpreter.matching import (
+    combine_literals,
+    compile_pattern,
+    find_matching_lines,
+    is_literal,
+    make_matcher,
+    to_bytes_pattern,
+)
+
+
+def test_is_literal():
+    assert is_literal("ERROR 42")
+    assert is_literal(b"request-id")
+    assert not is_literal("ERROR.*")
+    assert not is_literal(b"a|b")
+
+
+def test_literal_matcher_does_not_interpret_pattern():
+    """Шаблон без метасимволов ищется как подстрока в строках и байтах"""
+    assert make_matcher("ERROR", 0)("2024 ERROR disk")
+    assert not make_matcher("ERROR", 0)("2024 error disk")
+    assert make_matcher(b"ERROR", 0)(b"2024 ERROR disk")
+
+
+def test_regex_matcher_uses_flags():
+    assert make_matcher("error", re.IGNORECASE)("2024 ERROR disk")
+    assert make_matcher("^INFO [0-9]+$", 0)("INFO 17")
+    assert not make_matcher("^INFO [0-9]+$", 0)("INFO x")
+
+
+def test_compiled_patterns_are_cached():
+    """Повторный запрос с тем же шаблоном и флагами не компилирует шаблон заново"""
+    assert compile_pattern("cached[0-9]", re.IGNORECASE) is compile_pattern("cached[0-9]", re.IGNORECASE)
+    assert compile_pattern("cached[0-9]", 0) is not compile_pattern("cached[0-9]", re.IGNORECASE)
+
+
+def test_unsafe_patterns_are_not_searched_in_bytes():
+    """Шаблоны, которые в байтах UTF-8 означают не то же, что в тексте, остаются текстовыми"""
+    assert to_bytes_pattern("Минимальный", 0) == "Минимальный".encode("utf-8")
+    assert to_bytes_pattern("ERROR [0-9]+$", 0) == b"ERROR [0-9]+$"
+    for pattern in ("Мин.", "[^a]", r"\bword\b", r"\w+", "Мин+", "(?i)error"):
+        assert to_bytes_pattern(pattern, 0) is None
+    assert to_bytes_pattern("error", re.IGNORECASE) is None
+
+
+TEXT = "INFO 1\nERROR Минимальный disk\n\nINFO 22\nпоследняя ERROR"
+
+
+@pytest.mark.parametrize("pattern", ["ERROR", "Минимальный", "^INFO [0-9]+$", "ERROR$", "^$", "", "x*", "нет"])
+def test_buffer_search_finds_same_lines_as_line_search(pattern):
+    """Поиск по всему буферу находит те же строки, что и построчный поиск в тексте"""
+    matches = make_matcher(pattern, 0)
+    expected = [line for line in TEXT.split("\n") if matches(line)]
+
+    found = find_matching_lines(TEXT.encode("utf-8"), to_bytes_pattern(pattern, 0))
+
+    assert [line.decode("utf-8") for line in found] == expected
+
+
+def test_pattern_sets():
+    """Набор шаблонов совпадает там, где совпадает любой из них"""
+    identifiers = tuple(f"user-{i:04}" for i in range(100))
+    assert make_matcher(("ERROR", "WARN [0-9]"), 0)("WARN 1 disk")
+    assert not make_matcher(("ERROR", "WARN [0-9]"), 0)("WARN x")
+    assert make_matcher(identifiers, 0)("login user-0042")
+    assert not make_matcher(identifiers, 0)("login user-0100")
+    assert not make_matcher((), 0)("anything")
+
+    buffer = b"login user-0042\nlogin user-0100\nlogout user-0099"
+    assert list(find_matching_lines(buffer, tuple(i.encode() for i in identifiers))) == [
+        b"login user-0042", b"logout user-0099"
+    ]
+
+
+def test_literal_sets_are_combined_as_prefix_tree():
+    assert combine_literals(("abc", "abd", "x")) == "(?:ab(?:c|d)|x)"
+    assert combine_literals(("a", "ab", "a.c")) == r"a(?:\.c|b)?"
+    assert combine_literals((b"ab", b"a")) == b"a(?:b)?"
+    nested = tuple("a" * i for i in range(1, 2000))
+    assert make_matcher(nested, 0)("xaay") and not make_matcher(nested, 0)("xyz")
+
+
+@pytest.mark.parametrize("min_patterns", [2, matching.AHO_CORASICK_MIN_PATTERNS])
+def test_automaton_and_regex_find_same_lines(monkeypatch, min_patterns):
+    monkeypatch.setattr(matching, "AHO_CORASICK_MIN_PATTERNS", min_patterns)
+    literals = ("user-1", "user-12", "disk", "ск")
+    lines = ["login user-1", "login user-2", "user-123", "диск", "disk full", "ск"]
+
+    matches = make_matcher(literals, 0)
+    found = find_matching_lines("\n".join(lines).encode(), tuple(literal.encode() for literal in literals))
+
+    assert [line for line in lines if matches(line)] == ["login user-1", "user-123", "диск", "disk full", "ск"]
+    assert [line.decode() for line in found] == ["login user-1", "user-123", "диск", "disk full", "ск"]
+
+
+@pytest.mark.skipif(not os.environ.get("CLI_THROUGHPUT_TESTS"), reason="set CLI_THROUGHPUT_TESTS=1 to measure")
+@pytest.mark.parametrize("alphabet", ["abcdefghijklmnopqrstuvwxyz", "0123456789"])
+def test_pattern_set_benchmark(monkeypatch, capsys, alphabet):
+    """Время поиска набора подстрок автоматом и регулярным выражением на 50 тыс. строк журнала"""
+    rng = random.Random(1)
+    tokens = ["".join(rng.choice(alphabet) for _ in range(rng.randint(5, 10))) for _ in range(40000)]
+    lines = [f"12:00:{i % 60:02} INFO user={rng.choice(tokens)} action={rng.choice(tokens)}" for i in range(50000)]
+    for size in (64, 500, 2000, 10000):
+        literals = tuple(rng.sample(tokens, size))
+        timings = []
+        for min_patterns in (size, size + 1):
+            monkeypatch.setattr(matching, "AHO_CORASICK_MIN_PATTERNS", min_patterns)
+            started = time.perf_counter()
+            matches = make_matcher(literals, 0)
+            count = sum(1 for line in lines if matches(line))
+            timings.append(time.perf_counter() - started)
+        with capsys.disabled():
+            print(f"\n{size} literals ({count} lines): automaton {timings[0]:.3f} s, regex {timings[1]:.3f} s")
@@ -2,12 +2,18 @@ from cli_interpreter.commands.cd_command import CdCommand
 import pytest
 
 from cli_interpreter.commands.assign_command import AssignCommand
+from cli_interpreter.commands.cache_command import CacheCommand
 from cli_interpreter.commands.cat_command import CatCommand
 from cli_interpreter.commands.echo_command import EchoCommand
 from cli_interpreter.commands.exit_command import ExitCommand
+from cli_interpreter.commands.fg_command import FgCommand
 from cli_interpreter.commands.grep_command import GrepCommand
+from cli_interpreter.commands.index_command import IndexCommand
+from cli_interpreter.commands.jobs_command import JobsCommand
+from cli_interpreter.commands.pipeline_command import PipelineCommand
 from cli_interpreter.commands.pwd_command import PwdCommand
 from cli_interpreter.commands.unknown_command import UnknownCommand
+from cli_interpreter.commands.wait_command import WaitCommand
 from cli_interpreter.commands.wc_command import WcCommand
 from cli_interpreter.commands.ls_command import LsCommand
 from cli_interpreter.context import CliContext
@@ -131,3 +137,33 @@ def test_grep_with_args():
     commands = parser.parse('grep -i "test" -A 10 Readme.md')
     assert len(commands) == 1
     assert commands[0] == GrepCommand(["-i", "test", "-A", "10", "Readme.md"], context=context)
+
+
+def test_split_background():
+    assert parser.split_background("sleep 1 &") == ("sleep 1 ", True)
+    assert parser.split_background("echo 'a &'") == ("echo 'a &'", False)
+    assert parser.split_background("echo a") == ("echo a", False)
+
+
+def test_jobs_commands():
+    assert parser.parse("jobs") == [JobsCommand([], context)]
+    assert parser.parse("wait %1") == [WaitCommand(["%1"], context)]
+    assert parser.parse("fg") == [FgCommand([], context)]
+
+
+def test_index():
+    commands = parser.parse("index build logs")
+    assert len(commands) == 1
+    assert commands[0] == IndexCommand(["build", "logs"], context=context)
+
+
+def test_cache():
+    commands = parser.parse("cache stats")
+    assert len(commands) == 1
+    assert commands[0] == CacheCommand(["stats"], context=context)
+
+
+def test_pipeline():
+    commands = parser.parse("pipeline mode sequential")
+    assert len(commands) == 1
+    assert commands[0] == PipelineCommand(["mode", "sequential"], context=context)
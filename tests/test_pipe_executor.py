@@ -0,0 +1,348 @@
+import io
+import threading
+from typing import Generator, Iterator
+
+import pytest
+
+from cli_interpreter.cli_repl import REPL
+from cli_interpreter.commands.cat_command import CatCommand
+from cli_interpreter.commands.command import Command
+from cli_interpreter.commands.echo_command import EchoCommand
+from cli_interpreter.commands.grep_command import GrepCommand
+from cli_interpreter.commands.pipeline_command import PipelineCommand
+from cli_interpreter.commands.streaming_command import StreamingCommand
+from cli_interpreter.commands.unknown_command import UnknownCommand
+from cli_interpreter.commands.wc_command import WcCommand
+from cli_interpreter.context import CliContext
+from cli_interpreter.executor import PipeExecutor
+from cli_interpreter.pipe import SpillBuffer, make_pipe
+
+
+class LinesProducer(Command):
+    """Тестовая команда, построчно пишущая в поток вывода заданное количество строк"""
+
+    def __init__(self, count: int, first_line_consumed: threading.Event = None):
+        super().__init__()
+        self.count = count
+        self.first_line_consumed = first_line_consumed
+        self.waited_for_consumer = False
+
+    def execute(self) -> int:
+        for i in range(self.count):
+            self.output_stream.write(f"line {i}\n")
+            if i == 0 and self.first_line_consumed is not None:
+                # Ждем, пока следующая команда получит первую строку, не завершая собственную работу
+                self.waited_for_consumer = self.first_line_consumed.wait(timeout=5)
+        return Command.OK
+
+
+class LinesConsumer(Command):
+    """Тестовая команда, построчно читающая поток ввода"""
+
+    def __init__(self, first_line_consumed: threading.Event = None):
+        super().__init__()
+        self.first_line_consumed = first_line_consumed
+        self.lines = []
+
+    def execute(self) -> int:
+        for line in self.input_stream:
+            self.lines.append(line)
+            if self.first_line_consumed is not None:
+                self.first_line_consumed.set()
+        return Command.OK
+
+
+def test_pipe_stages_run_concurrently():
+    """Следующая команда получает данные до того, как предыдущая завершила работу"""
+    first_line_consumed = threading.Event()
+    producer = LinesProducer(3, first_line_consumed)
+    consumer = LinesConsumer(first_line_consumed)
+
+    PipeExecutor().execute([producer, consumer])
+
+    assert producer.waited_for_consumer
+    assert consumer.lines == ["line 0\n", "line 1\n", "line 2\n"]
+
+
+def test_pipe_buffer_is_bounded():
+    """Канал не накапливает больше данных, чем позволяет его емкость"""
+    reader, writer = make_pipe(capacity=16)
+    max_buffered = []
+
+    def produce():
+        for _ in range(1000):
+            writer.write("0123456789")
+            max_buffered.append(reader._channel.buffered)
+        writer.close()
+
+    thread = threading.Thread(target=produce)
+    thread.start()
+    content = reader.read()
+    thread.join()
+
+    assert len(content) == 10000
+    assert max(max_buffered) <= 16 + 10
+
+
+def test_pipe_closed_reader_releases_writer():
+    """Запись в канал с закрытым читающим концом не блокируется, а завершается ошибкой"""
+    reader, writer = make_pipe(capacity=4)
+    reader.close()
+
+    with pytest.raises(BrokenPipeError):
+        writer.write("data")
+
+
+def test_pipe_stops_producer_when_consumer_finishes():
+    """Если следующая команда не читает ввод, предыдущая не зависает на заполненном канале"""
+    output_stream = io.StringIO()
+    producer = LinesProducer(100_000)
+    echo = EchoCommand(["done"], output_stream=output_stream)
+
+    PipeExecutor(pipe_capacity=16).execute([producer, echo])
+
+    assert output_stream.getvalue() == "done\n"
+
+
+@pytest.mark.parametrize("concurrent", [True, False])
+def test_pipe_modes_produce_same_result(concurrent):
+    """Одновременный и последовательный режимы дают одинаковый результат"""
+    output_stream = io.StringIO()
+    commands = [
+        EchoCommand(["one two three"]),
+        WcCommand(output_stream=output_stream, context=CliContext()),
+    ]
+
+    PipeExecutor(concurrent=concurrent).execute(commands)
+
+    assert output_stream.getvalue() == "1 3 14\n"
+
+
+def test_pipe_error_code_is_reported():
+    """Ненулевой код возврата любой команды pipeline приводит к ошибке"""
+    commands = [
+        EchoCommand(["text"]),
+        WcCommand(["non_existing_file.txt"], context=CliContext()),
+    ]
+
+    with pytest.raises(RuntimeError):
+        PipeExecutor().execute(commands)
+
+
+def test_binary_data_passes_pipeline_unchanged(tmp_path):
+    """Данные, не являющиеся корректным UTF-8, проходят через pipeline без искажений"""
+    data = bytes(range(256)) * 4
+    source = tmp_path / "data.bin"
+    source.write_bytes(data)
+    context = CliContext()
+    output_stream = io.StringIO()
+    commands = [
+        CatCommand([str(source)], context=context),
+        UnknownCommand(["cat"], context=context),
+        CatCommand(context=context),
+        WcCommand(output_stream=output_stream, context=context),
+    ]
+
+    PipeExecutor().execute(commands)
+
+    num_lines, num_words, num_bytes = output_stream.getvalue().split()
+    assert int(num_bytes) == len(data)
+    assert int(num_lines) == data.count(b"\n")
+    assert int(num_words) == len(data.split())
+
+
+def test_binary_chunks_are_not_decoded():
+    """Команды, не требующие текста, получают фрагменты байт в том виде, в котором они были записаны"""
+    reader, writer = make_pipe(capacity=1024)
+    chunk = b"\xff\xfe binary"
+    writer.write(chunk)
+    writer.close()
+
+    assert list(reader.read_chunks()) == [chunk]
+
+
+def test_text_reader_decodes_split_characters():
+    """Многобайтовый символ, разрезанный между фрагментами, декодируется корректно"""
+    reader, writer = make_pipe(capacity=1024)
+    encoded = "привет\n".encode("utf-8")
+    writer.write(encoded[:3])
+    writer.write(encoded[3:])
+    writer.close()
+
+    assert list(reader) == ["привет\n"]
+
+
+def test_reader_splits_large_chunk_without_copying():
+    """Строки большого фрагмента отдаются без копирования остатка фрагмента на каждой строке"""
+    lines = 100 * 1024
+    reader, writer = make_pipe(capacity=1024 * 1024)
+    writer.write(b"y\n" * lines)
+    writer.write(b"tail")
+    writer.close()
+
+    assert reader.readline() == "y\n"
+    pending = reader._pending
+    for _ in range(1000):
+        assert reader.readline() == "y\n"
+
+    # Читатель только сдвигает позицию в прочитанном тексте, а не отрезает от него отданные строки
+    assert reader._pending is pending
+    assert reader._position == 1001 * 2
+    assert 1001 + sum(1 for _ in reader) == lines + 1
+
+
+def test_reader_mixes_line_and_sized_reads():
+    """Построчное чтение, чтение заданного числа символов и фрагментов байт продолжают друг друга"""
+    reader, writer = make_pipe(capacity=1024)
+    writer.write("first\nsec")
+    writer.write(b"ond\nthird\n")
+    writer.close()
+
+    assert reader.readline() == "first\n"
+    assert reader.read(3) == "sec"
+    assert reader.readline() == "ond\n"
+    assert list(reader.read_chunks()) == [b"third\n"]
+
+
+def test_sequential_buffer_spills_to_disk():
+    """В последовательном режиме промежуточные данные сверх ограничения памяти переносятся во временный файл"""
+    output_stream = io.StringIO()
+    producer = LinesProducer(1000)
+    consumer = WcCommand(output_stream=output_stream, context=CliContext())
+    executor = PipeExecutor(concurrent=False, buffer_memory_limit=1024)
+
+    executor.execute([producer, consumer])
+
+    assert output_stream.getvalue() == "1000 2000 8890\n"
+    assert executor.buffer_stats.spills == 1
+    assert executor.buffer_stats.bytes_written == 8890
+    assert executor.buffer_stats.peak_memory_bytes <= 1024
+
+
+def test_pipeline_command_switches_session_to_sequential_mode(tmp_path, capsys):
+    """`pipeline` переключает сессию в последовательный режим, и `pipeline stats` показывает перенос буферов на диск"""
+    file_path = tmp_path / "log.txt"
+    file_path.write_text("".join(f"line {i}\n" for i in range(1000)))
+    repl = REPL()
+    error_stream = io.StringIO()
+
+    for line in ("pipeline mode sequential", "pipeline buffer-limit 1024", f'cat "{file_path}" | grep line | wc -l'):
+        assert repl.execute_line(line, error_stream) == 0
+    capsys.readouterr()
+    assert repl.execute_line("pipeline stats", error_stream) == 0
+
+    assert capsys.readouterr().out == (
+        "mode: sequential\nbuffer limit: 1024 bytes\nbuffers: 2\nwritten: 17780 bytes\nspills: 2\n"
+        "spilled: 17780 bytes\npeak memory: 1024 bytes\n"
+    )
+    assert repl.executor.get_buffer_stats().spills == 2
+    assert error_stream.getvalue() == ""
+
+    assert repl.execute_line("pipeline mode concurrent", error_stream) == 0
+    assert repl.execute_line(f'cat "{file_path}" | wc -l', error_stream) == 0
+    assert capsys.readouterr().out == "1000\n"
+    assert repl.executor.get_buffer_stats().buffers == 2
+    assert repl.execute_line("pipeline mode parallel", error_stream) == PipelineCommand.ILLEGAL_ARGUMENT
+
+
+def test_spill_buffer_reads_text_and_bytes():
+    """Буфер читается как построчно, так и фрагментами байт, независимо от того, где хранятся данные"""
+    for memory_limit in (1024, 4):
+        text_buffer = SpillBuffer(memory_limit)
+        text_buffer.write("один\n")
+        text_buffer.write("два\n".encode("utf-8"))
+        text_buffer.seek(0)
+        assert list(text_buffer) == ["один\n", "два\n"]
+        assert text_buffer.spilled == (memory_limit == 4)
+        text_buffer.close()
+
+        binary_buffer = SpillBuffer(memory_limit)
+        binary_buffer.write(b"\xff\x00")
+        binary_buffer.seek(0)
+        assert binary_buffer.buffer.read() == b"\xff\x00"
+        binary_buffer.close()
+
+
+class EndlessProducer(Command):
+    """Тестовая команда, бесконечно пишущая строки в поток вывода"""
+
+    def execute(self) -> int:
+        i = 0
+        while True:
+            self.output_stream.write(f"INFO {i}\n")
+            i += 1
+
+
+class FirstLineCommand(StreamingCommand):
+    """Тестовая команда, которой нужна только первая строка ввода"""
+
+    def stream(self, lines: Iterator[str]) -> Generator[str, None, int]:
+        for line in lines:
+            yield line
+            break
+        return FirstLineCommand.OK
+
+
+def test_early_termination_stops_builtin_stages():
+    """Когда последней команде больше не нужен ввод, предыдущие команды прекращают чтение и запись"""
+    output_stream = io.StringIO()
+    commands = [
+        EndlessProducer(),
+        # `grep` ничего не выводит, поэтому может узнать о завершении следующей команды только при чтении ввода
+        GrepCommand(["ERROR"], CliContext()),
+        EchoCommand(["done"], output_stream=output_stream),
+    ]
+
+    thread = threading.Thread(target=PipeExecutor(pipe_capacity=16).execute, args=(commands,), daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+
+    assert not thread.is_alive()
+    assert output_stream.getvalue() == "done\n"
+
+
+def test_early_termination_after_first_line():
+    """Команда, которой нужна только часть ввода, останавливает бесконечную предыдущую команду"""
+    output_stream = io.StringIO()
+    commands = [EndlessProducer(), FirstLineCommand(output_stream=output_stream)]
+
+    thread = threading.Thread(target=PipeExecutor(pipe_capacity=16).execute, args=(commands,), daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+
+    assert not thread.is_alive()
+    assert output_stream.getvalue() == "INFO 0\n"
+
+
+def test_early_termination_stops_builtin_before_external_stage():
+    """Внешняя команда, завершившаяся раньше времени, останавливает предыдущую встроенную команду"""
+    output_stream = io.StringIO()
+    context = CliContext()
+    commands = [
+        EndlessProducer(),
+        UnknownCommand(["head", "-n", "2"], output_stream=output_stream, context=context),
+    ]
+
+    thread = threading.Thread(target=PipeExecutor(pipe_capacity=16).execute, args=(commands,), daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+
+    assert not thread.is_alive()
+    assert output_stream.getvalue() == "INFO 0\nINFO 1\n"
+
+
+def test_early_termination_stops_external_stage():
+    """Внешние процессы завершаются, когда следующая встроенная команда больше не читает их вывод"""
+    output_stream = io.StringIO()
+    context = CliContext()
+    commands = [
+        UnknownCommand(["yes"], context=context),
+        FirstLineCommand(output_stream=output_stream),
+    ]
+
+    thread = threading.Thread(target=PipeExecutor(pipe_capacity=16).execute, args=(commands,), daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+
+    assert not thread.is_alive()
+    assert output_stream.getvalue() == "y\n"
@@ -0,0 +1,155 @@
+import bz2
+import gzip
+import io
+import lzma
+import mmap
+import os
+import tracemalloc
+from unittest import mock
+
+import pytest
+
+from cli_interpreter.cli_repl import REPL
+from cli_interpreter.reader import FileReader
+
+COMPRESSORS = {"gzip": gzip.compress, "bz2": bz2.compress, "xz": lzma.compress}
+
+
+def test_chunks_reuse_one_buffer(tmp_path):
+    file_path = tmp_path / "data.bin"
+    file_path.write_bytes(bytes(range(256)) * 10)
+
+    with FileReader(str(file_path), buffer_size=100) as reader:
+        chunks = list(reader.chunks(50, 2000))
+        assert all(chunk.obj is chunks[0].obj for chunk in chunks)
+        assert [len(chunk) for chunk in chunks] == [100] * 19 + [50]
+
+        collected = b"".join(bytes(chunk) for chunk in reader.chunks(2500))
+        assert collected == (bytes(range(256)) * 10)[2500:]
+        assert reader.read_range(50, 2000) == (bytes(range(256)) * 10)[50:2000]
+        assert reader.read_range(2550, 3000) == (bytes(range(256)) * 10)[2550:]
+
+
+@pytest.mark.skipif(not hasattr(os, "posix_fadvise"), reason="posix_fadvise недоступен")
+def test_sequential_access_hint(tmp_path):
+    file_path = tmp_path / "data.txt"
+    file_path.write_text("data\n")
+
+    with mock.patch("os.posix_fadvise") as fadvise:
+        with FileReader(str(file_path)) as reader:
+            fd = reader.file.fileno()
+
+    fadvise.assert_called_once_with(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+
+
+def test_large_files_are_mapped(tmp_path):
+    small_path = tmp_path / "small.txt"
+    small_path.write_bytes(b"a" * 99)
+    large_path = tmp_path / "large.txt"
+    large_path.write_bytes(b"b" * 100)
+
+    with FileReader(str(small_path), mmap_threshold=100) as reader:
+        content = reader.content()
+        assert isinstance(content, bytes) and content == b"a" * 99
+
+    with FileReader(str(large_path), mmap_threshold=100) as reader:
+        content = reader.content()
+        assert isinstance(content, mmap.mmap) and content[:] == b"b" * 100
+    assert content.closed
+
+
+def test_decoding_policy(tmp_path):
+    """Текст декодируется в заданной кодировке с заданной политикой ошибок, переводы строк приводятся к `\\n`"""
+    file_path = tmp_path / "cp1251.txt"
+    file_path.write_bytes("привет\r\nмир\rконец".encode("cp1251"))
+
+    with FileReader(str(file_path), encoding="cp1251") as reader:
+        assert list(reader.lines()) == ["привет\n", "мир\n", "конец"]
+        assert not reader.is_utf8
+
+    with FileReader(str(file_path)) as reader:
+        assert next(iter(reader.lines())) == "�" * 6 + "\n"
+        assert list(reader.decode_lines(b"a\r\nb")) == ["a\n", "b"]
+
+    with FileReader(str(file_path), errors="strict") as reader:
+        with pytest.raises(UnicodeDecodeError):
+            list(reader.lines())
+
+
+def test_missing_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        FileReader(str(tmp_path / "missing.txt"))
+
+
+@pytest.mark.parametrize("compression", COMPRESSORS)
+def test_compressed_files_are_read_decompressed(tmp_path, compression):
+    """Сжатый файл определяется по первым байтам, а не по расширению, и читается распакованным"""
+    text = "".join(f"line {i}\n" for i in range(1000))
+    file_path = tmp_path / "log.1"
+    file_path.write_bytes(COMPRESSORS[compression](text.encode()))
+
+    with FileReader(str(file_path), buffer_size=1000) as reader:
+        assert reader.compression == compression and not reader.is_plain_file
+        assert b"".join(bytes(chunk) for chunk in reader.chunks()) == text.encode()
+        assert reader.content() == text.encode()
+        assert "".join(reader.lines()) == text
+
+    with FileReader(str(file_path), decompress=False) as reader:
+        assert reader.compression is None and reader.is_plain_file
+
+
+def test_plain_text_is_not_taken_for_compressed(tmp_path):
+    file_path = tmp_path / "BZh.txt"
+    file_path.write_text("BZh9 is a bzip2 header\n")
+    empty_bz2_path = tmp_path / "empty.bz2"
+    empty_bz2_path.write_bytes(bz2.compress(b""))
+
+    with FileReader(str(file_path)) as reader:
+        assert reader.compression is None
+    with FileReader(str(empty_bz2_path)) as reader:
+        assert reader.compression == "bz2" and reader.content() == b""
+
+
+def test_corrupted_compressed_file(tmp_path):
+    """Обрезанный сжатый файл - ошибка чтения (`OSError`), которую команды сообщают как обычно"""
+    file_path = tmp_path / "log.xz"
+    file_path.write_bytes(lzma.compress(b"data\n" * 1000)[:-20])
+
+    with FileReader(str(file_path)) as reader:
+        with pytest.raises(OSError):
+            list(reader.chunks())
+
+
+@pytest.mark.parametrize("compression", COMPRESSORS)
+def test_commands_read_compressed_files(tmp_path, capsys, compression):
+    file_path = tmp_path / "app.log"
+    file_path.write_bytes(COMPRESSORS[compression]("INFO старт\nERROR сбой\nINFO стоп\n".encode()))
+    repl = REPL()
+    lines = [f'cat "{file_path}"', f'grep -n ERROR "{file_path}"', f'wc "{file_path}"', f'cat "{file_path}" | wc -m']
+
+    for line in lines:
+        assert repl.execute_line(line, io.StringIO()) == 0
+
+    assert capsys.readouterr().out == "INFO старт\nERROR сбой\nINFO стоп\n2:ERROR сбой\n3 6 45\n32\n"
+    assert repl.context.get_file_cache().stats()["entries"] == 0
+
+
+def test_compressed_file_is_read_in_constant_memory(tmp_path):
+    size = 64 * 1024 * 1024
+    file_path = tmp_path / "big.gz"
+    with gzip.open(file_path, "wb", compresslevel=1) as file:
+        block = b"0123456789abcdef\n" * (1024 * 1024 // 17)
+        for _ in range(size // len(block)):
+            file.write(block)
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        with FileReader(str(file_path)) as reader:
+            total = sum(len(chunk) for chunk in reader.chunks())
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert total == size // len(block) * len(block)
+    assert peak < 4 * 1024 * 1024
@@ -0,0 +1,67 @@
+import io
+import itertools
+from typing import Generator, Iterator
+
+from cli_interpreter.commands.cat_command import CatCommand
+from cli_interpreter.commands.grep_command import GrepCommand
+from cli_interpreter.commands.streaming_command import StreamingCommand
+from cli_interpreter.commands.wc_command import WcCommand
+from cli_interpreter.context import CliContext
+
+
+class UpperCommand(StreamingCommand):
+    """Тестовая потоковая команда, переводящая ввод в верхний регистр"""
+
+    def stream(self, lines: Iterator[str]) -> Generator[str, None, int]:
+        for line in lines:
+            yield line.upper()
+        return UpperCommand.OK
+
+
+def test_streaming_command_execute_wrapper():
+    """`execute` пишет фрагменты, отданные `stream`, в поток вывода"""
+    output_stream = io.StringIO()
+    cmd = UpperCommand(input_stream=io.StringIO("foo\nbar"), output_stream=output_stream)
+
+    assert UpperCommand.OK == cmd.execute()
+    assert output_stream.getvalue() == "FOO\nBAR\n"
+
+
+def test_grep_stream_is_lazy():
+    """`grep` обрабатывает бесконечный ввод, отдавая совпадения по мере их появления"""
+    lines = (f"{'ERROR' if i % 3 == 0 else 'INFO'} {i}\n" for i in itertools.count())
+    cmd = GrepCommand(["ERROR"], CliContext())
+    cmd.input_stream = io.StringIO()
+
+    matches = list(itertools.islice(cmd.stream(lines), 3))
+
+    assert matches == ["ERROR 0\n", "ERROR 3\n", "ERROR 6\n"]
+
+
+def test_grep_after_context_does_not_repeat_lines():
+    """Строки контекста, которые сами являются совпадениями, выводятся один раз"""
+    output_stream = io.StringIO()
+    cmd = GrepCommand(["-A", "1", "a"], CliContext())
+    cmd.input_stream = io.StringIO("a1\na2\nb\nc\n")
+    cmd.output_stream = output_stream
+
+    assert GrepCommand.OK == cmd.execute()
+    assert output_stream.getvalue() == "a1\na2\nb\n"
+
+
+def test_cat_input_stream():
+    """`cat` без аргументов копирует поток ввода"""
+    output_stream = io.StringIO()
+    cmd = CatCommand(input_stream=io.StringIO("foo\nbar\n"), output_stream=output_stream, context=CliContext())
+
+    assert CatCommand.OK == cmd.execute()
+    assert output_stream.getvalue() == "foo\nbar\n"
+
+
+def test_wc_input_stream():
+    """`wc` считает строки, слова и байты в потоке ввода построчно"""
+    output_stream = io.StringIO()
+    cmd = WcCommand(input_stream=io.StringIO("один два\nthree\n"), output_stream=output_stream, context=CliContext())
+
+    assert WcCommand.OK == cmd.execute()
+    assert output_stream.getvalue() == "2 3 22\n"
@@ -0,0 +1,146 @@
+import gzip
+import io
+import os
+import re
+
+from cli_interpreter.commands.grep_command import GrepCommand
+from cli_interpreter.commands.index_command import IndexCommand
+from cli_interpreter.context import CliContext
+from cli_interpreter.trigram_index import INDEX_FILENAME, TrigramIndex, required_literals
+
+
+def test_required_literals():
+    assert required_literals("ERROR", 0) == ["ERROR"]
+    assert required_literals(r"ERROR [0-9]+ disk\.full", 0) == ["ERROR ", " disk.full"]
+    assert required_literals(r"\bconnect\b", 0) == ["connect"]
+    assert required_literals("timeouts?", 0) == ["timeout"]
+    assert required_literals("ab", 0) == []
+    assert required_literals("ERROR|WARN", 0) == []
+    assert required_literals("(ERROR)?x", 0) == []
+    assert required_literals("Ошибка", re.IGNORECASE) == []
+    assert required_literals("timeout", re.IGNORECASE) == ["meout"]
+    assert required_literals(r"[\]a]bcd", 0) == ["bcd"]
+    assert required_literals(r"[]a]bcd[^]x]efg", 0) == ["bcd", "efg"]
+
+
+def _make_tree(root):
+    (root / "logs").mkdir()
+    (root / "logs" / "a.log").write_text("INFO start\nERROR disk full\n")
+    (root / "logs" / "b.log").write_text("INFO start\nINFO stop\n")
+    (root / "notes.txt").write_text("nothing here\n")
+
+
+def test_index_narrows_candidates(tmp_path):
+    """Индекс оставляет только файлы, содержащие все триграммы обязательных подстрок"""
+    _make_tree(tmp_path)
+
+    index, indexed, removed = TrigramIndex.update(str(tmp_path))
+
+    assert (indexed, removed) == (3, 0)
+    assert index.candidates(["disk full"]) == {os.path.join("logs", "a.log")}
+    assert index.candidates(["start"]) == {os.path.join("logs", "a.log"), os.path.join("logs", "b.log")}
+    assert index.candidates(["error"]) == {os.path.join("logs", "a.log")}
+    assert index.candidates(["absent"]) == set()
+
+
+def test_index_update_detects_changes(tmp_path):
+    """Повторное построение индексирует только изменившиеся файлы и удаляет исчезнувшие"""
+    _make_tree(tmp_path)
+    TrigramIndex.update(str(tmp_path))
+    (tmp_path / "notes.txt").unlink()
+    (tmp_path / "logs" / "b.log").write_text("ERROR disk full again\n")
+
+    index, indexed, removed = TrigramIndex.update(str(tmp_path))
+
+    assert (indexed, removed) == (1, 1)
+    assert index.candidates(["disk full"]) == {os.path.join("logs", "a.log"), os.path.join("logs", "b.log")}
+
+
+def test_index_update_of_many_files_matches_fresh_build(tmp_path):
+    """Обновление, при котором изменились все файлы, дает тот же индекс, что и построение с нуля"""
+    for i in range(50):
+        (tmp_path / f"{i}.log").write_text(f"request {i} done\n")
+    TrigramIndex.update(str(tmp_path))
+    for i in range(50):
+        (tmp_path / f"{i}.log").write_text(f"response {i * 7} sent\n" if i % 2 else "")
+    (tmp_path / "0.log").unlink()
+
+    index, indexed, removed = TrigramIndex.update(str(tmp_path))
+    os.remove(TrigramIndex.path_for(str(tmp_path)))
+    fresh, _, _ = TrigramIndex.update(str(tmp_path))
+
+    assert (indexed, removed) == (49, 1)
+    assert index.postings == fresh.postings
+    assert index.candidates(["request"]) == set()
+
+
+def _grep(args, context):
+    output_stream = io.StringIO()
+    command = GrepCommand(args, context)
+    command.output_stream = output_stream
+    assert command.execute() == GrepCommand.OK
+    return output_stream.getvalue()
+
+
+def test_grep_uses_index_and_stays_correct_for_stale_files(tmp_path):
+    """grep -r пропускает файлы без совпадений по индексу, но читает файлы, изменившиеся после его построения"""
+    _make_tree(tmp_path)
+    context = CliContext()
+    context.set_working_dir(str(tmp_path))
+    TrigramIndex.update(str(tmp_path))
+    (tmp_path / "notes.txt").write_text("ERROR disk full in notes\n")
+
+    output = _grep(["-r", "disk full", "."], context)
+
+    assert output == f"notes.txt:ERROR disk full in notes\n{os.path.join('logs', 'a.log')}:ERROR disk full\n"
+    assert INDEX_FILENAME not in _grep(["-r", "-c", "files", "."], context)
+
+
+def test_indexed_grep_finds_matches_in_compressed_files(tmp_path):
+    """Сжатый файл индексируется по распакованному содержимому, поэтому индекс не отсекает его совпадения"""
+    (tmp_path / "a.log.gz").write_bytes(gzip.compress(b"hello ERROR world\n"))
+    (tmp_path / "b.log").write_text("hello world\n")
+    context = CliContext()
+    context.set_working_dir(str(tmp_path))
+    expected = "a.log.gz:hello ERROR world\n"
+    assert _grep(["-r", "ERROR", "."], context) == expected
+
+    index, _, _ = TrigramIndex.update(str(tmp_path))
+
+    assert index.candidates(["error"]) == {"a.log.gz"}
+    assert _grep(["-r", "ERROR", "."], context) == expected
+
+
+def test_indexed_grep_with_escaped_bracket_in_class(tmp_path):
+    """Экранированная `]` не закрывает класс символов, поэтому индекс не отсекает файлы с совпадениями"""
+    (tmp_path / "f.txt").write_text("x]bcd\n")
+    (tmp_path / "g.txt").write_text("nothing\n")
+    context = CliContext()
+    context.set_working_dir(str(tmp_path))
+    expected = _grep(["-r", r"[\]a]bcd", "."], context)
+    assert expected == "f.txt:x]bcd\n"
+
+    TrigramIndex.update(str(tmp_path))
+
+    assert _grep(["-r", r"[\]a]bcd", "."], context) == expected
+
+
+def test_index_command(tmp_path):
+    _make_tree(tmp_path)
+    context = CliContext()
+    context.set_working_dir(str(tmp_path))
+    output_stream = io.StringIO()
+
+    build = IndexCommand(["build"], context)
+    build.output_stream = output_stream
+    status = IndexCommand(["status", "."], context)
+    status.output_stream = output_stream
+
+    assert build.execute() == IndexCommand.OK
+    assert status.execute() == IndexCommand.OK
+    lines = output_stream.getvalue().splitlines()
+    assert lines[0].startswith(".: 3 files")
+    assert "files: 3" in lines
+    assert "stale: 0" in lines
+    assert "unindexed: 0" in lines
+    assert IndexCommand(["status", "logs"], context).execute() == IndexCommand.ILLEGAL_ARGUMENT
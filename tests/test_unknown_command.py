@@ -1,8 +1,11 @@
+import io
 import os
+import sys
 from unittest.mock import patch, MagicMock
 
 from cli_interpreter.commands.unknown_command import UnknownCommand
 from cli_interpreter.context import CliContext
+from cli_interpreter.pipe import make_pipe
 
 
 def test_unknown_command_success():
@@ -15,13 +18,13 @@ def test_unknown_command_success():
 
         args = ["ls", "-la"]
         context = CliContext()
-        cmd = UnknownCommand(args=args, context=context)
-        cmd._write_output = MagicMock()
+        output_stream = io.StringIO()
+        cmd = UnknownCommand(args=args, output_stream=output_stream, context=context)
 
         assert UnknownCommand.OK == cmd.execute()
 
         mock_run.assert_called_once_with(args, input=None, capture_output=True, cwd=context.get_working_dir())
-        cmd._write_output.assert_called_once_with("foo\n")
+        assert output_stream.getvalue() == "foo\n"
 
 
 def test_unknown_command_with_input_stream():
@@ -32,19 +35,18 @@ def test_unknown_command_with_input_stream():
         mock_proc.returncode = 0
         mock_run.return_value = mock_proc
 
-        input_stream = MagicMock()
-        input_stream.read.return_value = "input text"
+        input_stream = io.StringIO("input text")
+        output_stream = io.StringIO()
 
         args = ["grep", "pattern"]
         context = MagicMock()
         context.get_working_dir.return_value = os.getcwd()
-        cmd = UnknownCommand(args=args, input_stream=input_stream, context=context)
-        cmd._write_output = MagicMock()
+        cmd = UnknownCommand(args=args, input_stream=input_stream, output_stream=output_stream, context=context)
 
         assert UnknownCommand.OK == cmd.execute()
 
         mock_run.assert_called_once_with(args, input="input text".encode("utf-8"), capture_output=True, cwd=context.get_working_dir())
-        cmd._write_output.assert_called_once_with("bar\n")
+        assert output_stream.getvalue() == "bar\n"
 
 
 def test_unknown_command_failure():
@@ -58,13 +60,13 @@ def test_unknown_command_failure():
 
         args = ["ls", "non_existent_file"]
         context = CliContext()
-        cmd = UnknownCommand(args=args, context=context)
-        cmd._write_output = MagicMock()
+        output_stream = io.StringIO()
+        cmd = UnknownCommand(args=args, output_stream=output_stream, context=context)
 
         assert expected_return_code == cmd.execute()
 
         mock_run.assert_called_once_with(args, input=None, capture_output=True, cwd=context.get_working_dir())
-        cmd._write_output.assert_called_once_with("")
+        assert output_stream.getvalue() == ""
 
 
 def test_unknown_command_exception():
@@ -78,3 +80,31 @@ def test_unknown_command_exception():
             assert UnknownCommand.DEFAULT_ERROR == cmd.execute()
             mock_run.assert_called_once_with(args, input=None, capture_output=True, cwd=context.get_working_dir())
             mock_stderr.write.assert_called_once_with("Test error\n")
+
+
+def test_unknown_command_passes_binary_output():
+    """Вывод внешней команды не в UTF-8 передается в поток вывода байтами без декодирования"""
+    data = bytes([0xff, 0xfe, 0x00, 0x80])
+    output_stream = io.TextIOWrapper(io.BytesIO())
+    script = f"import sys; sys.stdout.buffer.write(bytes({list(data)}))"
+    cmd = UnknownCommand(args=[sys.executable, "-c", script], output_stream=output_stream, context=CliContext())
+
+    assert UnknownCommand.OK == cmd.execute()
+
+    assert output_stream.buffer.getvalue() == data
+
+
+def test_unknown_command_passes_binary_input():
+    """Ввод внешней команды из канала передается процессу байтами"""
+    reader, writer = make_pipe(1024)
+    writer.write(bytes([0xff, 0x00]))
+    writer.close()
+    output_stream = io.TextIOWrapper(io.BytesIO())
+    script = "import sys; sys.stdout.buffer.write(sys.stdin.buffer.read()[::-1])"
+    cmd = UnknownCommand(
+        args=[sys.executable, "-c", script], input_stream=reader, output_stream=output_stream, context=CliContext()
+    )
+
+    assert UnknownCommand.OK == cmd.execute()
+
+    assert output_stream.buffer.getvalue() == bytes([0x00, 0xff])
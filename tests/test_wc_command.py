@@ -1,8 +1,11 @@
 import io
 from unittest.mock import patch
 
+import pytest
+
 from cli_interpreter.commands.wc_command import WcCommand
 from cli_interpreter.context import CliContext
+from cli_interpreter.parallel import split_file_ranges
 
 
 def test_wc_command_with_existing_file(tmp_path):
@@ -37,3 +40,99 @@ def test_wc_command_with_missing_file():
 
     # Проверяем, что вывод в stderr содержит сообщение об ошибке
     assert "non_existing_file.txt" in error_output
+
+
+def test_wc_command_parallel(tmp_path, monkeypatch):
+    """Тест команды WcCommand с подсчетом в пуле процессов: слова на границах пакетов не теряются"""
+    monkeypatch.setattr("cli_interpreter.commands.wc_command.CHUNK_SIZE", 999)
+    monkeypatch.setattr(WcCommand, "PARALLEL_BATCH_SIZE", 999)
+    test_content = "alpha beta\tgamma\n" * 500
+    file_path = tmp_path / "test.txt"
+    file_path.write_text(test_content)
+
+    output_stream = io.StringIO()
+
+    cmd = WcCommand(args=["--parallel", str(file_path)], output_stream=output_stream, context=CliContext())
+    assert WcCommand.OK == cmd.execute()
+
+    assert output_stream.getvalue() == f"500 1500 {len(test_content)}\n"
+
+
+@pytest.mark.parametrize(
+    "flags, expected",
+    [([], "2 3 23"), (["-l"], "2"), (["-w", "-m"], "3 14"), (["-c", "-l"], "2 23"), (["-m"], "14")],
+)
+def test_wc_command_counters(tmp_path, flags, expected):
+    """Тест ключей -l, -w, -m и -c: выводятся только выбранные счетчики в порядке строки, слова, символы, байты"""
+    file_path = tmp_path / "test.txt"
+    file_path.write_text("привет мир\nhi\n", encoding="utf-8")
+
+    output_stream = io.StringIO()
+
+    cmd = WcCommand(args=[*flags, str(file_path)], output_stream=output_stream, context=CliContext())
+    assert WcCommand.OK == cmd.execute()
+
+    assert output_stream.getvalue() == expected + "\n"
+
+
+def test_wc_command_words_across_chunks(tmp_path, monkeypatch):
+    """Слова и многобайтовые символы, разрезанные границей фрагментов, учитываются один раз"""
+    monkeypatch.setattr("cli_interpreter.commands.wc_command.CHUNK_SIZE", 7)
+    test_content = "  слово\t\tword  x\n\x0bмного   пробелов\r\nend"
+    file_path = tmp_path / "test.txt"
+    file_path.write_bytes(test_content.encode("utf-8"))
+
+    output_stream = io.StringIO()
+
+    cmd = WcCommand(args=["-l", "-w", "-m", "-c", str(file_path)], output_stream=output_stream, context=CliContext())
+    assert WcCommand.OK == cmd.execute()
+
+    expected = [2, len(test_content.split()), len(test_content), len(test_content.encode("utf-8"))]
+    assert output_stream.getvalue() == " ".join(map(str, expected)) + "\n"
+
+
+def test_wc_command_sharded(tmp_path, monkeypatch):
+    """Тест команды WcCommand с подсчетом диапазонов файла в пуле процессов"""
+    monkeypatch.setattr(WcCommand, "SHARD_SIZE", 1000)
+    monkeypatch.setattr(WcCommand, "PARALLEL_BATCH_SIZE", 333)
+    test_content = "alpha beta\tgamma\n" * 500 + "no trailing newline"
+    file_path = tmp_path / "test.txt"
+    file_path.write_text(test_content)
+
+    output_stream = io.StringIO()
+
+    cmd = WcCommand(args=["--parallel", str(file_path)], output_stream=output_stream, context=CliContext())
+    assert WcCommand.OK == cmd.execute()
+
+    assert output_stream.getvalue() == f"500 1503 {len(test_content)}\n"
+
+
+def test_split_file_ranges(tmp_path):
+    """Диапазоны покрывают файл целиком и заканчиваются на границах строк"""
+    file_path = tmp_path / "test.txt"
+    file_path.write_bytes(b"a" * 10 + b"\n" + b"b" * 3 + b"\n" + b"c" * 25)
+
+    with open(file_path, "rb") as file:
+        assert split_file_ranges(file, 4) == [(0, 11), (11, 15), (15, 40)]
+        assert split_file_ranges(file, 11) == [(0, 11), (11, 40)]
+        assert split_file_ranges(file, 100) == [(0, 40)]
+
+
+def test_wc_command_multiple_files(tmp_path):
+    """Тест команды WcCommand для нескольких файлов: строки в порядке аргументов, итог и ошибки по отдельным файлам"""
+    first = tmp_path / "first.txt"
+    second = tmp_path / "second.txt"
+    first.write_text("one two\nthree\n")
+    second.write_text("four\n")
+    missing = tmp_path / "missing.txt"
+
+    output_stream = io.StringIO()
+
+    cmd = WcCommand(
+        args=["-l", "-w", str(first), str(missing), str(second)], output_stream=output_stream, context=CliContext()
+    )
+    with patch("sys.stderr", new_callable=io.StringIO) as mock_stderr:
+        assert WcCommand.MISSING_INPUT == cmd.execute()
+        assert "missing.txt" in mock_stderr.getvalue()
+
+    assert output_stream.getvalue() == f"2 3 {first}\n1 1 {second}\n3 4 total\n"